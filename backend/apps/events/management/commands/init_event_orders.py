@@ -1,44 +1,44 @@
 """
-기존 Event 데이터의 day_order와 global_order 초기화 스크립트
+기존 Event 데이터의 day_order, order_key, global_order 초기화 스크립트
 """
 from django.core.management.base import BaseCommand
-from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count
 from apps.events.models import Event
+from apps.events import ordering
 
 
 class Command(BaseCommand):
-    help = '기존 Event 데이터의 day_order와 global_order 초기화'
+    help = '기존 Event 데이터의 day_order, order_key, global_order 초기화'
 
     def handle(self, *args, **options):
         self.stdout.write('🔄 Event order 초기화 시작...')
-        
+
         # Trip별로 처리
         from apps.trips.models import Trip
         trips = Trip.objects.all()
-        
+
         total_updated = 0
-        
+
         for trip in trips:
             self.stdout.write(f'\n📦 Trip: {trip.title} (ID: {trip.id})')
-            
-            # 1. Global order 초기화 (day, order 순으로 정렬)
-            all_events = Event.objects.filter(trip=trip).order_by('day', 'order')
-            
-            for idx, event in enumerate(all_events):
-                event.global_order = idx + 1
-                event.save(update_fields=['global_order'])
-            
-            # 2. Day별 day_order 초기화 (10, 20, 30...)
-            days = set(e.day for e in all_events if e.day)
-            
-            for day in sorted(days):
-                day_events = Event.objects.filter(trip=trip, day=day).order_by('order')
-                
-                for idx, event in enumerate(day_events):
-                    event.day_order = Decimal((idx + 1) * 10)
-                    event.save(update_fields=['day_order'])
-                
-                self.stdout.write(f'  ✅ Day {day}: {len(day_events)}개 이벤트 초기화')
-                total_updated += len(day_events)
-        
+
+            with transaction.atomic():
+                # 1. Day별 day_order 초기화 (기존 order 순으로 10, 20, 30...)
+                ordering.renumber_day_orders(trip.id, source='order')
+
+                # 2. order_key 초기화 (day_order 순)
+                ordering.reset_order_keys(trip.id)
+
+                # 3. Global order 초기화 (day, order_key 순)
+                ordering.recalculate_global_order(trip.id)
+
+            day_counts = (
+                Event.objects.filter(trip=trip, day__isnull=False)
+                .values('day').annotate(count=Count('id')).order_by('day')
+            )
+            for row in day_counts:
+                self.stdout.write(f"  ✅ Day {row['day']}: {row['count']}개 이벤트 초기화")
+                total_updated += row['count']
+
         self.stdout.write(self.style.SUCCESS(f'\n✨ 완료! 총 {total_updated}개 이벤트 초기화됨'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """order_key 컬럼 추가 (nullable, 기본값 없음 → 테이블 재작성 없이 즉시 완료)"""
+
+    dependencies = [
+        ('events', '0003_alter_event_options_event_day_order_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='event',
+            options={'ordering': ['day', 'order_key']},
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='order_key',
+            field=models.TextField(blank=True, db_collation='C', help_text='Day 내부 정렬 키 (fractional index, order_keys 참고)', null=True, verbose_name='Order key'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='day_order',
+            field=models.DecimalField(decimal_places=4, default=10.0, help_text='Day 내부 순서 값 (클라이언트 표시/요청용, 정렬은 order_key)', max_digits=10, verbose_name='Order within day'),
+        ),
+    ]
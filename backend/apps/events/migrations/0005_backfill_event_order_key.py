@@ -0,0 +1,38 @@
+"""
+기존 Event의 order_key 채우기 (day_order와 같은 순서)
+
+- 배치마다 별도 트랜잭션으로 커밋하므로 긴 잠금 없이 운영 중에 실행할 수 있습니다.
+- 배포 중 키 없이 저장된 Event는 Event.save()가 같은 규칙으로 키를 채웁니다.
+"""
+from django.db import migrations, transaction
+
+from apps.events import order_keys
+
+BATCH_SIZE = 1000
+
+
+def backfill_order_keys(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Event.objects.filter(order_key__isnull=True)
+                .order_by('id').only('id', 'day_order')[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for event in batch:
+                event.order_key = order_keys.from_decimal(event.day_order)
+            Event.objects.bulk_update(batch, ['order_key'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('events', '0004_event_order_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_keys, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,22 @@
+"""(trip, day, order_key) 인덱스로 교체 - 쓰기를 막지 않도록 CONCURRENTLY"""
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('events', '0005_backfill_event_order_key'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['trip', 'day', 'order_key'], name='events_trip_day_key_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='event',
+            name='events_trip_id_030849_idx',
+        ),
+    ]
@@ -4,6 +4,8 @@ Event 모델 (Place 대체)
 from django.db import models
 from model_utils.models import TimeStampedModel
 
+from . import order_keys
+
 
 class Event(TimeStampedModel):
     """여행 이벤트 모델 (장소 방문 + 액티비티)"""
@@ -24,7 +26,14 @@ class Event(TimeStampedModel):
         decimal_places=4,
         default=10.0,
         verbose_name='Order within day',
-        help_text='Day 내부 순서 (10, 20, 30...)'
+        help_text='Day 내부 순서 값 (클라이언트 표시/요청용, 정렬은 order_key)'
+    )
+    order_key = models.TextField(
+        null=True,
+        blank=True,
+        db_collation='C',
+        verbose_name='Order key',
+        help_text='Day 내부 정렬 키 (fractional index, order_keys 참고)'
     )
     
     # 유연한 이벤트 정의 (모두 optional)
@@ -92,14 +101,20 @@ class Event(TimeStampedModel):
     
     class Meta:
         db_table = 'events'
-        ordering = ['day', 'day_order']
+        ordering = ['day', 'order_key']
         indexes = [
             models.Index(fields=['trip', 'order']),
-            models.Index(fields=['trip', 'day', 'day_order']),
+            models.Index(fields=['trip', 'day', 'order_key'], name='events_trip_day_key_idx'),
             models.Index(fields=['trip', 'global_order']),
             models.Index(fields=['place_id']),
         ]
     
+    def save(self, *args, **kwargs):
+        # 키 없이 저장되는 Event는 day_order와 같은 순서의 키를 사용
+        if self.order_key is None:
+            self.order_key = order_keys.from_decimal(self.day_order)
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         if self.custom_title:
             return f"{self.custom_title} (order: {self.order})"
@@ -0,0 +1,76 @@
+"""
+Day 내부 순서용 fractional index 키 (가변 길이 base62 문자열)
+
+- 키는 문자열 비교(C collation)로 정렬되며, 두 키 사이에는 항상 새 키를 만들 수 있어
+  같은 위치에 계속 끼워 넣어도 다른 Event를 다시 쓸(rebalance) 필요가 없습니다.
+- 마지막 자리는 '0'이 아닙니다 (그래야 어떤 키 앞에도 키를 만들 수 있음).
+- 같은 자리에 반복 삽입하면 키가 약 6번에 한 글자씩 길어집니다.
+"""
+from decimal import Decimal
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+_INDEX = {digit: idx for idx, digit in enumerate(DIGITS)}
+
+# from_decimal: day_order(Decimal(10,4))를 고정 폭 키로 변환 (정렬 순서 유지)
+DECIMAL_SCALE = 10 ** 4
+DECIMAL_OFFSET = 10 ** 10  # 음수 day_order 대비
+DECIMAL_WIDTH = 6  # 62^6 > 2 * 10^10
+DECIMAL_SUFFIX = DIGITS[BASE // 2]
+
+
+def validate(key):
+    if not key or key[-1] == DIGITS[0] or any(digit not in _INDEX for digit in key):
+        raise ValueError(f'올바르지 않은 순서 키입니다: {key!r}')
+
+
+def key_between(lower, upper):
+    """
+    lower < 키 < upper 인 가장 짧은 키 (None은 끝이 열려 있음)
+
+    Raises:
+        ValueError: 잘못된 키 또는 lower >= upper
+    """
+    for key in (lower, upper):
+        if key is not None:
+            validate(key)
+    if lower is not None and upper is not None and lower >= upper:
+        raise ValueError(f'순서 키 범위가 올바르지 않습니다: {lower!r} >= {upper!r}')
+    return _midpoint(lower or '', upper)
+
+
+def keys_between(lower, upper, count):
+    """lower와 upper 사이에 고르게 퍼진 키 count개 (오름차순)"""
+    if count <= 0:
+        return []
+    middle = key_between(lower, upper)
+    half = count // 2
+    return keys_between(lower, middle, half) + [middle] + keys_between(middle, upper, count - half - 1)
+
+
+def from_decimal(value):
+    """day_order 값 → 같은 순서의 키 (기존 데이터 backfill, 키 없이 저장된 Event용)"""
+    number = int(Decimal(value) * DECIMAL_SCALE) + DECIMAL_OFFSET
+    digits = []
+    while number:
+        number, remainder = divmod(number, BASE)
+        digits.append(DIGITS[remainder])
+    return ''.join(reversed(digits)).rjust(DECIMAL_WIDTH, DIGITS[0]) + DECIMAL_SUFFIX
+
+
+def _midpoint(lower, upper):
+    # lower(''이면 0)와 upper(None이면 1) 사이의 base62 소수
+    if upper is not None:
+        prefix = 0
+        while prefix < len(upper) and (lower[prefix] if prefix < len(lower) else DIGITS[0]) == upper[prefix]:
+            prefix += 1
+        if prefix:
+            return upper[:prefix] + _midpoint(lower[prefix:], upper[prefix:])
+
+    lower_digit = _INDEX[lower[0]] if lower else 0
+    upper_digit = _INDEX[upper[0]] if upper is not None else BASE
+    if upper_digit - lower_digit > 1:
+        return DIGITS[(lower_digit + upper_digit + 1) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[lower_digit] + _midpoint(lower[1:], None)
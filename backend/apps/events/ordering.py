@@ -0,0 +1,185 @@
+"""
+Event 순서 일괄 재계산 (SQL 한 문장)
+
+- global_order = ROW_NUMBER() OVER (ORDER BY day, order_key, id)
+- Event 수만큼 UPDATE를 보내지 않고 윈도 함수로 한 번에 계산하며, 값이 바뀐 행만 씁니다.
+- from_day를 주면 그 day 이후(+ day 없는 Event)만 다시 계산합니다 (앞 day의 Event 수만큼 offset).
+- Day 내부 순서 변경은 assign_order_keys: 이미 순서가 맞는 Event의 키는 그대로 두고 나머지만 새 키를 받습니다.
+"""
+import bisect
+
+from django.db import connection
+
+from . import order_keys
+from .models import Event
+
+# renumber_day_orders의 정렬 기준으로 허용하는 컬럼
+DAY_ORDER_SOURCES = ('day_order', 'order')
+
+
+def recalculate_global_order(trip_id, from_day=None):
+    """
+    Trip의 global_order 재계산 (UPDATE 1회)
+
+    - 정렬은 day(없으면 마지막), order_key 순이며 같은 값은 id로 구분합니다.
+
+    Returns:
+        int: 값이 바뀐 Event 수
+    """
+    table = connection.ops.quote_name(Event._meta.db_table)
+    params = [trip_id]
+    range_filter = ''
+    offset = '0'
+    if from_day is not None:
+        range_filter = 'AND (day >= %s OR day IS NULL)'
+        offset = f'(SELECT COUNT(*) FROM {table} WHERE trip_id = %s AND day < %s)'
+        params = [trip_id, from_day, trip_id, from_day]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS e
+            SET global_order = ranked.position
+            FROM (
+                SELECT id, {offset} + ROW_NUMBER() OVER (ORDER BY day ASC NULLS LAST, order_key, id) AS position
+                FROM {table}
+                WHERE trip_id = %s {range_filter}
+            ) AS ranked
+            WHERE e.id = ranked.id AND e.global_order IS DISTINCT FROM ranked.position
+            """,
+            params
+        )
+        return cursor.rowcount
+
+
+def renumber_day_orders(trip_id, days=None, source='day_order'):
+    """
+    day별 day_order를 10, 20, 30... 으로 다시 매김 (UPDATE 1회)
+
+    Args:
+        days: 대상 day 목록 (None이면 모든 day)
+        source: 현재 순서로 볼 컬럼 ('day_order' 또는 'order')
+
+    Returns:
+        int: 값이 바뀐 Event 수
+    """
+    if source not in DAY_ORDER_SOURCES:
+        raise ValueError(f'지원하지 않는 정렬 기준입니다: {source}')
+
+    table = connection.ops.quote_name(Event._meta.db_table)
+    column = connection.ops.quote_name(source)
+    params = [trip_id]
+    day_filter = 'AND day IS NOT NULL'
+    if days is not None:
+        day_filter = 'AND day = ANY(%s)'
+        params.append(list(days))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS e
+            SET day_order = ranked.position * 10
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY day ORDER BY {column}, id) AS position
+                FROM {table}
+                WHERE trip_id = %s {day_filter}
+            ) AS ranked
+            WHERE e.id = ranked.id AND e.day_order <> ranked.position * 10
+            """,
+            params
+        )
+        return cursor.rowcount
+
+
+def assign_order_keys(events, moved=()):
+    """
+    원하는 순서(같은 day)의 Event 목록에 order_key 부여 - 바꾼 Event 목록 반환 (저장은 호출하는 쪽)
+
+    - 옮기지 않은 Event의 키 중 이미 오름차순인 가장 긴 부분열(LIS)은 그대로 두고,
+      나머지는 양옆 키 사이에 들어가면 기존 키를, 아니면 새 키를 받습니다 (한 개를 옮기면 한 개만 바뀜).
+    - moved: 옮긴 Event id 집합 (키가 같은 길이의 부분열이 여럿일 때 옮기지 않은 Event를 우선)
+    """
+    moved = set(moved)
+    keep = _increasing_subsequence([None if event.id in moved else event.order_key for event in events])
+    changed = []
+    lower = None
+    pending = []
+    for idx, event in enumerate(events + [None]):
+        if event is not None and idx not in keep:
+            pending.append(event)
+            continue
+        upper = event.order_key if event is not None else None
+        changed.extend(_fill(pending, lower, upper))
+        pending = []
+        lower = upper
+    return changed
+
+
+def _fill(events, lower, upper):
+    # 범위 안에서 오름차순인 기존 키는 유지하고 그 사이만 새 키
+    kept = set()
+    bound = lower
+    for idx, event in enumerate(events):
+        key = event.order_key
+        if key is not None and (bound is None or bound < key) and (upper is None or key < upper):
+            kept.add(idx)
+            bound = key
+
+    changed = []
+    pending = []
+    bound = lower
+    for idx, event in enumerate(events + [None]):
+        if event is not None and idx not in kept:
+            pending.append(event)
+            continue
+        next_bound = event.order_key if event is not None else upper
+        for target, key in zip(pending, order_keys.keys_between(bound, next_bound, len(pending))):
+            target.order_key = key
+            changed.append(target)
+        pending = []
+        bound = next_bound
+    return changed
+
+
+def reset_order_keys(trip_id):
+    """Trip의 order_key를 day_order 순서로 다시 만듦 (day별 고르게 분포) - 바뀐 Event 수"""
+    events = list(Event.objects.filter(trip_id=trip_id).order_by('day', 'day_order', 'id').only('id', 'day', 'order_key'))
+    changed = []
+    start = 0
+    for idx in range(1, len(events) + 1):
+        if idx < len(events) and events[idx].day == events[start].day:
+            continue
+        day_events = events[start:idx]
+        for event, key in zip(day_events, order_keys.keys_between(None, None, len(day_events))):
+            if event.order_key != key:
+                event.order_key = key
+                changed.append(event)
+        start = idx
+    if changed:
+        Event.objects.bulk_update(changed, ['order_key'])
+    return len(changed)
+
+
+def _increasing_subsequence(keys):
+    """키가 엄격히 증가하는 가장 긴 부분열의 index 집합 (None 키 제외, O(n log n))"""
+    tails = []  # 길이 k+1 부분열의 가장 작은 마지막 키
+    tail_indexes = []
+    previous = [None] * len(keys)
+    for idx, key in enumerate(keys):
+        if key is None:
+            continue
+        position = bisect.bisect_left(tails, key)
+        if position == len(tails):
+            tails.append(key)
+            tail_indexes.append(idx)
+        else:
+            tails[position] = key
+            tail_indexes[position] = idx
+        previous[idx] = tail_indexes[position - 1] if position else None
+
+    keep = set()
+    idx = tail_indexes[-1] if tail_indexes else None
+    while idx is not None:
+        keep.add(idx)
+        idx = previous[idx]
+    return keep
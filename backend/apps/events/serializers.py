@@ -58,9 +58,38 @@ class EventCreateSerializer(serializers.Serializer):
     currency = serializers.CharField(required=False, allow_blank=True)
 
 
+class EventBulkCreateSerializer(serializers.Serializer):
+    """Event 일괄 생성 Serializer (항목은 EventCreateSerializer와 같은 형식)"""
+    events = serializers.ListField(child=serializers.DictField(), min_length=1, max_length=100)
+    recalculateRoutes = serializers.BooleanField(required=False, default=True)
+    segmentMode = serializers.ChoiceField(
+        choices=['waypoints', 'matrix'], required=False, default='waypoints',
+        help_text='waypoints: Directions API 경유지 요청(polyline 포함), matrix: Distance Matrix API(시간/거리만)'
+    )
+
+
+class EventBulkCreateResultSerializer(serializers.Serializer):
+    """Event 일괄 생성 항목별 결과 Serializer"""
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['created', 'invalid'])
+    id = serializers.IntegerField(allow_null=True)
+    errors = serializers.DictField(required=False)
+
+
+class EventBulkCreateResponseSerializer(serializers.Serializer):
+    """Event 일괄 생성 응답 Serializer"""
+    results = EventBulkCreateResultSerializer(many=True)
+    events = EventSerializer(many=True)
+    segments = RouteSegmentModelSerializer(many=True, required=False)
+    routeSummary = RouteSummarySerializer(required=False)
+
+
 class EventUpdateSerializer(serializers.Serializer):
     """Event 수정 Serializer"""
+    placeId = serializers.CharField(required=False, allow_blank=True)
     placeName = serializers.CharField(required=False, allow_blank=True)
+    lat = serializers.DecimalField(max_digits=11, decimal_places=8, required=False, allow_null=True)
+    lng = serializers.DecimalField(max_digits=12, decimal_places=8, required=False, allow_null=True)
     address = serializers.CharField(required=False, allow_blank=True)
     activityType = serializers.CharField(required=False, allow_blank=True)
     customTitle = serializers.CharField(required=False, allow_blank=True)
@@ -73,14 +102,91 @@ class EventUpdateSerializer(serializers.Serializer):
 class EventReorderItemSerializer(serializers.Serializer):
     """순서 변경 항목 Serializer"""
     id = serializers.IntegerField()
-    order = serializers.DecimalField(max_digits=10, decimal_places=4)  # day_order로 변경
     day = serializers.IntegerField(required=False)  # day 변경도 지원
+    afterId = serializers.IntegerField(required=False, allow_null=True, help_text='이 Event 바로 뒤로')
+    beforeId = serializers.IntegerField(required=False, allow_null=True, help_text='이 Event 바로 앞으로')
+    order = serializers.DecimalField(
+        max_digits=10, decimal_places=4, required=False, allow_null=True,
+        help_text='하위 호환: afterId/beforeId가 없을 때 현재 dayOrder와 비교할 위치 (저장하지 않음)'
+    )
 
 
 class EventReorderSerializer(serializers.Serializer):
     """Event 순서 변경 Serializer"""
     events = EventReorderItemSerializer(many=True)
     recalculateRoutes = serializers.BooleanField(default=True)  # 경로 재계산 여부
+    
+    def validate_events(self, value):
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('같은 Event를 두 번 옮길 수 없습니다.')
+        return value
+
+
+class EventMoveSerializer(serializers.Serializer):
+    """Event 이동 Serializer (afterId/beforeId가 없으면 day의 마지막으로)"""
+    day = serializers.IntegerField(min_value=1)
+    afterId = serializers.IntegerField(required=False, allow_null=True, help_text='이 Event 바로 뒤로')
+    beforeId = serializers.IntegerField(required=False, allow_null=True, help_text='이 Event 바로 앞으로')
+    recalculateRoutes = serializers.BooleanField(default=True)
+
+
+class EventMoveResponseSerializer(serializers.Serializer):
+    """Event 이동 응답 Serializer"""
+    event = EventSerializer()
+    createdSegments = RouteSegmentModelSerializer(many=True)
+    deletedSegmentIds = serializers.ListField(child=serializers.IntegerField())
+    routeSummary = RouteSummarySerializer()
+
+
+class EventBatchOperationSerializer(serializers.Serializer):
+    """
+    Event 일괄 변경 항목 Serializer
+
+    - create: data = Event 생성 항목, ref로 이름을 붙이면 뒤 항목에서 id 대신 ref로 참조
+    - update: data = Event 수정 항목
+    - move: data = {day, afterId/afterRef, beforeId/beforeRef}
+    - delete: data 없음
+    - setRoute: data = {travelMode, departureTime} (이 Event → 다음 Event 구간)
+    """
+    op = serializers.ChoiceField(choices=['create', 'update', 'move', 'delete', 'setRoute'])
+    id = serializers.IntegerField(required=False)
+    ref = serializers.CharField(required=False, max_length=64)
+    data = serializers.DictField(required=False, default=dict)
+
+
+class EventBatchSerializer(serializers.Serializer):
+    """Event 일괄 변경 Serializer"""
+    operations = EventBatchOperationSerializer(many=True, allow_empty=False, max_length=100)
+    recalculateRoutes = serializers.BooleanField(required=False, default=True)
+    segmentMode = serializers.ChoiceField(choices=['waypoints', 'matrix'], required=False, default='waypoints')
+
+
+class EventBatchSetRouteSerializer(serializers.Serializer):
+    """setRoute 항목 Serializer"""
+    travelMode = serializers.ChoiceField(choices=['DRIVING', 'WALKING', 'TRANSIT', 'BICYCLING'], required=False)
+    departureTime = serializers.CharField(required=False, allow_blank=True, max_length=5)
+
+
+class EventRouteRefreshSerializer(serializers.Serializer):
+    """Event 경로 정보 업데이트의 refresh 플래그 Serializer ("false"/"0"도 false로 해석)"""
+    refresh = serializers.BooleanField(required=False, default=False)
+
+
+class EventBatchResultSerializer(serializers.Serializer):
+    """Event 일괄 변경 항목별 결과 Serializer"""
+    index = serializers.IntegerField()
+    op = serializers.CharField()
+    id = serializers.IntegerField()
+    error = serializers.DictField(required=False, help_text='적용하지 못한 setRoute ({code, message})')
+
+
+class EventBatchResponseSerializer(serializers.Serializer):
+    """Event 일괄 변경 응답 Serializer"""
+    results = EventBatchResultSerializer(many=True)
+    events = EventSerializer(many=True)
+    segments = RouteSegmentModelSerializer(many=True, required=False)
+    routeSummary = RouteSummarySerializer(required=False)
 
 
 class EventReorderResponseSerializer(serializers.Serializer):
@@ -90,6 +196,31 @@ class EventReorderResponseSerializer(serializers.Serializer):
     routeSummary = serializers.DictField()
 
 
+class EventInsertionQuerySerializer(serializers.Serializer):
+    """새 장소 삽입 위치 제안 쿼리 Serializer"""
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    day = serializers.IntegerField(required=False, min_value=1, help_text='특정 day만 검색 (없으면 Event가 있는 모든 day)')
+    limit = serializers.IntegerField(required=False, default=3, min_value=1, max_value=10)
+
+
+class EventInsertionSuggestionSerializer(serializers.Serializer):
+    """삽입 위치 제안 항목 Serializer"""
+    day = serializers.IntegerField()
+    position = serializers.IntegerField(help_text='day 내 0-based 삽입 위치')
+    afterEventId = serializers.IntegerField(allow_null=True)
+    beforeEventId = serializers.IntegerField(allow_null=True)
+    dayOrder = serializers.FloatField(help_text='Event 생성/순서 변경 시 사용할 day_order')
+    addedMin = serializers.FloatField(help_text='추가 이동 시간 (분)')
+    addedKm = serializers.FloatField(help_text='추가 이동 거리 (km)')
+    estimated = serializers.BooleanField(help_text='캐시에 없는 구간을 직선 거리로 추정했는지 여부')
+
+
+class EventInsertionResponseSerializer(serializers.Serializer):
+    """삽입 위치 제안 응답 Serializer"""
+    suggestions = EventInsertionSuggestionSerializer(many=True)
+
+
 class EventCreateResponseSerializer(EventSerializer):
     """
     Event 생성 응답 Serializer
@@ -140,15 +271,15 @@ class EventWithNextRouteSerializer(serializers.ModelSerializer):
         next_event = Event.objects.filter(
             trip=trip,
             day=obj.day,
-            day_order__gt=obj.day_order
-        ).order_by('day_order').first()
+            order_key__gt=obj.order_key
+        ).order_by('order_key').first()
         
         # 같은 day에 다음 이벤트가 없으면 다음 day의 첫 이벤트
         if not next_event:
             next_event = Event.objects.filter(
                 trip=trip,
                 day=obj.day + 1
-            ).order_by('day_order').first()
+            ).order_by('order_key').first()
         
         if not next_event:
             return None  # 마지막 이벤트
@@ -167,7 +298,8 @@ class EventWithNextRouteSerializer(serializers.ModelSerializer):
             'travelMode': segment.travel_mode,
             'durationMin': segment.duration_min,
             'distanceKm': float(segment.distance_km),
-            'polyline': segment.polyline
+            'polyline': segment.polyline,
+            'localEstimate': segment.local_estimate
         }
         
         # 출발 시간 추가
@@ -0,0 +1,42 @@
+"""
+events/routes 테스트 공용 준비 코드
+
+- TripTestMixin.create_trip(): 로그인한 owner + Trip + APIClient
+- TripTestMixin.create_line_events(): 시작 지점에서 북쪽으로 일직선인 Event들
+"""
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.trips.models import Trip, TripMember
+from .models import Event
+
+# 시작 지점(37.50, 127.00)에서 북쪽으로 약 2.2km 간격
+LINE_LATS = (37.52, 37.54, 37.56)
+
+
+class TripTestMixin:
+    """TestCase와 함께 상속해 setUp에서 사용"""
+
+    def create_trip(self, **fields):
+        """owner(self.user)가 로그인한 self.client와 self.trip 생성 - fields는 Trip 필드 (기본: Seoul, 37.50/127.00)"""
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="tester", email="tester@example.com", password="pass1234!",
+        )
+        self.trip = Trip.objects.create(
+            **{"title": "Test Trip", "city": "Seoul", "start_lat": 37.50, "start_lng": 127.00, **fields}
+        )
+        TripMember.objects.create(trip=self.trip, user=self.user, role="owner")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        return self.trip
+
+    def create_line_events(self, lats=LINE_LATS, day=1):
+        """self.trip의 day에 lats 순서로 Event 생성 (lng 127.00, day_order 10, 20, ...)"""
+        return [
+            Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1, day=day,
+                day_order=(idx + 1) * 10, place_name=f"Place {idx + 1}", lat=lat, lng=127.00,
+            )
+            for idx, lat in enumerate(lats)
+        ]
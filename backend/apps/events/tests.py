@@ -1,10 +1,17 @@
+from decimal import Decimal
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient
 
 from apps.trips.models import Trip, TripMember
+from apps.events.models import Event
+from apps.events import order_keys, ordering
+from apps.events.testing import TripTestMixin
 from apps.routes.models import RouteSegment
 
 
@@ -91,3 +98,652 @@ class EventCreateRecalculateRoutesTests(TestCase):
             RouteSegment.objects.filter(trip=trip, to_event_id=e2_id).exists()
         )
 
+
+class EventSuggestInsertionTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=2)
+
+        # Day 1: 북쪽으로 일직선 (37.52 → 37.54 → 37.56)
+        self.events = self.create_line_events()
+        previous = None
+        for event in self.events:
+            RouteSegment.objects.create(
+                trip=self.trip, from_event=previous, to_event=event,
+                duration_min=6, distance_km=2.2, travel_mode="DRIVING",
+            )
+            previous = event
+
+    @patch("apps.routes.services.requests.get")
+    def test_suggests_cheapest_position_without_api_calls(self, mock_get):
+        resp = self.client.get(
+            f"/api/trips/{self.trip.id}/events/suggest-insertion/",
+            {"lat": 37.53, "lng": 127.001, "limit": 2},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        mock_get.assert_not_called()
+        suggestions = resp.data["suggestions"]
+        self.assertEqual(len(suggestions), 2)
+        best = suggestions[0]
+        self.assertEqual((best["day"], best["position"]), (1, 1))
+        self.assertEqual(best["afterEventId"], self.events[0].id)
+        self.assertEqual(best["beforeEventId"], self.events[1].id)
+        self.assertEqual(best["dayOrder"], 15.0)
+        self.assertTrue(best["estimated"])
+        self.assertLessEqual(best["addedMin"], suggestions[1]["addedMin"])
+
+
+class ShortHopSegmentTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=1)
+
+    def create_event(self, lat, lng):
+        return self.client.post(
+            f"/api/trips/{self.trip.id}/events/",
+            {"placeName": "Place", "lat": lat, "lng": lng, "day": 1},
+            format="json",
+        )
+
+    @patch("apps.events.views.GoogleMapsService.calculate_route")
+    def test_close_events_get_local_walking_segment_until_refreshed(self, mock_calculate_route):
+        mock_calculate_route.return_value = {"durationMin": 12, "distanceKm": 3.4, "polyline": "api_polyline"}
+        first = self.create_event(37.53, 127.00).data
+        # 길 건너편 (~90m)
+        second = self.create_event(37.5308, 127.00).data
+
+        self.assertEqual(mock_calculate_route.call_count, 1)  # 시작 지점 → 첫 이벤트만 API
+        hop = next(seg for seg in second["segments"] if seg["toEventId"] == second["id"])
+        self.assertTrue(hop["localEstimate"])
+        self.assertEqual(hop["travelMode"], "WALKING")
+        self.assertEqual(hop["durationMin"], 2)
+        self.assertTrue(hop["polyline"])
+
+        # 문자열 "false"는 다시 조회하지 않음
+        resp = self.client.patch(
+            f"/api/trips/{self.trip.id}/events/{first['id']}/route/", {"refresh": "false"}, format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_calculate_route.call_count, 1)
+
+        resp = self.client.patch(
+            f"/api/trips/{self.trip.id}/events/{first['id']}/route/", {"refresh": True}, format="json",
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        segment = RouteSegment.objects.get(from_event_id=first["id"], to_event_id=second["id"])
+        self.assertFalse(segment.local_estimate)
+        self.assertEqual((segment.duration_min, segment.travel_mode), (12, "DRIVING"))
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 24)
+
+    @patch("apps.events.views.GoogleMapsService.calculate_route")
+    def test_refresh_rewrites_segment_under_trip_lock_and_bumps_version(self, mock_calculate_route):
+        mock_calculate_route.return_value = {"durationMin": 12, "distanceKm": 3.4, "polyline": "api_polyline"}
+        first = self.create_event(37.53, 127.00).data
+        self.create_event(37.5308, 127.00)
+        self.trip.refresh_from_db()
+        version = self.trip.route_version
+
+        with patch("apps.routes.segments.lock_segments") as lock_segments:
+            resp = self.client.patch(
+                f"/api/trips/{self.trip.id}/events/{first['id']}/route/", {"refresh": True}, format="json",
+            )
+
+        self.assertEqual(resp.status_code, 200)
+        lock_segments.assert_called_once_with(self.trip.id)
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.route_version, version + 1)
+
+
+class EventReorderQueryCountTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=2)
+        self.events = [
+            Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1, day=1, day_order=(idx + 1) * 10,
+            )
+            for idx in range(40)
+        ]
+
+    def reorder(self, events):
+        # 순서를 뒤집고 절반은 day 2로 이동
+        payload = {
+            "events": [
+                {"id": event.id, "order": (len(events) - idx) * 10, "day": 1 + idx % 2}
+                for idx, event in enumerate(events)
+            ],
+            "recalculateRoutes": False,
+        }
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.patch(f"/api/trips/{self.trip.id}/events/reorder/", payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_events(self):
+        small = self.reorder(self.events[:4])
+        large = self.reorder(self.events)
+
+        self.assertEqual(small, large)
+        self.assertEqual(Event.objects.get(id=self.events[1].id).day, 2)
+        global_orders = list(self.trip.events.order_by("day", "day_order").values_list("global_order", flat=True))
+        self.assertEqual(global_orders, list(range(1, 41)))
+
+    @patch("apps.events.views.GoogleMapsService.fetch_route")
+    def test_new_segments_are_written_with_one_insert(self, mock_fetch_route):
+        mock_fetch_route.return_value = {"durationMin": 5, "distanceKm": 1.5, "polyline": ""}
+        for idx, event in enumerate(self.events[:6]):
+            event.lat, event.lng = 37.50 + 0.02 * (idx + 1), 127.00
+            event.save()
+
+        payload = {
+            "events": [{"id": event.id, "order": (6 - idx) * 10} for idx, event in enumerate(self.events[:6])],
+            "recalculateRoutes": True,
+        }
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.patch(f"/api/trips/{self.trip.id}/events/reorder/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_fetch_route.call_count, 6)
+        self.assertEqual(RouteSegment.objects.filter(trip=self.trip).count(), 6)
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "route_segments"')]
+        self.assertEqual(len(inserts), 1)
+
+    @override_settings(ROUTE_IO_THREADS=0)  # 다른 요청의 버전 증가를 같은 테스트 트랜잭션에서 흉내
+    @patch("apps.events.views.GoogleMapsService.fetch_route")
+    def test_superseded_recompute_does_not_write_segments(self, mock_fetch_route):
+        for idx, event in enumerate(self.events[:3]):
+            event.lat, event.lng = 37.50 + 0.02 * (idx + 1), 127.00
+            event.save()
+
+        def concurrent_reorder(origin, destination):
+            # 경로 조회 중에 다른 요청이 순서를 바꿈
+            Trip.objects.get(id=self.trip.id).bump_route_version()
+            return {"durationMin": 5, "distanceKm": 1.5, "polyline": ""}
+
+        mock_fetch_route.side_effect = concurrent_reorder
+        stale = Trip.objects.get(id=self.trip.id)
+
+        payload = {
+            "events": [{"id": event.id, "order": (3 - idx) * 10} for idx, event in enumerate(self.events[:3])],
+            "recalculateRoutes": True,
+        }
+        resp = self.client.patch(f"/api/trips/{self.trip.id}/events/reorder/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(mock_fetch_route.called)
+        self.assertFalse(RouteSegment.objects.filter(trip=self.trip).exists())
+
+        # 오래된 인스턴스의 save()가 route_version을 되돌리지 않음
+        version = Trip.objects.get(id=self.trip.id).route_version
+        stale.title = "Renamed"
+        stale.save()
+        self.assertEqual(Trip.objects.get(id=self.trip.id).route_version, version)
+        self.assertEqual(Trip.objects.get(id=self.trip.id).title, "Renamed")
+
+    def test_events_from_other_trips_are_rejected(self):
+        other = Trip.objects.create(title="Other", city="Seoul", start_lat=37.5, start_lng=127.0)
+        stranger = Event.objects.create(trip=other, order=1, day=1)
+
+        resp = self.client.patch(
+            f"/api/trips/{self.trip.id}/events/reorder/",
+            {"events": [{"id": self.events[0].id, "order": 15}, {"id": stranger.id, "order": 5}]},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(Event.objects.get(id=self.events[0].id).day_order, 10)
+
+
+class EventOrderingTests(TestCase):
+    def setUp(self):
+        self.trip = Trip.objects.create(
+            title="Test Trip", city="Seoul", start_lat=37.50, start_lng=127.00, total_days=3,
+        )
+        self.events = {
+            (day, day_order): Event.objects.create(
+                trip=self.trip, order=1, global_order=0, day=day, day_order=day_order,
+            )
+            for day, day_order in [(2, 10), (1, 20), (3, 5), (1, 10), (2, 30)]
+        }
+
+    def global_orders(self):
+        return list(self.trip.events.order_by("day", "day_order").values_list("global_order", flat=True))
+
+    def test_recalculate_global_order_is_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            changed = ordering.recalculate_global_order(self.trip.id)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(changed, 5)
+        self.assertEqual(self.global_orders(), [1, 2, 3, 4, 5])
+        self.assertEqual(ordering.recalculate_global_order(self.trip.id), 0)
+
+    def test_recalculate_from_day_keeps_offset(self):
+        ordering.recalculate_global_order(self.trip.id)
+        Event.objects.filter(id=self.events[(2, 10)].id).update(day=3, day_order=10)
+
+        changed = ordering.recalculate_global_order(self.trip.id, from_day=2)
+
+        self.assertEqual(changed, 3)
+        self.assertEqual(self.global_orders(), [1, 2, 3, 4, 5])
+        self.assertEqual(Event.objects.get(id=self.events[(2, 10)].id).global_order, 5)
+
+    def test_renumber_day_orders(self):
+        ordering.renumber_day_orders(self.trip.id)
+
+        day_orders = list(self.trip.events.order_by("day", "day_order").values_list("day", "day_order"))
+        self.assertEqual(day_orders, [(1, 10), (1, 20), (2, 10), (2, 20), (3, 10)])
+
+
+class OrderKeyTests(TestCase):
+    def test_key_between_always_fits(self):
+        keys = []
+        for position in [0, 1, 1, 0, 4, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]:
+            lower = keys[position - 1] if position else None
+            upper = keys[position] if position < len(keys) else None
+            keys.insert(position, order_keys.key_between(lower, upper))
+
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        with self.assertRaises(ValueError):
+            order_keys.key_between(keys[1], keys[0])
+
+    def test_from_decimal_keeps_order(self):
+        keys = [order_keys.from_decimal(value) for value in ["-5", "0", "0.0001", "10", "15.5", "999999.9999"]]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_assign_order_keys_keeps_increasing_keys(self):
+        events = [Event(id=idx, order_key=key) for idx, key in enumerate(["a", "b", "c", "d"])]
+        # d를 a와 b 사이로
+        target = [events[0], events[3], events[1], events[2]]
+
+        changed = ordering.assign_order_keys(target)
+
+        self.assertEqual(changed, [events[3]])
+        self.assertTrue("a" < events[3].order_key < "b")
+
+
+class EventReorderOrderKeyTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=1)
+        self.first, self.second, self.dragged = [
+            Event.objects.create(trip=self.trip, order=idx + 1, global_order=idx + 1, day=1, day_order=(idx + 1) * 10)
+            for idx in range(3)
+        ]
+
+    def test_repeated_drag_only_rewrites_dragged_event(self):
+        keys = (self.first.order_key, self.second.order_key)
+
+        for _ in range(30):
+            resp = self.client.patch(
+                f"/api/trips/{self.trip.id}/events/reorder/",
+                {"events": [{"id": self.dragged.id, "order": 15}], "recalculateRoutes": False},
+                format="json",
+            )
+            self.assertEqual(resp.status_code, 200)
+            ids = [event["id"] for event in resp.json()["events"]]
+            self.assertEqual(ids, [self.first.id, self.dragged.id, self.second.id])
+
+            self.client.patch(
+                f"/api/trips/{self.trip.id}/events/reorder/",
+                {"events": [{"id": self.dragged.id, "order": 30}], "recalculateRoutes": False},
+                format="json",
+            )
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.order_key, self.second.order_key), keys)
+        self.assertEqual(self.first.day_order, 10)
+        self.assertEqual(self.second.day_order, 20)
+
+
+    def test_neighbour_drags_only_write_dragged_event(self):
+        events = [self.first, self.second, self.dragged] + [
+            Event.objects.create(trip=self.trip, order=idx + 1, global_order=idx + 1, day=1, day_order=(idx + 1) * 10)
+            for idx in range(3, 6)
+        ]
+        ids = [event.id for event in events]
+
+        def snapshot():
+            return {
+                event.id: (event.order_key, event.day_order, event.day, event.order, event.modified)
+                for event in Event.objects.filter(trip=self.trip)
+            }
+
+        # 매번 마지막 Event를 첫 Event 바로 뒤로 (이웃 키 간격이 계속 줄어듦)
+        for _ in range(60):
+            dragged = ids.pop()
+            ids.insert(1, dragged)
+            before = snapshot()
+            resp = self.client.patch(
+                f"/api/trips/{self.trip.id}/events/reorder/",
+                {"events": [{"id": dragged, "afterId": ids[0], "beforeId": ids[2]}], "recalculateRoutes": False},
+                format="json",
+            )
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual([event["id"] for event in resp.json()["events"]], ids)
+
+            after = snapshot()
+            self.assertEqual([event_id for event_id in ids if after[event_id] != before[event_id]], [dragged])
+
+    def test_anchor_must_be_in_target_day(self):
+        other_day = Event.objects.create(trip=self.trip, order=1, global_order=4, day=2, day_order=10)
+
+        resp = self.client.patch(
+            f"/api/trips/{self.trip.id}/events/reorder/",
+            {"events": [{"id": self.dragged.id, "afterId": other_day.id}], "recalculateRoutes": False},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.dragged.refresh_from_db()
+        self.assertEqual(self.dragged.day_order, 30)
+
+
+class EventMoveTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=2)
+
+        layout = {"A": (1, 10), "B": (1, 20), "C": (1, 30), "D": (2, 10), "E": (2, 20)}
+        self.events = {
+            name: Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1, day=day, day_order=day_order,
+                lat=37.50 + 0.02 * (idx + 1), lng=127.00,
+            )
+            for idx, (name, (day, day_order)) in enumerate(layout.items())
+        }
+        for from_name, to_name in [(None, "A"), ("A", "B"), ("B", "C"), ("D", "E")]:
+            RouteSegment.objects.create(
+                trip=self.trip,
+                from_event=self.events[from_name] if from_name else None,
+                to_event=self.events[to_name],
+                duration_min=10, distance_km=3,
+            )
+        self.trip.update_route_summary()
+
+    def pairs(self):
+        names = {event.id: name for name, event in self.events.items()}
+        return {
+            (names.get(seg.from_event_id), names[seg.to_event_id])
+            for seg in RouteSegment.objects.filter(trip=self.trip)
+        }
+
+    @patch("apps.events.views.GoogleMapsService.calculate_route")
+    def test_move_to_other_day_replaces_only_affected_segments(self, mock_calculate_route):
+        mock_calculate_route.return_value = {"durationMin": 7, "distanceKm": 2.0, "polyline": ""}
+        keys = {name: event.order_key for name, event in self.events.items()}
+
+        resp = self.client.post(
+            f"/api/trips/{self.trip.id}/events/{self.events['B'].id}/move/",
+            {"day": 2, "afterId": self.events["D"].id},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_calculate_route.call_count, 3)
+        self.assertEqual(len(resp.json()["deletedSegmentIds"]), 3)
+        self.assertEqual(self.pairs(), {(None, "A"), ("A", "C"), ("D", "B"), ("B", "E")})
+        self.assertEqual(resp.json()["routeSummary"]["totalDurationMin"], 10 + 7 * 3)
+
+        ordered = list(self.trip.events.order_by("global_order").values_list("id", "day", "order_key"))
+        self.assertEqual(
+            [event_id for event_id, _, _ in ordered],
+            [self.events[name].id for name in ["A", "C", "D", "B", "E"]],
+        )
+        for name in ["A", "C", "D", "E"]:
+            self.assertEqual(Event.objects.get(id=self.events[name].id).order_key, keys[name])
+
+    def test_move_rejects_non_adjacent_anchors(self):
+        resp = self.client.post(
+            f"/api/trips/{self.trip.id}/events/{self.events['C'].id}/move/",
+            {"day": 1, "afterId": self.events["A"].id, "beforeId": self.events["C"].id},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.post(
+            f"/api/trips/{self.trip.id}/events/{self.events['C'].id}/move/",
+            {"day": 1, "afterId": self.events["D"].id},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    def test_repeated_moves_between_same_neighbours_update_one_row(self):
+        a, b, c = (self.events[name] for name in "ABC")
+
+        # A 뒤로 B/C를 번갈아 옮김 (이웃 키 간격이 계속 줄어듦)
+        for idx in range(50):
+            moved, other = (c, b) if idx % 2 == 0 else (b, c)
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(
+                    f"/api/trips/{self.trip.id}/events/{moved.id}/move/",
+                    {"day": 1, "afterId": a.id, "beforeId": other.id, "recalculateRoutes": False},
+                    format="json",
+                )
+            self.assertEqual(resp.status_code, 200)
+
+            # global_order(순위) 재계산 UPDATE를 빼면 옮긴 행 하나만 씀
+            row_updates = [
+                query["sql"] for query in ctx.captured_queries
+                if 'UPDATE "events"' in query["sql"] and "SET global_order" not in query["sql"]
+            ]
+            self.assertEqual(len(row_updates), 1)
+            self.assertIn(f'"id" = {moved.id}', row_updates[0])
+            self.assertEqual(
+                list(Event.objects.filter(trip=self.trip, day=1).order_by("order_key").values_list("id", flat=True)),
+                [a.id, moved.id, other.id],
+            )
+
+
+    @patch("apps.events.views.GoogleMapsService.calculate_route")
+    def test_destroy_bridges_neighbours_and_adjusts_summary(self, mock_calculate_route):
+        # 경로 조회는 I/O 풀 스레드에서 실행되므로 요청 스레드의 연결을 기준으로 확인
+        request_connection = connections["default"]
+        depth = len(request_connection.atomic_blocks)
+
+        def route_outside_transaction(origin, destination):
+            # 경로 API는 segment lock/트랜잭션 밖에서 호출
+            self.assertEqual(len(request_connection.atomic_blocks), depth)
+            return {"durationMin": 12, "distanceKm": 4.0, "polyline": ""}
+
+        mock_calculate_route.side_effect = route_outside_transaction
+
+        resp = self.client.delete(f"/api/trips/{self.trip.id}/events/{self.events['B'].id}/")
+
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(mock_calculate_route.call_count, 1)
+        self.assertEqual(self.pairs(), {(None, "A"), ("A", "C"), ("D", "E")})
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 40 - 20 + 12)
+        self.assertEqual(float(self.trip.total_distance_km), 12 - 6 + 4)
+
+    @patch("apps.events.views.GoogleMapsService.calculate_route")
+    def test_location_update_recomputes_only_adjacent_segments(self, mock_calculate_route):
+        mock_calculate_route.return_value = {"durationMin": 15, "distanceKm": 5.0, "polyline": ""}
+        untouched = set(
+            RouteSegment.objects.filter(to_event__in=[self.events["A"], self.events["E"]]).values_list("id", flat=True)
+        )
+
+        resp = self.client.patch(
+            f"/api/trips/{self.trip.id}/events/{self.events['B'].id}/",
+            {"lat": "37.6000", "lng": "127.0500"},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_calculate_route.call_count, 2)
+        self.assertEqual(self.pairs(), {(None, "A"), ("A", "B"), ("B", "C"), ("D", "E")})
+        self.assertTrue(untouched <= set(RouteSegment.objects.values_list("id", flat=True)))
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 10 * 2 + 15 * 2)
+
+
+class EventBulkCreateTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=2)
+        self.existing = Event.objects.create(
+            trip=self.trip, order=1, global_order=1, day=2, day_order=10, lat=37.60, lng=127.00,
+        )
+
+    @patch("apps.routes.services.GoogleMapsService.calculate_route_chain")
+    def test_bulk_create_orders_events_and_computes_segments_once(self, mock_chain):
+        mock_chain.side_effect = lambda points, deadline=None: [
+            {"durationMin": 5, "distanceKm": 1.5, "polyline": "abc"} for _ in points[1:]
+        ]
+        payload = {
+            "events": [
+                {"placeName": "A", "lat": 37.52, "lng": 127.00, "day": 1},
+                {"placeName": "B", "lat": 37.54, "lng": 127.00, "day": 1},
+                {"placeName": "bad", "lat": "north"},
+                {"placeName": "C", "lat": 37.62, "lng": 127.00, "day": 2},
+            ],
+        }
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/bulk/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 201)
+        body = resp.json()
+        self.assertEqual([result["status"] for result in body["results"]], ["created", "created", "invalid", "created"])
+        self.assertIn("lat", body["results"][2]["errors"])
+        # day 1: 시작 → A → B (체인 1개), day 2: 기존 → C (체인 1개)
+        self.assertEqual(mock_chain.call_count, 2)
+        self.assertEqual(len(body["segments"]), 3)
+        self.assertEqual(body["routeSummary"]["totalDurationMin"], 15)
+
+        names = list(self.trip.events.order_by("global_order").values_list("place_name", flat=True))
+        self.assertEqual(names, ["A", "B", "", "C"])
+        self.assertEqual(
+            list(self.trip.events.order_by("global_order").values_list("global_order", flat=True)), [1, 2, 3, 4]
+        )
+
+    def test_bulk_create_without_valid_items_is_rejected(self):
+        resp = self.client.post(
+            f"/api/trips/{self.trip.id}/events/bulk/", {"events": [{"lat": "north"}]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(self.trip.events.exclude(id=self.existing.id).exists())
+
+
+class EventBatchTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(total_days=1)
+        self.first, self.second, self.third = [
+            Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1, day=1, day_order=(idx + 1) * 10,
+                lat=37.52 + 0.02 * idx, lng=127.00,
+            )
+            for idx in range(3)
+        ]
+
+    @patch("apps.routes.services.GoogleMapsService.calculate_route_chain")
+    def test_operations_apply_together_and_segments_are_computed_once(self, mock_chain):
+        mock_chain.side_effect = lambda points, deadline=None: [
+            {"durationMin": 4, "distanceKm": 1.0, "polyline": ""} for _ in points[1:]
+        ]
+        payload = {
+            "operations": [
+                {"op": "create", "ref": "new", "data": {"placeName": "N", "lat": 37.60, "lng": 127.00, "day": 1}},
+                {"op": "update", "id": self.first.id, "data": {"memo": "점심"}},
+                {"op": "move", "ref": "new", "data": {"day": 1, "afterId": self.first.id}},
+                {"op": "delete", "id": self.third.id},
+                {"op": "setRoute", "ref": "new", "data": {"travelMode": "WALKING"}},
+            ],
+        }
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        new_id = body["results"][0]["id"]
+        self.assertEqual([event["id"] for event in body["events"]], [self.first.id, new_id, self.second.id])
+        self.assertEqual([event["globalOrder"] for event in body["events"]], [1, 2, 3])
+        self.assertEqual(body["events"][0]["memo"], "점심")
+        # 시작 → first → new → second 를 체인 요청 한 번으로
+        self.assertEqual(mock_chain.call_count, 1)
+        self.assertEqual(len(body["segments"]), 3)
+        self.assertEqual(
+            RouteSegment.objects.get(from_event_id=new_id, to_event_id=self.second.id).travel_mode, "WALKING"
+        )
+
+    def test_delete_without_recalculation_subtracts_lost_segments_from_summary(self):
+        segments = [
+            (None, self.first, 5, "1.5"), (self.first, self.second, 7, "2.0"), (self.second, self.third, 9, "3.0"),
+        ]
+        for from_event, to_event, duration, distance in segments:
+            RouteSegment.objects.create(
+                trip=self.trip, from_event=from_event, to_event=to_event, duration_min=duration, distance_km=distance
+            )
+        self.trip.update_route_summary()
+        payload = {"operations": [{"op": "delete", "id": self.second.id}], "recalculateRoutes": False}
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 5)
+        self.assertEqual(self.trip.total_distance_km, Decimal("1.5"))
+
+    def test_failed_operation_rolls_back_everything(self):
+        payload = {
+            "operations": [
+                {"op": "update", "id": self.first.id, "data": {"memo": "바뀌면 안 됨"}},
+                {"op": "delete", "id": self.second.id},
+                {"op": "move", "id": self.third.id, "data": {"day": 1, "afterId": self.second.id}},
+            ],
+            "recalculateRoutes": False,
+        }
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"]["index"], 2)
+        self.assertTrue(Event.objects.filter(id=self.second.id).exists())
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.memo, "")
+
+    def test_failure_after_operations_is_not_attributed_to_an_item(self):
+        payload = {"operations": [{"op": "delete", "id": self.second.id}], "recalculateRoutes": False}
+
+        with patch(
+            "apps.events.views.TripEventViewSet._recalculate_global_order",
+            side_effect=ValidationError({"detail": "순서를 다시 계산하지 못했습니다."}),
+        ):
+            resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertNotIn("index", resp.json().get("error", {}))
+        self.assertTrue(Event.objects.filter(id=self.second.id).exists())
+
+    def test_update_changing_day_appends_to_new_day(self):
+        other = Event.objects.create(
+            trip=self.trip, order=4, global_order=4, day=2, day_order=10, order_key="V", lat=37.60, lng=127.00,
+        )
+        payload = {
+            "operations": [{"op": "update", "id": self.first.id, "data": {"day": 2}}],
+            "recalculateRoutes": False,
+        }
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        day_two = [event["id"] for event in resp.json()["events"] if event["day"] == 2]
+        self.assertEqual(day_two, [other.id, self.first.id])
+        self.first.refresh_from_db()
+        self.assertGreater(self.first.order_key, other.order_key)
+        self.assertGreater(self.first.day_order, other.day_order)
+
+    def test_set_route_without_segment_needs_recalculation(self):
+        payload = {
+            "operations": [
+                {"op": "update", "id": self.first.id, "data": {"memo": "바뀌면 안 됨"}},
+                {"op": "setRoute", "id": self.first.id, "data": {"travelMode": "WALKING"}},
+            ],
+            "recalculateRoutes": False,
+        }
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/events/batch/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"]["index"], 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.memo, "")
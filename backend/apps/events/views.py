@@ -6,25 +6,36 @@ from rest_framework import mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.db import models as django_models
+from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from concurrent.futures import ThreadPoolExecutor
 
 from apps.trips.models import Trip
 from apps.trips.permissions import TripMemberPermission
 from apps.users.authentication import JWTAuthentication
 from apps.routes.models import RouteSegment
 from apps.routes.serializers import RouteSegmentModelSerializer
-from apps.routes.services import GoogleMapsService
+from apps.routes.segments import (
+    RecomputeSuperseded, ensure_current, fetch_segments, recompute_lock, segment_pair, segment_pairs,
+    store_segments, superseded_segments
+)
+from apps.routes import io_pool, trip_matrix
+from apps.routes.services import GoogleMapsService, RouteOptimizer, estimate_leg, short_hop_leg
 from .models import Event
+from . import order_keys, ordering
 from .serializers import (
     EventSerializer, EventCreateSerializer, EventUpdateSerializer,
     EventReorderSerializer, EventReorderResponseSerializer,
-    EventCreateResponseSerializer
+    EventMoveSerializer, EventMoveResponseSerializer,
+    EventBulkCreateSerializer, EventBulkCreateResponseSerializer,
+    EventBatchSerializer, EventBatchSetRouteSerializer, EventBatchResponseSerializer,
+    EventCreateResponseSerializer, EventRouteRefreshSerializer,
+    EventInsertionQuerySerializer, EventInsertionResponseSerializer
 )
 
 
@@ -40,7 +51,7 @@ class TripEventViewSet(mixins.CreateModelMixin,
     
     def get_queryset(self):
         trip_id = self.kwargs.get('trip_id')
-        return Event.objects.filter(trip_id=trip_id).order_by('day', 'day_order')
+        return Event.objects.filter(trip_id=trip_id).order_by('day', 'order_key')
     
     def get_trip(self):
         """Trip 가져오기 및 권한 체크"""
@@ -99,9 +110,8 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
         # day 결정
         target_day = data.get('day') or trip.total_days or 1
         
-        # day_order 계산 (해당 day의 마지막 order + 10)
-        last_event_in_day = trip.events.filter(day=target_day).order_by('-day_order').first()
-        day_order = (last_event_in_day.day_order + Decimal('10.0')) if last_event_in_day else Decimal('10.0')
+        # day_order/order_key 계산 (해당 day의 마지막 Event 뒤)
+        day_order, order_key = self._tail_position(trip, target_day)
         
         # global_order 계산
         last_event = trip.events.order_by('-global_order').first()
@@ -109,23 +119,14 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
         order = global_order  # 하위 호환
         
         # Event 생성
-        event = Event.objects.create(
-            trip=trip,
-            order=order,
-            global_order=global_order,
-            day_order=day_order,
-            place_id=data.get('placeId', ''),
-            place_name=data.get('placeName', ''),
-            lat=data.get('lat'),
-            lng=data.get('lng'),
-            address=data.get('address', ''),
-            activity_type=data.get('activityType', ''),
-            custom_title=data.get('customTitle', ''),
-            day=target_day,
-            start_time=data.get('startTime', ''),
-            duration_min=data.get('durationMin'),
-            memo=data.get('memo', '')
-        )
+        event = self._build_event(trip, data, target_day, order, global_order, day_order, order_key)
+        event.save()
+        # 마지막 day가 아니면 뒤 day들의 global_order도 밀려야 함
+        if ordering.recalculate_global_order(trip.id, from_day=target_day):
+            event.refresh_from_db(fields=['global_order'])
+        trip.bump_route_version()
+        
+        trip_matrix.refresh(trip)
         
         # TODO: cost와 currency는 추후 Cost 모델로 저장
         # if data.get('cost'):
@@ -139,14 +140,10 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
         segments = None
         if recalculate:
             try:
-                existing_segments_map = {
-                    (seg.from_event_id, seg.to_event_id): seg
-                    for seg in trip.route_segments.all()
-                }
                 # Event 생성 직후에는 생성된 Event가 아직 트랜잭션에 묶여있을 수 있어
                 # (특히 테스트 환경에서) 별도 스레드에서 FK 조회가 실패할 수 있습니다.
                 # 따라서 여기서는 병렬 처리 없이 순차 재계산합니다.
-                segments = self._recalculate_segments_sequential(trip, existing_segments_map)
+                segments = self._recalculate_segments_sequential(trip)
             except Exception as e:
                 # Event는 생성되었으므로, segments 계산 실패는 best-effort로 처리
                 print(f"❌ Event 생성 후 RouteSegment 재계산 실패: {e}")
@@ -159,61 +156,222 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
 
         return Response(response_data, status=status.HTTP_201_CREATED)
 
-    def _recalculate_segments_sequential(self, trip, existing_segments_map):
+    def _tail_position(self, trip, day):
+        """day의 마지막 Event 뒤 (day_order, order_key)"""
+        last_event_in_day = trip.events.filter(day=day, order_key__isnull=False).order_by('-order_key').first()
+        day_order = (last_event_in_day.day_order + Decimal('10.0')) if last_event_in_day else Decimal('10.0')
+        order_key = order_keys.key_between(last_event_in_day.order_key if last_event_in_day else None, None)
+        return day_order, order_key
+    
+    def _build_event(self, trip, data, day, order, global_order, day_order, order_key):
+        """검증된 생성 요청 → 저장 전 Event"""
+        return Event(
+            trip=trip,
+            order=order,
+            global_order=global_order,
+            day_order=day_order,
+            order_key=order_key,
+            place_id=data.get('placeId', ''),
+            place_name=data.get('placeName', ''),
+            lat=data.get('lat'),
+            lng=data.get('lng'),
+            address=data.get('address', ''),
+            activity_type=data.get('activityType', ''),
+            custom_title=data.get('customTitle', ''),
+            day=day,
+            start_time=data.get('startTime', ''),
+            duration_min=data.get('durationMin'),
+            memo=data.get('memo', '')
+        )
+    
+    @swagger_auto_schema(
+        operation_summary="Event 일괄 추가",
+        operation_description="""
+여러 Event를 한 번에 추가합니다 (예: 계획된 일정 가져오기). 각 Event는 지정한 day의 마지막에 요청 순서대로 추가됩니다.
+
+**동작:**
+- 항목마다 `POST /events/`와 같은 규칙으로 검증하고, 유효한 항목만 한 번의 `bulk_create`로 저장합니다.
+- order_key/day_order/global_order는 메모리에서 계산합니다 (global_order는 UPDATE 1회).
+- RouteSegment는 마지막에 한 번만 diff해서 새 구간을 일괄 계산합니다.
+  - `segmentMode=waypoints` (기본): day의 연속 구간을 Directions API 경유지 요청 하나로 (polyline 포함)
+  - `segmentMode=matrix`: Distance Matrix API로 시간/거리만 (polyline 없음)
+  - 아주 가까운 구간은 API 없이 도보 추정, API 결과가 없는 구간은 추정치(`localEstimate: true`)로 저장합니다.
+- `results`에 항목별 결과(`created` + id 또는 `invalid` + errors)를 입력 순서대로 반환합니다.
+
+**예시:**
+```json
+{
+  "events": [
+    { "placeName": "경복궁", "lat": 37.5796, "lng": 126.9770, "day": 1 },
+    { "placeName": "북촌", "lat": 37.5826, "lng": 126.9831, "day": 1 }
+  ],
+  "segmentMode": "waypoints"
+}
+```
+        """,
+        tags=['events'],
+        request_body=EventBulkCreateSerializer,
+        responses={
+            201: openapi.Response(description='생성 성공 (일부 항목이 invalid일 수 있음)', schema=EventBulkCreateResponseSerializer),
+            400: openapi.Response(description='유효한 항목이 없음'),
+            403: openapi.Response(description='권한 없음')
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, trip_id=None):
+        """Event 일괄 추가 + RouteSegment 일괄 계산"""
+        trip = self.get_trip()
+        serializer = EventBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # 1. 항목별 검증
+        results = []
+        valid = []
+        for index, item in enumerate(serializer.validated_data['events']):
+            item_serializer = EventCreateSerializer(data=item)
+            if item_serializer.is_valid():
+                results.append({'index': index, 'status': 'created', 'id': None})
+                valid.append((index, item_serializer.validated_data))
+            else:
+                results.append({'index': index, 'status': 'invalid', 'id': None, 'errors': item_serializer.errors})
+        
+        if not valid:
+            return Response({'results': results}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 2. 순서 계산 (day별 마지막 Event 뒤, 요청 순서대로)
+        items_by_day = {}
+        for index, data in valid:
+            items_by_day.setdefault(data.get('day') or trip.total_days or 1, []).append((index, data))
+        
+        tails = {}
+        for event in (
+            trip.events.filter(day__in=list(items_by_day), order_key__isnull=False)
+            .order_by('day', '-order_key').distinct('day').only('id', 'day', 'day_order', 'order_key')
+        ):
+            tails[event.day] = event
+        last_event = trip.events.order_by('-global_order').only('global_order').first()
+        next_global = (last_event.global_order + 1) if last_event else 1
+        
+        new_events = {}
+        for day, items in items_by_day.items():
+            tail = tails.get(day)
+            keys = order_keys.keys_between(tail.order_key if tail else None, None, len(items))
+            day_order = tail.day_order if tail else Decimal('0')
+            for (index, data), key in zip(items, keys):
+                day_order += Decimal('10.0')
+                new_events[index] = self._build_event(trip, data, day, next_global, next_global, day_order, key)
+                next_global += 1
+        
+        # 3. 저장 (INSERT 1회 + global_order UPDATE 1회)
+        with transaction.atomic():
+            created = Event.objects.bulk_create([new_events[index] for index, _ in valid])
+            ordering.recalculate_global_order(trip.id, from_day=min(items_by_day))
+            version = trip.bump_route_version()
+        for result in results:
+            if result['index'] in new_events:
+                result['id'] = new_events[result['index']].id
+        
+        trip_matrix.refresh(trip)
+        
+        # 4. RouteSegment 일괄 계산
+        response_data = {'results': results}
+        if serializer.validated_data['recalculateRoutes']:
+            try:
+                segments = self._recalculate_segments_batch(trip, serializer.validated_data['segmentMode'], version)
+            except RecomputeSuperseded as e:
+                segments = superseded_segments(trip, e)
+            response_data['segments'] = RouteSegmentModelSerializer(segments, many=True).data
+            response_data['routeSummary'] = trip.route_summary
+        
+        response_data['events'] = EventSerializer(
+            trip.events.filter(id__in=[event.id for event in created]).order_by('global_order'), many=True
+        ).data
+        return Response(response_data, status=status.HTTP_201_CREATED)
+    
+    def _recalculate_segments_batch(self, trip, mode='waypoints', version=None, route_fields=None):
         """
-        Diff 기반 재계산을 하되, segments 생성은 순차적으로 수행합니다.
+        Diff 기반 재계산 - 새 구간을 한 번에 계산해 bulk_create
 
-        - Event 생성 직후 호출되는 케이스에서 병렬 생성 시 FK 가시성 문제가 발생할 수 있어
-          (특히 테스트/트랜잭션 환경) 안정성을 우선합니다.
+        - waypoints: day 안에서 이어지는 새 구간들을 Directions API 경유지 요청으로 묶음
+        - matrix: Distance Matrix API (get_legs) - polyline 없음
+        - API 호출은 트랜잭션/lock 밖에서 하고, 저장은 store_segments (version이 바뀌었으면 RecomputeSuperseded)
+        - route_fields: 저장과 함께 적용할 구간별 이동 수단/출발 시간 (store_segments 참고)
         """
-        all_events = list(Event.objects.filter(trip=trip).order_by('day', 'day_order'))
+        ensure_current(trip, version)
+        all_events = list(Event.objects.filter(trip=trip).order_by('day', 'order_key'))
         needed_pairs = self._calculate_segment_pairs(all_events)
+        existing = set(trip.route_segments.values_list('from_event_id', 'to_event_id'))
+        
+        events_map = {event.id: event for event in all_events}
+        to_create = [pair for pair in needed_pairs if pair not in existing]
+        locations = {
+            pair: (trip.start_location if pair[0] is None else events_map[pair[0]].location, events_map[pair[1]].location)
+            for pair in to_create
+        }
+        
+        # 아주 가까운 구간은 API 없이 도보 추정
+        routes = {}
+        for pair in to_create:
+            leg = short_hop_leg(*locations[pair], trip.city)
+            if leg:
+                routes[pair] = leg
+        pending = [pair for pair in to_create if pair not in routes]
+        
+        google_maps = GoogleMapsService(city=trip.city)
+        if mode == 'matrix':
+            legs = google_maps.get_legs([locations[pair] for pair in pending], fetch=True)
+            for pair, leg in zip(pending, legs):
+                routes[pair] = dict(leg, localEstimate=leg['estimated'])
+        else:
+            # 이어지는 구간끼리 체인으로 (A→B, B→C → A→B→C)
+            chains = []
+            for pair in pending:
+                if chains and chains[-1][-1][1] == pair[0]:
+                    chains[-1].append(pair)
+                else:
+                    chains.append([pair])
+            deadline = io_pool.deadline_after()
+            for chain in chains:
+                points = [locations[chain[0]][0]] + [locations[pair][1] for pair in chain]
+                for pair, leg in zip(chain, google_maps.calculate_route_chain(points, deadline=deadline)):
+                    routes[pair] = leg or dict(estimate_leg(*locations[pair], trip.city), localEstimate=True)
+        
+        store_segments(trip, [
+            RouteSegment(
+                trip=trip,
+                from_event=events_map.get(from_id),
+                to_event=events_map[to_id],
+                duration_min=round(routes[(from_id, to_id)]['durationMin']),
+                distance_km=round(routes[(from_id, to_id)]['distanceKm'], 2),
+                polyline=routes[(from_id, to_id)].get('polyline', ''),
+                travel_mode=routes[(from_id, to_id)].get('travelMode', 'DRIVING'),
+                local_estimate=routes[(from_id, to_id)].get('localEstimate', False)
+            )
+            for from_id, to_id in to_create
+        ], keep=set(needed_pairs), version=version, route_fields=route_fields)
+        return list(trip.route_segments.all())
+    
+    def _recalculate_segments_sequential(self, trip):
+        """
+        Diff 기반 재계산을 하되, segments 저장은 한 번에 수행합니다.
 
-        needed_set = set(needed_pairs)
-        existing_set = set(existing_segments_map.keys())
-
-        to_delete = existing_set - needed_set
+        - Event 생성 직후 호출되는 케이스에서 병렬 저장 시 FK 가시성 문제가 발생할 수 있어
+          (특히 테스트/트랜잭션 환경) 경로 조회만 I/O 풀에서 병렬로 하고 저장은 요청 스레드에서 합니다.
+        - API 호출은 lock 밖에서, 저장은 store_segments에서 합니다.
+        """
+        all_events = list(Event.objects.filter(trip=trip).order_by('day', 'order_key'))
+        needed_set = set(self._calculate_segment_pairs(all_events))
+        existing_set = set(trip.route_segments.values_list('from_event_id', 'to_event_id'))
         to_create = needed_set - existing_set
 
-        # 삭제
-        if to_delete:
-            delete_ids = [existing_segments_map[pair].id for pair in to_delete]
-            RouteSegment.objects.filter(id__in=delete_ids).delete()
-
         # 생성 (순차)
+        new_segments = []
         if to_create:
-            google_maps = GoogleMapsService()
             events_map = {e.id: e for e in all_events}
+            new_segments = self._build_segments(trip, sorted(to_create, key=str), events_map)
 
-            for from_id, to_id in to_create:
-                from_event = events_map.get(from_id) if from_id else None
-                to_event = events_map.get(to_id)
-
-                if not to_event or not to_event.location:
-                    continue
-
-                from_location = trip.start_location if from_event is None else from_event.location
-                if not from_location:
-                    continue
-
-                try:
-                    route = google_maps.calculate_route(from_location, to_event.location)
-                    if route:
-                        RouteSegment.objects.create(
-                            trip=trip,
-                            from_event=from_event,
-                            to_event=to_event,
-                            duration_min=route['durationMin'],
-                            distance_km=route['distanceKm'],
-                            polyline=route.get('polyline', ''),
-                            travel_mode='DRIVING'
-                        )
-                except Exception as e:
-                    print(f"❌ Segment 생성 실패 ({from_id}, {to_id}): {e}")
-
-        all_segments = list(trip.route_segments.all())
-        self._update_trip_summary(trip, all_segments)
-        return all_segments
+        store_segments(trip, new_segments, keep=needed_set)
+        return list(trip.route_segments.all())
     
     def update(self, request, trip_id=None, event_id=None):
         """Event 업데이트"""
@@ -223,8 +381,51 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # 필드 업데이트
-        for field, value in serializer.validated_data.items():
+        old_day = event.day
+        old_location = event.location
+        old_prev, old_next = self._day_neighbors(trip, old_day, event)
+        removed = {segment_pair(old_prev, event, old_day), segment_pair(event, old_next, old_day)}
+        
+        self._apply_update(event, serializer.validated_data)
+        day_changed = event.day != old_day
+        location_changed = event.location != old_location
+        
+        with transaction.atomic():
+            if day_changed:
+                new_prev = self._move_to_day_tail(trip, event)
+                added = {segment_pair(old_prev, old_next, old_day), segment_pair(new_prev, event, event.day)}
+            else:
+                new_prev = None
+                added = {segment_pair(old_prev, event, old_day), segment_pair(event, old_next, old_day)}
+            event.save()
+            if day_changed:
+                self._recalculate_global_order(trip, {old_day, event.day})
+            if day_changed or location_changed:
+                trip.bump_route_version()
+        
+        # 이웃 segment만 교체 (day 변경: 기존 자리를 잇고 새 day 끝에 연결, 위치 변경: 이 Event의 구간 재계산)
+        if day_changed or location_changed:
+            if location_changed:
+                trip_matrix.refresh(trip)
+            self._repair_segments(
+                trip, removed, added,
+                events=[event, old_prev, old_next, new_prev],
+                refresh_event_id=event.id if location_changed else None
+            )
+        
+        response_serializer = EventSerializer(event)
+        return Response(response_serializer.data)
+    
+    def _move_to_day_tail(self, trip, event):
+        """day가 바뀐 Event를 새 day의 마지막으로 (order_key/day_order만 설정, 저장은 호출하는 쪽) - 새 이전 Event"""
+        new_prev = trip.events.filter(day=event.day).exclude(id=event.id).order_by('-order_key').first()
+        event.order_key = order_keys.key_between(new_prev.order_key if new_prev else None, None)
+        event.day_order = self._day_order_between(new_prev, None)
+        return new_prev
+    
+    def _apply_update(self, event, validated_data):
+        """EventUpdateSerializer 결과를 Event 필드에 반영 (저장은 호출하는 쪽)"""
+        for field, value in validated_data.items():
             # camelCase를 snake_case로 변환
             field_name = field
             if field == 'placeName':
@@ -237,19 +438,14 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
                 field_name = 'start_time'
             elif field == 'durationMin':
                 field_name = 'duration_min'
+            elif field == 'placeId':
+                field_name = 'place_id'
             
             setattr(event, field_name, value)
-        
-        event.save()
-        
-        # Note: RouteSegment는 별도로 계산/저장됨
-        
-        response_serializer = EventSerializer(event)
-        return Response(response_serializer.data)
     
     @swagger_auto_schema(
         operation_summary="Event 업데이트",
-        operation_description="Event의 정보를 수정합니다.",
+        operation_description="Event의 정보를 수정합니다. 위치나 day가 바뀌면 앞뒤 구간만 다시 계산하고 Trip 총계를 증감합니다.",
         tags=['events'],
         request_body=EventUpdateSerializer,
         responses={
@@ -264,7 +460,7 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
     
     @swagger_auto_schema(
         operation_summary="Event 삭제",
-        operation_description="Event를 삭제합니다.",
+        operation_description="Event를 삭제합니다. 앞뒤 Event를 잇는 구간 하나만 계산하고 Trip 총계를 증감합니다.",
         tags=['events'],
         responses={
             204: openapi.Response(description='삭제 성공'),
@@ -276,9 +472,25 @@ Trip에 새로운 Event를 추가합니다. Day별 마지막에 자동으로 추
         """Event 삭제"""
         trip = self.get_trip()
         event = get_object_or_404(Event, id=event_id, trip=trip)
-        event.delete()
+        day = event.day
+        prev_event, next_event = self._day_neighbors(trip, day, event)
+        
+        with transaction.atomic():
+            # 이 Event의 segment는 CASCADE로 함께 삭제됨 (총계에서 빼기 위해 먼저 조회)
+            lost = list(trip.route_segments.filter(
+                django_models.Q(from_event=event) | django_models.Q(to_event=event)
+            ))
+            event.delete()
+            ordering.recalculate_global_order(trip.id, from_day=day)
+            trip.bump_route_version()
+        
+        trip_matrix.refresh(trip)
         
-        # Note: RouteSegment는 별도로 계산/저장됨
+        # 앞뒤 Event를 잇는 구간 하나만 계산 (캐시 → 로컬 그래프 → API)
+        self._repair_segments(
+            trip, removed=set(), added={segment_pair(prev_event, next_event, day)},
+            events=[prev_event, next_event], lost=lost
+        )
         
         return Response(status=status.HTTP_204_NO_CONTENT)
     
@@ -289,8 +501,10 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
 
 **특징:**
 - Diff 기반으로 변경된 segments만 재계산 (성능 최적화)
-- Day별 독립적 order 관리 (Decimal order)
-- 자동 rebalance (gap < 0.0001 시)
+- 위치는 `afterId`(이 Event 뒤) / `beforeId`(이 Event 앞)로 지정 (둘 다 없으면 day의 마지막)
+- `order`(하위 호환)는 위치 비교에만 쓰고 저장하지 않음 - 요청하지 않은 Event의 현재 `dayOrder`와 비교
+- Day 내부 정렬은 order_key(fractional index): 옮긴 Event의 키만 바뀌고 rebalance가 없음
+- `dayOrder`는 표시용으로 이웃 값에서 다시 정함 (같은 값이 나올 수 있으며 순서는 응답 목록 순서)
 - 병렬 API 호출로 빠른 재계산
 
 **성능:**
@@ -301,9 +515,8 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
 ```json
 {
   "events": [
-    { "id": 1, "order": 10.0, "day": 1 },
-    { "id": 2, "order": 20.0, "day": 1 },
-    { "id": 3, "order": 15.0, "day": 1 }  // 중간 삽입
+    { "id": 3, "afterId": 1, "beforeId": 2, "day": 1 },  // 1과 2 사이로
+    { "id": 4, "day": 2 }  // Day 2의 마지막으로
   ],
   "recalculateRoutes": true
 }
@@ -342,7 +555,8 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
                 }
             ),
             400: openapi.Response(description='잘못된 요청'),
-            403: openapi.Response(description='권한 없음')
+            403: openapi.Response(description='권한 없음'),
+            404: openapi.Response(description='Trip에 없는 Event 포함')
         }
     )
     @action(detail=False, methods=['patch'])
@@ -355,40 +569,42 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
         events_data = serializer.validated_data['events']
         recalculate = serializer.validated_data.get('recalculateRoutes', True)
         
-        # 1. 변경 전 segments 매핑 (Diff 계산용)
-        existing_segments_map = {
-            (seg.from_event_id, seg.to_event_id): seg
-            for seg in trip.route_segments.all()
-        }
-        
-        # 2. 트랜잭션으로 순서 업데이트
+        # 1~2. 트랜잭션으로 순서 업데이트 (Event 수와 무관하게 쿼리 수 일정)
         with transaction.atomic():
-            for event_data in events_data:
-                event = get_object_or_404(Event, id=event_data['id'], trip=trip)
-                event.day_order = Decimal(str(event_data['order']))
-                if 'day' in event_data:
-                    event.day = event_data['day']
-                # 하위 호환성을 위해 order도 업데이트
-                event.order = int(event_data['order'])
-                event.save(update_fields=['order', 'day_order', 'day', 'modified'])
+            # 참조된 Event를 한 번에 조회 (다른 Trip의 Event는 없는 것으로 처리)
+            events = trip.events.in_bulk([event_data['id'] for event_data in events_data])
+            missing = sorted({event_data['id'] for event_data in events_data} - set(events))
+            if missing:
+                raise NotFound(f'Trip에 없는 Event입니다: {missing}')
+            
+            # global_order는 옮겨진 Event의 (변경 전/후) 가장 앞 day부터만 다시 계산
+            touched_days = {event.day for event in events.values()}
             
-            # 3. Global order 재계산
-            self._recalculate_global_order(trip)
+            # 3. 요청한 위치대로 order_key 부여 (이미 순서가 맞는 키는 유지) - 바뀐 Event만 저장
+            changed = self._reorder_days(trip, events, events_data)
+            now = timezone.now()
+            for event in changed:
+                event.modified = now  # bulk_update는 auto_now 필드를 갱신하지 않음
+            if changed:
+                Event.objects.bulk_update(changed, ['order', 'day_order', 'day', 'order_key', 'modified'])
             
-            # 4. Day별 rebalance 체크
-            affected_days = set(event_data.get('day', 1) for event_data in events_data)
-            for day in affected_days:
-                self._check_and_rebalance_day(trip, day)
+            # 4. Global order 재계산 (UPDATE 1회) + 진행 중인 이전 순서의 재계산 무효화
+            touched_days |= {event.day for event in events.values()}
+            self._recalculate_global_order(trip, touched_days)
+            version = trip.bump_route_version()
         
-        # 5. RouteSegment 재계산 (선택적, Diff 기반)
+        # 5. RouteSegment 재계산 (선택적, Diff 기반 - 기존 segment는 Trip lock 안에서 조회)
         segments = []
         if recalculate:
-            segments = self._smart_recalculate_segments(trip, existing_segments_map)
+            try:
+                segments = self._smart_recalculate_segments(trip, version)
+            except RecomputeSuperseded as e:
+                segments = superseded_segments(trip, e)
         else:
             segments = list(trip.route_segments.all())
         
         # 6. 응답
-        updated_events = trip.events.all().order_by('day', 'day_order')
+        updated_events = trip.events.all().order_by('day', 'order_key')
         
         response_data = {
             'events': EventSerializer(updated_events, many=True).data,
@@ -398,157 +614,639 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
         
         return Response(response_data)
     
-    def _recalculate_global_order(self, trip):
-        """모든 day를 고려하여 global_order 계산"""
-        all_events = Event.objects.filter(trip=trip).order_by('day', 'day_order')
-        
-        for idx, event in enumerate(all_events):
-            event.global_order = idx + 1
-            event.save(update_fields=['global_order'])
-    
-    def _check_and_rebalance_day(self, trip, day):
-        """Day 내부 order gap 체크 및 rebalance"""
-        events = list(Event.objects.filter(trip=trip, day=day).order_by('day_order'))
-        
-        if len(events) < 2:
-            return
-        
-        MIN_GAP = Decimal('0.0001')
-        needs_rebalance = False
-        
-        # Gap 체크
-        for i in range(len(events) - 1):
-            gap = events[i + 1].day_order - events[i].day_order
-            if gap < MIN_GAP:
-                needs_rebalance = True
-                break
-        
-        if needs_rebalance:
-            print(f"⚠️ Day {day} rebalancing triggered (gap < {MIN_GAP})")
-            # 10, 20, 30... 으로 재배치
-            for idx, event in enumerate(events):
-                event.day_order = Decimal((idx + 1) * 10)
-                event.order = (idx + 1) * 10  # 하위 호환
-                event.save(update_fields=['day_order', 'order'])
-    
-    def _smart_recalculate_segments(self, trip, existing_segments_map):
-        """Diff 기반으로 변경된 segments만 재계산"""
-        # 1. 새 순서에서 필요한 segment pairs 계산
-        all_events = list(Event.objects.filter(trip=trip).order_by('day', 'day_order'))
-        needed_pairs = self._calculate_segment_pairs(all_events)
+    @swagger_auto_schema(
+        operation_summary="Event 일괄 변경 (트랜잭션)",
+        operation_description="""
+여러 Event 변경(create/update/move/delete/setRoute)을 순서대로 하나의 트랜잭션에 적용합니다.
+하나라도 실패하면 전체가 취소되고, 실패한 항목의 `index`와 사유를 반환합니다.
+
+**동작:**
+- 권한 확인/Trip 조회는 요청당 한 번, global_order 재계산도 마지막에 한 번 (UPDATE 1회)
+- RouteSegment는 모든 변경이 끝난 뒤 최종 순서 기준으로 한 번만 diff/계산합니다 (`segmentMode`는 bulk와 동일).
+- `setRoute`는 최종 순서에서 그 Event → 다음 Event 구간에 이동 수단/출발 시간을 적용합니다.
+  아직 없는 구간은 `recalculateRoutes=true`여야 하며(아니면 400), 재계산이 더 최근 변경에 밀려 중단되면
+  그 항목의 결과에 `error`가 붙습니다.
+- `update`로 day가 바뀌면 PATCH와 같이 새 day의 마지막으로 옮깁니다.
+- `recalculateRoutes=false`여도 `delete`로 함께 지워진 구간만큼은 Trip 총 이동 시간/거리에서 뺍니다.
+- `create`에 `ref`를 붙이면 뒤 항목에서 `id` 대신 `ref`(move의 경우 `afterRef`/`beforeRef`)로 참조할 수 있습니다.
+
+**예시:**
+```json
+{
+  "operations": [
+    { "op": "create", "ref": "new", "data": { "placeName": "북촌", "lat": 37.5826, "lng": 126.9831, "day": 1 } },
+    { "op": "update", "id": 12, "data": { "memo": "점심" } },
+    { "op": "move", "ref": "new", "data": { "day": 1, "afterId": 12 } },
+    { "op": "setRoute", "id": 12, "data": { "travelMode": "WALKING" } },
+    { "op": "delete", "id": 15 }
+  ]
+}
+```
+        """,
+        tags=['events'],
+        request_body=EventBatchSerializer,
+        responses={
+            200: openapi.Response(description='적용 성공', schema=EventBatchResponseSerializer),
+            400: openapi.Response(description='잘못된 항목 (전체 취소)'),
+            403: openapi.Response(description='권한 없음'),
+            404: openapi.Response(description='Event를 찾을 수 없음 (전체 취소)')
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def batch(self, request, trip_id=None):
+        """Event 변경 여러 개를 한 트랜잭션에 적용 + RouteSegment 한 번 재계산"""
+        trip = self.get_trip()
+        serializer = EventBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        needed_set = set(needed_pairs)
-        existing_set = set(existing_segments_map.keys())
+        state = {'refs': {}, 'days': set(), 'routes': [], 'locations': False, 'relocated': set(), 'lost': []}
+        results = []
+        failed = None
+        try:
+            with transaction.atomic():
+                for index, operation in enumerate(serializer.validated_data['operations']):
+                    failed = (index, operation['op'])
+                    event_id = self._apply_batch_operation(trip, index, operation, state)
+                    results.append({'index': index, 'op': operation['op'], 'id': event_id})
+                
+                recalculate = serializer.validated_data['recalculateRoutes']
+                if state['lost'] and not recalculate:
+                    # 재계산하지 않아도 삭제된 Event의 segment(CASCADE)만큼은 총계에서 뺌
+                    trip.add_route_delta(
+                        -sum(seg.duration_min for seg in state['lost']),
+                        -sum(float(seg.distance_km) for seg in state['lost'])
+                    )
+                if state['relocated'] and recalculate:
+                    trip.route_segments.filter(
+                        django_models.Q(from_event_id__in=state['relocated'])
+                        | django_models.Q(to_event_id__in=state['relocated'])
+                    ).delete()
+                
+                # 이미 있는 구간은 이 트랜잭션에서 바로, 새로 계산할 구간은 저장할 때 같은 lock 안에서 적용
+                pending_routes = {}
+                for index, event_id, fields in state['routes']:
+                    failed = (index, 'setRoute')
+                    pair = self._resolve_route_setting(trip, event_id)
+                    if RouteSegment.objects.filter(trip=trip, from_event_id=pair[0], to_event_id=pair[1]).update(**fields):
+                        continue
+                    if not recalculate:
+                        raise ValidationError({'detail': '아직 계산되지 않은 구간입니다. recalculateRoutes=true로 요청하세요.'})
+                    indexes, pending_fields = pending_routes.setdefault(pair, ([], {}))
+                    indexes.append(index)
+                    pending_fields.update(fields)
+                failed = None
+                
+                if state['days']:
+                    self._recalculate_global_order(trip, state['days'])
+                version = trip.bump_route_version()
+        except (ValidationError, NotFound, Http404) as e:
+            if failed is None:
+                # 특정 항목이 아닌 마지막 단계의 실패 - 일반 에러 응답 (전체 취소는 동일)
+                raise
+            code = status.HTTP_400_BAD_REQUEST if isinstance(e, ValidationError) else status.HTTP_404_NOT_FOUND
+            return Response({
+                'error': {
+                    'code': 'BATCH_OPERATION_FAILED',
+                    'message': f'{failed[0]}번째 항목({failed[1]})을 적용하지 못해 전체를 취소했습니다.',
+                    'index': failed[0],
+                    'op': failed[1],
+                    'detail': e.detail if isinstance(e, ValidationError) else str(e)
+                }
+            }, status=code)
         
-        # 2. Diff 계산
-        to_delete = existing_set - needed_set
-        to_create = needed_set - existing_set
+        if state['locations']:
+            trip_matrix.refresh(trip)
         
-        print(f"📊 RouteSegment diff:")
-        print(f"  - 삭제: {len(to_delete)}개")
-        print(f"  - 추가: {len(to_create)}개")
-        print(f"  - 재사용: {len(needed_set & existing_set)}개")
+        response_data = {'results': results}
+        if recalculate:
+            try:
+                self._recalculate_segments_batch(
+                    trip, serializer.validated_data['segmentMode'], version,
+                    route_fields={pair: fields for pair, (_, fields) in pending_routes.items()}
+                )
+            except RecomputeSuperseded as e:
+                superseded_segments(trip, e)
+                # 구간이 저장되지 않았으므로 새로 계산할 구간의 setRoute는 적용되지 않음
+                for indexes, _ in pending_routes.values():
+                    for index in indexes:
+                        results[index]['error'] = {
+                            'code': 'ROUTE_NOT_APPLIED',
+                            'message': '더 최근 변경으로 구간 재계산이 중단되어 경로 설정을 적용하지 못했습니다.'
+                        }
+        if recalculate:
+            response_data['segments'] = RouteSegmentModelSerializer(trip.route_segments.all(), many=True).data
+            response_data['routeSummary'] = trip.route_summary
         
-        # 3. 삭제
-        if to_delete:
-            delete_ids = [existing_segments_map[pair].id for pair in to_delete]
-            RouteSegment.objects.filter(id__in=delete_ids).delete()
+        response_data['events'] = EventSerializer(trip.events.all().order_by('day', 'order_key'), many=True).data
+        return Response(response_data)
+    
+    def _apply_batch_operation(self, trip, index, operation, state):
+        """일괄 변경 항목 하나 적용 (segment는 건드리지 않음) - 대상 Event id"""
+        op = operation['op']
+        data = operation['data']
+        refs = state['refs']
         
-        # 4. 생성 (병렬 처리)
-        if to_create:
-            self._create_segments_parallel(trip, list(to_create), all_events)
+        if op == 'create':
+            item = EventCreateSerializer(data=data)
+            item.is_valid(raise_exception=True)
+            day = item.validated_data.get('day') or trip.total_days or 1
+            day_order, order_key = self._tail_position(trip, day)
+            event = self._build_event(trip, item.validated_data, day, 0, 0, day_order, order_key)
+            event.save()
+            if operation.get('ref'):
+                if operation['ref'] in refs:
+                    raise ValidationError({'ref': f"이미 사용한 ref입니다: {operation['ref']}"})
+                refs[operation['ref']] = event.id
+            state['days'].add(day)
+            state['locations'] = True
+            return event.id
         
-        # 5. 모든 segments 조회 및 Trip 요약 업데이트
-        all_segments = list(trip.route_segments.all())
-        self._update_trip_summary(trip, all_segments)
+        event_id = self._batch_event_id(operation.get('id'), operation.get('ref'), refs, 'id')
+        event = get_object_or_404(trip.events.select_for_update(), id=event_id)
         
-        return all_segments
+        if op == 'update':
+            item = EventUpdateSerializer(data=data)
+            item.is_valid(raise_exception=True)
+            old_day = event.day
+            state['days'].add(old_day)
+            old_location = event.location
+            self._apply_update(event, item.validated_data)
+            if event.day != old_day:
+                # PATCH와 같이 새 day의 마지막으로
+                self._move_to_day_tail(trip, event)
+            event.save()
+            state['days'].add(event.day)
+            if event.location != old_location:
+                # 쌍은 그대로여도 구간이 바뀌므로 마지막 재계산에서 다시 만들도록 삭제
+                state['locations'] = True
+                state['relocated'].add(event.id)
+        elif op == 'move':
+            data = dict(data)
+            for field in ('after', 'before'):
+                if f'{field}Ref' in data:
+                    data[f'{field}Id'] = self._batch_event_id(None, data.pop(f'{field}Ref'), refs, f'{field}Ref')
+            item = EventMoveSerializer(data=data)
+            item.is_valid(raise_exception=True)
+            state['days'] |= {event.day, item.validated_data['day']}
+            self._place_event(
+                trip, event, item.validated_data['day'],
+                item.validated_data.get('afterId'), item.validated_data.get('beforeId')
+            )
+        elif op == 'delete':
+            state['days'].add(event.day)
+            state['locations'] = True
+            # 이 Event의 segment는 CASCADE로 함께 삭제됨 (총계에서 빼기 위해 먼저 조회)
+            state['lost'].extend(trip.route_segments.filter(
+                django_models.Q(from_event=event) | django_models.Q(to_event=event)
+            ))
+            event.delete()
+        elif op == 'setRoute':
+            item = EventBatchSetRouteSerializer(data=data)
+            item.is_valid(raise_exception=True)
+            fields = {}
+            if 'travelMode' in item.validated_data:
+                fields['travel_mode'] = item.validated_data['travelMode']
+            if 'departureTime' in item.validated_data:
+                fields['departure_time'] = item.validated_data['departureTime']
+            state['routes'].append((index, event_id, fields))
+        return event_id
     
-    def _calculate_segment_pairs(self, events):
-        """필요한 segment 쌍 리스트 생성 (각 day 내에서만 연결)"""
-        pairs = []
-        
-        if not events:
-            return pairs
+    def _batch_event_id(self, event_id, ref, refs, field):
+        """id 또는 앞 항목에서 만든 Event의 ref → Event id"""
+        if event_id:
+            return event_id
+        if ref not in refs:
+            raise ValidationError({field: f'앞 항목에서 만든 Event의 ref가 아닙니다: {ref}'})
+        return refs[ref]
+    
+    def _resolve_route_setting(self, trip, event_id):
+        """setRoute: 최종 순서에서 Event → 다음 Event 구간 (from_id, to_id)"""
+        event = trip.events.filter(id=event_id).first()
+        if event is None:
+            raise NotFound(f'삭제된 Event입니다: {event_id}')
+        _, next_event = self._day_neighbors(trip, event.day, event)
+        if next_event is None:
+            raise ValidationError({'detail': '다음 이벤트가 없어 경로를 변경할 수 없습니다.'})
+        return event.id, next_event.id
+    
+    @swagger_auto_schema(
+        operation_summary="Event 이동",
+        operation_description="""
+Event 하나를 `day`의 `afterId` 뒤 또는 `beforeId` 앞으로 옮깁니다 (둘 다 없으면 day의 마지막).
+
+**reorder와의 차이:**
+- 전체 목록 대신 이동 한 건만 보냅니다.
+- 양옆 이웃의 order_key 사이에서 새 키를 만들어 옮긴 Event 한 행만 씁니다 (global_order는 바뀐 행만 UPDATE 1회).
+- RouteSegment는 전체 diff 없이 영향을 받는 구간만 바꿉니다:
+  기존 위치의 `이전 → X`, `X → 다음`, 새 위치의 `이전 → 다음`을 지우고
+  기존 위치의 `이전 → 다음`, 새 위치의 `이전 → X`, `X → 다음`을 만듭니다 (각각 최대 3개).
+- Trip 총 이동 시간/거리는 바뀐 구간만큼 증감합니다.
+
+**예시:**
+```json
+{ "day": 2, "afterId": 12, "recalculateRoutes": true }
+```
+- `afterId`와 `beforeId`를 함께 보내면 두 Event가 이웃이어야 합니다 (아니면 400).
+        """,
+        tags=['events'],
+        request_body=EventMoveSerializer,
+        responses={
+            200: openapi.Response(description='이동 성공', schema=EventMoveResponseSerializer),
+            400: openapi.Response(description='잘못된 이동 위치'),
+            403: openapi.Response(description='권한 없음'),
+            404: openapi.Response(description='Event를 찾을 수 없음')
+        }
+    )
+    @action(detail=True, methods=['post'])
+    def move(self, request, trip_id=None, event_id=None):
+        """Event 하나 이동 (한 행 + 영향받는 segment만 변경)"""
+        trip = self.get_trip()
+        serializer = EventMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        day = data['day']
         
-        # Day별로 그룹화
-        events_by_day = {}
-        for event in events:
-            day = event.day
-            if day not in events_by_day:
-                events_by_day[day] = []
-            events_by_day[day].append(event)
-        
-        # 각 day별로 처리
-        for day in sorted(events_by_day.keys()):
-            day_events = events_by_day[day]
-            
-            if not day_events:
-                continue
-            
-            # Start → 첫 이벤트 (Day 1의 첫 이벤트만)
-            if day == 1 and day_events[0].location:
-                pairs.append((None, day_events[0].id))
+        with transaction.atomic():
+            event = get_object_or_404(trip.events.select_for_update(), id=event_id)
+            old_day = event.day
+            # 1. 새 키: 이미 새 이웃 사이에 있으면 그대로
+            old_prev, old_next, prev_event, next_event, moved = self._place_event(
+                trip, event, day, data.get('afterId'), data.get('beforeId')
+            )
+            if moved:
+                self._recalculate_global_order(trip, {old_day, day})
+                trip.bump_route_version()
             
-            # 같은 day 내의 이벤트 간 연결
-            for i in range(len(day_events) - 1):
-                if day_events[i].location and day_events[i + 1].location:
-                    pairs.append((day_events[i].id, day_events[i + 1].id))
+        # 2. 영향받는 segment만 교체 (양쪽 위치 각각 최대 3개, 트랜잭션 밖에서 API 호출)
+        created, deleted = [], []
+        if data['recalculateRoutes'] and moved:
+            created, deleted = self._repair_segments(
+                trip,
+                removed={
+                    segment_pair(old_prev, event, old_day),
+                    segment_pair(event, old_next, old_day),
+                    segment_pair(prev_event, next_event, day),
+                },
+                added={
+                    segment_pair(old_prev, old_next, old_day),
+                    segment_pair(prev_event, event, day),
+                    segment_pair(event, next_event, day),
+                },
+                events=[event, old_prev, old_next, prev_event, next_event]
+            )
         
-        return pairs
+        event.refresh_from_db(fields=['global_order'])
+        return Response(EventMoveResponseSerializer({
+            'event': event,
+            'createdSegments': created,
+            'deletedSegmentIds': [seg.id for seg in deleted],
+            'routeSummary': trip.route_summary
+        }).data)
     
-    def _create_segments_parallel(self, trip, pairs_to_create, events):
-        """병렬로 segments 생성"""
-        google_maps = GoogleMapsService()
-        events_map = {e.id: e for e in events}
+    def _repair_segments(self, trip, removed, added, events, refresh_event_id=None, lost=()):
+        """
+        바뀐 자리 주변 segment만 교체하고 Trip 총계를 증감
+
+        - removed/added: 변경 전/후 이웃 segment 쌍 (None은 무시, 양쪽에 있는 쌍은 유지)
+        - refresh_event_id: 위치가 바뀐 Event - 그대로 남는 쌍도 다시 계산
+        - lost: 이미 삭제된 segment (Event 삭제 CASCADE 등) - 총계에서만 뺌
+
+        Returns:
+            tuple: (만든 segment 목록, 지운 segment 목록)
+        """
+        removed = {pair for pair in removed if pair}
+        added = {pair for pair in added if pair}
+        stale, fresh = removed - added, added - removed
+        if refresh_event_id is not None:
+            relocated = {pair for pair in added if refresh_event_id in pair}
+            stale |= relocated
+            fresh |= relocated
+        
+        # 구간 계산(API)은 lock 밖에서, 교체는 store_segments에서 기존 segment를 다시 읽고 진행
+        kept = set()
+        if stale or fresh:
+            pair_filter = django_models.Q()
+            for from_id, to_id in stale | fresh:
+                pair_filter |= django_models.Q(from_event_id=from_id, to_event_id=to_id)
+            kept = set(trip.route_segments.filter(pair_filter).values_list('from_event_id', 'to_event_id')) - stale
         
-        def create_one_segment(pair):
-            from_id, to_id = pair
+        events_map = {event.id: event for event in events if event is not None}
+        new_segments = self._build_segments(trip, sorted(fresh - kept, key=str), events_map)
+        return store_segments(trip, new_segments, stale=stale, lost=lost)
+    
+    def _place_event(self, trip, event, day, after_id=None, before_id=None):
+        """
+        Event를 day의 afterId 뒤 / beforeId 앞으로 옮겨 저장 (global_order는 호출하는 쪽에서)
+
+        Returns:
+            tuple: (기존 앞, 기존 뒤, 새 앞, 새 뒤, 옮겨졌는지)
+        """
+        old_prev, old_next = self._day_neighbors(trip, event.day, event)
+        prev_event, next_event = self._move_target(trip, event, day, after_id, before_id)
+        fits = (
+            event.day == day
+            and (prev_event is None or prev_event.order_key < event.order_key)
+            and (next_event is None or event.order_key < next_event.order_key)
+        )
+        if not fits:
+            event.order_key = order_keys.key_between(
+                prev_event.order_key if prev_event else None,
+                next_event.order_key if next_event else None
+            )
+            event.day_order = self._day_order_between(prev_event, next_event)
+            event.order = int(event.day_order)  # 하위 호환
+            event.day = day
+            event.save(update_fields=['day', 'order_key', 'day_order', 'order', 'modified'])
+        return old_prev, old_next, prev_event, next_event, not fits
+    
+    def _day_neighbors(self, trip, day, event):
+        """day 안에서 event 바로 앞/뒤 Event (쿼리 2회)"""
+        day_events = trip.events.filter(day=day).exclude(id=event.id)
+        return (
+            day_events.filter(order_key__lt=event.order_key).order_by('-order_key').first(),
+            day_events.filter(order_key__gt=event.order_key).order_by('order_key').first(),
+        )
+    
+    def _move_target(self, trip, event, day, after_id, before_id):
+        """이동 후 바로 앞/뒤가 될 Event"""
+        anchors = trip.events.in_bulk([anchor_id for anchor_id in (after_id, before_id) if anchor_id])
+        for field, anchor_id in (('afterId', after_id), ('beforeId', before_id)):
+            if not anchor_id:
+                continue
+            anchor = anchors.get(anchor_id)
+            if anchor is None or anchor.id == event.id or anchor.day != day:
+                raise ValidationError({field: f'Day {day}에 있는 다른 Event여야 합니다.'})
+        
+        after = anchors.get(after_id) if after_id else None
+        before = anchors.get(before_id) if before_id else None
+        day_events = trip.events.filter(day=day).exclude(id=event.id)
+        if after:
+            next_event = day_events.filter(order_key__gt=after.order_key).order_by('order_key').first()
+            if before and (next_event is None or next_event.id != before.id):
+                raise ValidationError({'beforeId': 'afterId와 beforeId가 이웃한 Event가 아닙니다.'})
+            return after, next_event
+        if before:
+            return day_events.filter(order_key__lt=before.order_key).order_by('-order_key').first(), before
+        return day_events.order_by('-order_key').first(), None
+    
+    def _day_order_between(self, prev_event, next_event):
+        """표시용 day_order: 이웃 사이 중간값 (마지막이면 +10)"""
+        if prev_event and next_event:
+            value = (prev_event.day_order + next_event.day_order) / 2
+        elif prev_event:
+            value = prev_event.day_order + Decimal('10.0')
+        elif next_event:
+            value = next_event.day_order / 2
+        else:
+            value = Decimal('10.0')
+        return value.quantize(Decimal('0.0001'))
+    
+    def _build_segments(self, trip, pairs, events_map):
+        """
+        segment 쌍 → 저장 전 RouteSegment 목록 (아주 가까운 구간은 API 없이 도보 추정)
+
+        - 경로 조회는 공유 I/O 풀에서 요청 deadline을 공유하며 병렬로 하고,
+          deadline까지 받지 못한 구간은 만들지 않습니다.
+        """
+        google_maps = GoogleMapsService(city=trip.city)
+        targets = []
+        for from_id, to_id in pairs:
             from_event = events_map.get(from_id) if from_id else None
-            to_event = events_map.get(to_id)
-            
-            if not to_event or not to_event.location:
-                return None
-            
+            to_event = events_map[to_id]
             from_location = trip.start_location if from_event is None else from_event.location
-            if not from_location:
-                return None
-            
+            targets.append((from_event, to_event, from_location))
+
+        def fetch(target):
+            from_event, to_event, from_location = target
             try:
-                route = google_maps.calculate_route(from_location, to_event.location)
-                if route:
-                    return RouteSegment.objects.create(
-                        trip=trip,
-                        from_event=from_event,
-                        to_event=to_event,
-                        duration_min=route['durationMin'],
-                        distance_km=route['distanceKm'],
-                        polyline=route.get('polyline', ''),
-                        travel_mode='DRIVING'
-                    )
+                return (
+                    short_hop_leg(from_location, to_event.location, trip.city)
+                    or google_maps.calculate_route(from_location, to_event.location)
+                )
             except Exception as e:
-                print(f"❌ Segment 생성 실패 {pair}: {e}")
+                print(f"❌ Segment 생성 실패 ({from_event.id if from_event else None}, {to_event.id}): {e}")
                 return None
+
+        routes = io_pool.run_many(fetch, targets, deadline=io_pool.deadline_after()) if targets else []
+        segments = []
+        for (from_event, to_event, _), route in zip(targets, routes):
+            if route:
+                segments.append(RouteSegment(
+                    trip=trip,
+                    from_event=from_event,
+                    to_event=to_event,
+                    duration_min=route['durationMin'],
+                    distance_km=route['distanceKm'],
+                    polyline=route.get('polyline', ''),
+                    travel_mode=route.get('travelMode', 'DRIVING'),
+                    local_estimate=route.get('localEstimate', False)
+                ))
+        return segments
+    
+    @swagger_auto_schema(
+        operation_summary="새 장소 삽입 위치 제안",
+        operation_description="""
+새 장소를 추가할 때 이동 시간이 가장 적게 늘어나는 위치(day, 순서)를 제안합니다.
+
+**계산:**
+- 위치별 추가 이동 시간 = `이전 → 새 장소` + `새 장소 → 다음` - `이전 → 다음` (day당 O(n))
+- 기존 구간은 저장된 RouteSegment, 새 구간은 경로 캐시를 사용하며 Google API를 호출하지 않습니다.
+- 캐시에 없는 구간은 직선 거리로 추정하고 `estimated: true`로 표시합니다.
+- Day 1만 시작 지점 → 첫 Event 구간을 포함합니다 (segment 규칙과 동일).
+- `day`를 지정하지 않으면 Event가 있는 day만 검색합니다.
+
+**적용:**
+- 제안의 `day`, `dayOrder`로 Event를 생성한 뒤 `reorder`로 순서를 반영합니다.
+
+**예시:**
+`GET /trips/1/events/suggest-insertion/?lat=37.5796&lng=126.9770&limit=3`
+        """,
+        tags=['events'],
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, description='새 장소 위도', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('lng', openapi.IN_QUERY, description='새 장소 경도', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('day', openapi.IN_QUERY, description='검색할 day', type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('limit', openapi.IN_QUERY, description='제안 개수 (기본 3, 최대 10)', type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={
+            200: openapi.Response(description='제안 성공', schema=EventInsertionResponseSerializer),
+            400: openapi.Response(description='잘못된 요청'),
+            403: openapi.Response(description='권한 없음')
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='suggest-insertion')
+    def suggest_insertion(self, request, trip_id=None):
+        """새 장소의 최저 비용 삽입 위치 제안"""
+        trip = self.get_trip()
+        serializer = EventInsertionQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        events = trip.events.all().order_by('day', 'order_key')
+        if data.get('day'):
+            events = events.filter(day=data['day'])
+        
+        days = {}
+        for event in events:
+            days.setdefault(event.day or 1, []).append({
+                'id': event.id,
+                'dayOrder': event.day_order,
+                'location': event.location
+            })
+        if data.get('day'):
+            days.setdefault(data['day'], [])
+        
+        segment_legs = {
+            (seg.from_event_id, seg.to_event_id): {
+                'durationMin': seg.duration_min,
+                'distanceKm': seg.distance_km
+            }
+            for seg in trip.route_segments.all()
+        }
+        
+        # segment가 없는 이웃 구간(prev → next)은 TripMatrix에서
+        google_maps = GoogleMapsService(city=trip.city)
+        pairs = set()
+        for day, day_events in days.items():
+            if day == 1 and day_events:
+                pairs.add((None, day_events[0]['id']))
+            pairs |= {(prev['id'], nxt['id']) for prev, nxt in zip(day_events, day_events[1:])}
+        pairs -= set(segment_legs)
+        segment_legs.update(trip_matrix.event_legs(trip, pairs, google_maps, save=False))
         
-        # 병렬 처리 (최대 5개 동시)
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            results = list(executor.map(create_one_segment, pairs_to_create))
+        optimizer = RouteOptimizer(google_maps)
+        suggestions = optimizer.suggest_insertions(
+            {'lat': data['lat'], 'lng': data['lng']},
+            days,
+            start_location=trip.start_location,
+            segment_legs=segment_legs,
+            limit=data['limit']
+        )
         
-        return [seg for seg in results if seg is not None]
+        return Response(EventInsertionResponseSerializer({'suggestions': suggestions}).data)
+    
+    def _recalculate_global_order(self, trip, days=None):
+        """global_order 재계산 - days가 있으면 그중 가장 앞 day부터 (SQL UPDATE 1회)"""
+        known_days = [day for day in (days or ()) if day is not None]
+        from_day = min(known_days) if known_days else None
+        ordering.recalculate_global_order(trip.id, from_day=from_day)
     
-    def _update_trip_summary(self, trip, segments):
-        """Trip 요약 정보 업데이트"""
-        total_duration = sum(seg.duration_min for seg in segments)
-        total_distance = sum(float(seg.distance_km) for seg in segments)
+    def _reorder_days(self, trip, events, events_data):
+        """
+        요청한 위치대로 day별 순서를 만들고 order_key 부여 (조회 쿼리 1회)
         
-        trip.total_duration_min = total_duration
-        trip.total_distance_km = total_distance
-        trip.save(update_fields=['total_duration_min', 'total_distance_km', 'modified'])
-
+        - afterId/beforeId: 그 Event 뒤/앞 (둘 다 없고 order도 없으면 day의 마지막)
+        - order(하위 호환): 요청하지 않은 Event의 현재 day_order와 비교한 위치 (저장하지 않음)
+        - 요청한 Event와 키가 바뀐 Event만 이웃 값으로 표시용 day_order를 다시 정함 (값이 같으면 저장하지 않음)
+        
+        Returns:
+            list: 저장할 Event 목록
+        """
+        old_days = {event_id: event.day for event_id, event in events.items()}
+        for event_data in events_data:
+            if 'day' in event_data:
+                events[event_data['id']].day = event_data['day']
+        
+        days = set(old_days.values()) | {event.day for event in events.values()}
+        day_filter = django_models.Q(day__in=[day for day in days if day is not None])
+        if None in days:
+            day_filter |= django_models.Q(day__isnull=True)
+        events_by_day = {}
+        for event in trip.events.filter(day_filter).exclude(id__in=list(events)).order_by('order_key', 'id'):
+            events_by_day.setdefault(event.day, []).append(event)
+        
+        # 앞 항목에서 옮긴 Event도 afterId/beforeId 기준으로 쓸 수 있도록 요청 순서대로 넣음
+        def is_legacy(event_data):
+            return event_data.get('order') is not None and not (event_data.get('afterId') or event_data.get('beforeId'))
+        
+        anchored = [event_data for event_data in events_data if not is_legacy(event_data)]
+        legacy = [event_data for event_data in events_data if is_legacy(event_data)]
+        for event_data in sorted(legacy, key=lambda event_data: (event_data['order'], event_data['id'])):
+            event = events[event_data['id']]
+            day_events = events_by_day.setdefault(event.day, [])
+            position = next(
+                (idx for idx, other in enumerate(day_events)
+                 if other.id not in events and other.day_order > event_data['order']),
+                len(day_events)
+            )
+            day_events.insert(position, event)
+        for event_data in anchored:
+            event = events[event_data['id']]
+            day_events = events_by_day.setdefault(event.day, [])
+            day_events.insert(self._anchor_position(event, day_events, event_data), event)
+        
+        changed = []
+        for day_events in events_by_day.values():
+            rekeyed = {event.id for event in ordering.assign_order_keys(day_events, moved=set(events))}
+            # 요청한 Event와 키가 바뀐 Event는 표시용 day_order를 이웃 값으로 다시 정함 (나머지는 이미 순서대로)
+            placed = rekeyed | set(events)
+            for idx, event in enumerate(day_events):
+                if event.id not in placed:
+                    continue
+                prev_event = day_events[idx - 1] if idx else None
+                next_event = next((other for other in day_events[idx + 1:] if other.id not in placed), None)
+                day_order = self._day_order_between(prev_event, next_event)
+                if event.id in rekeyed or event.day != old_days.get(event.id) or event.day_order != day_order:
+                    event.day_order = day_order
+                    event.order = int(day_order)  # 하위 호환
+                    changed.append(event)
+        return changed
+    
+    def _anchor_position(self, event, day_events, event_data):
+        """reorder 항목의 afterId/beforeId → day_events 안에서 넣을 위치"""
+        ids = [other.id for other in day_events]
+        positions = {}
+        for field, offset in (('afterId', 1), ('beforeId', 0)):
+            anchor_id = event_data.get(field)
+            if not anchor_id:
+                continue
+            if anchor_id not in ids:
+                raise ValidationError({field: f'Day {event.day}에 있는 다른 Event여야 합니다.'})
+            positions[field] = ids.index(anchor_id) + offset
+        if len(positions) == 2 and positions['afterId'] != positions['beforeId']:
+            raise ValidationError({'beforeId': 'afterId와 beforeId가 이웃한 Event가 아닙니다.'})
+        return next(iter(positions.values()), len(day_events))
+    
+    def _smart_recalculate_segments(self, trip, version=None):
+        """
+        Diff 기반으로 변경된 segments만 재계산
+        
+        - 경로 조회(API)는 트랜잭션/lock 밖에서 하고, 저장은 store_segments에서
+          Trip lock 안에서 기존 segment를 다시 읽어 아직 없는 쌍만 만듭니다 (동시 reorder의 중복 생성 방지).
+        - version: 이 요청이 올린 route_version - 시작할 때/저장할 때 더 새 변경이 있으면
+          RecomputeSuperseded (API 호출/저장 없이 중단)
+        """
+        ensure_current(trip, version)
+        
+        # 1. 새 순서에서 필요한 segment pairs 계산
+        all_events = list(Event.objects.filter(trip=trip).order_by('day', 'order_key'))
+        needed_set = set(self._calculate_segment_pairs(all_events))
+        existing_set = set(trip.route_segments.values_list('from_event_id', 'to_event_id'))
+        
+        # 2. Diff 계산
+        to_delete = existing_set - needed_set
+        to_create = needed_set - existing_set
+        
+        print(f"📊 RouteSegment diff:")
+        print(f"  - 삭제: {len(to_delete)}개")
+        print(f"  - 추가: {len(to_create)}개")
+        print(f"  - 재사용: {len(needed_set & existing_set)}개")
+        
+        # 3. 생성할 구간 병렬 조회 (lock 밖)
+        new_segments = fetch_segments(trip, list(to_create), all_events) if to_create else []
+        
+        # 4. 삭제/생성 및 Trip 요약 업데이트 (lock 안, 저장 직전 버전 확인)
+        store_segments(trip, new_segments, keep=needed_set, version=version)
+        return list(trip.route_segments.all())
+    
+    def _calculate_segment_pairs(self, events):
+        """필요한 segment 쌍 리스트 생성 (각 day 내에서만 연결)"""
+        return segment_pairs(events)
+    
     @swagger_auto_schema(
         method='patch',
         operation_summary='Event 경로 정보 업데이트',
-        operation_description='특정 Event의 다음 경로 정보(이동 수단, 출발 시간, 비용)를 업데이트합니다.',
+        operation_description='특정 Event의 다음 경로 정보(이동 수단, 출발 시간, 비용)를 업데이트합니다. refresh=true면 경로를 다시 조회합니다.',
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             properties={
@@ -571,6 +1269,11 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
                     description='통화 (KRW, USD, JPY, EUR 등)',
                     example='KRW',
                     default='KRW'
+                ),
+                'refresh': openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN,
+                    description='true면 도보 추정치(localEstimate) 구간을 Directions API로 다시 조회',
+                    default=False
                 )
             },
             required=[]
@@ -605,40 +1308,68 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
         departure_time = request.data.get('departureTime')
         cost = request.data.get('cost')
         currency = request.data.get('currency', 'KRW')
+        refresh_serializer = EventRouteRefreshSerializer(data=request.data)
+        refresh_serializer.is_valid(raise_exception=True)
+        refresh = refresh_serializer.validated_data['refresh']
         
         # 다음 이벤트 찾기
         next_event = Event.objects.filter(
             trip=trip,
             day=event.day,
-            day_order__gt=event.day_order
-        ).order_by('day_order').first()
+            order_key__gt=event.order_key
+        ).order_by('order_key').first()
         
         if not next_event:
             raise ValidationError({'detail': '다음 이벤트가 없어 경로를 변경할 수 없습니다.'})
         
-        # 경로 세그먼트 찾기 또는 생성
-        route_segment, created = RouteSegment.objects.get_or_create(
-            trip=trip,
-            from_event=event,
-            to_event=next_event,
-            defaults={'travel_mode': travel_mode or 'DRIVING'}
-        )
-        
-        # 필드 업데이트
-        updated = False
-        if travel_mode and travel_mode in ['DRIVING', 'WALKING', 'TRANSIT', 'BICYCLING']:
-            route_segment.travel_mode = travel_mode
-            print(f"🚗 이동수단 변경: {travel_mode}")
-            updated = True
-        
-        if departure_time is not None:
-            route_segment.departure_time = departure_time if departure_time else ''
-            print(f"🕐 출발시간 설정: '{departure_time}' (빈 문자열={departure_time == ''})")
-            updated = True
+        # 경로 다시 조회 (도보 추정치 → 실제 경로) - API는 lock 밖에서
+        route = None
+        if refresh:
+            if not event.location or not next_event.location:
+                raise ValidationError({'detail': '위치가 없는 이벤트의 경로는 다시 조회할 수 없습니다.'})
+            route = GoogleMapsService(city=trip.city).calculate_route(event.location, next_event.location)
+            if not route:
+                raise ValidationError({'detail': '경로를 다시 조회하지 못했습니다.'})
         
-        if updated:
-            route_segment.save()
-            print(f"✅ RouteSegment 저장 완료: id={route_segment.id}, departure_time='{route_segment.departure_time}'")
+        # segment 쓰기는 재계산(store_segments)과 같은 Trip lock 안에서 (같은 쌍 중복 생성 방지)
+        with recompute_lock(trip):
+            # 경로 세그먼트 찾기 또는 생성
+            route_segment, created = RouteSegment.objects.get_or_create(
+                trip=trip,
+                from_event=event,
+                to_event=next_event,
+                defaults={'travel_mode': travel_mode or 'DRIVING'}
+            )
+            
+            # 필드 업데이트
+            updated = False
+            if travel_mode and travel_mode in ['DRIVING', 'WALKING', 'TRANSIT', 'BICYCLING']:
+                route_segment.travel_mode = travel_mode
+                print(f"🚗 이동수단 변경: {travel_mode}")
+                updated = True
+            
+            if departure_time is not None:
+                route_segment.departure_time = departure_time if departure_time else ''
+                print(f"🕐 출발시간 설정: '{departure_time}' (빈 문자열={departure_time == ''})")
+                updated = True
+            
+            if route:
+                route_segment.duration_min = route['durationMin']
+                route_segment.distance_km = route['distanceKm']
+                route_segment.polyline = route.get('polyline', '')
+                if route_segment.local_estimate and not travel_mode:
+                    route_segment.travel_mode = 'DRIVING'  # Directions API는 driving으로 조회
+                route_segment.local_estimate = False
+                print(f"🔄 경로 다시 조회: {route['durationMin']}분, {route['distanceKm']}km")
+                updated = True
+            
+            if updated:
+                route_segment.save()
+                if route:
+                    trip.update_route_summary()
+                    # 이 구간을 다시 조회하기 전 상태로 진행 중인 재계산은 무효화
+                    trip.bump_route_version()
+                print(f"✅ RouteSegment 저장 완료: id={route_segment.id}, departure_time='{route_segment.departure_time}'")
         
         # 비용 업데이트
         if cost is not None:
@@ -669,7 +1400,7 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
         day_events = Event.objects.filter(
             trip=trip,
             day=event.day
-        ).order_by('day_order')
+        ).order_by('order_key')
         
         events_data = []
         for ev in day_events:
@@ -699,7 +1430,8 @@ Events의 순서를 변경하고 RouteSegments를 스마트하게 재계산합
                     'distanceKm': float(next_route.distance_km),
                     'durationMin': next_route.duration_min,
                     'travelMode': next_route.travel_mode,
-                    'polyline': next_route.polyline or ''
+                    'polyline': next_route.polyline or '',
+                    'localEstimate': next_route.local_estimate
                 }
                 
                 # 출발 시간 추가
@@ -0,0 +1,384 @@
+"""
+경로 최적화 벤치마크
+
+- seed 고정 합성 데이터셋(도심 클러스터, 균일 격자, 원형, TSPLIB 스타일)과 TSPLIB 파일 로더
+- 전략별 실행 시간, 최선 해 대비 경로 길이(gap), 메모리(tracemalloc peak) 측정
+- 결과는 dict 목록(JSON 직렬화 가능)으로 반환해 실행 간 비교에 사용합니다.
+- Django/ORM에 의존하지 않습니다 (optimization 모듈만 사용, pool_crossover만 process_pool 작업 형식을 사용).
+
+사용 예:
+    python manage.py benchmark_optimizer --sizes 10,50,200 --json results.json
+"""
+import itertools
+import math
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from . import optimization
+
+# Held-Karp(정확해)로 최적값을 계산할 최대 장소 수 (O(2^n · n^2))
+EXACT_MAX_PLACES = 11
+
+DEFAULT_SIZES = [5, 10, 25, 50, 100, 200, 500]
+
+
+@dataclass
+class Instance:
+    """
+    벤치마크 인스턴스
+
+    - points[0] = 시작 지점, points[1..n] = 장소 (평면 좌표, km)
+    - best_known: 알려진 최적 경로 길이 (없으면 None)
+    """
+    name: str
+    dataset: str
+    points: list
+    best_known: float = None
+    best_known_source: str = None
+    matrix: list = field(default=None, repr=False)
+
+    @property
+    def size(self):
+        return len(self.points) - 1
+
+    def cost_matrix(self):
+        if self.matrix is None:
+            self.matrix = euclidean_matrix(self.points)
+        return self.matrix
+
+
+def euclidean_matrix(points, rounding=None):
+    """평면 좌표 → 거리 행렬 (rounding='nint'이면 TSPLIB EUC_2D처럼 정수 반올림)"""
+    matrix = []
+    for x1, y1 in points:
+        row = []
+        for x2, y2 in points:
+            distance = math.hypot(x1 - x2, y1 - y2)
+            row.append(float(int(distance + 0.5)) if rounding == 'nint' else distance)
+        matrix.append(row)
+    return matrix
+
+
+# ---------------------------------------------------------------------------
+# 데이터셋 (seed 고정)
+# ---------------------------------------------------------------------------
+
+def clustered(size, seed=0):
+    """도심 클러스터: 20km 영역의 여러 중심지 주변에 장소가 모여 있는 도시"""
+    rng = random.Random(f"clustered-{size}-{seed}")
+    centers = [(rng.uniform(0, 20), rng.uniform(0, 20)) for _ in range(max(2, size // 25))]
+    points = [(10.0, 10.0)]
+    for _ in range(size):
+        cx, cy = rng.choice(centers)
+        points.append((rng.gauss(cx, 0.8), rng.gauss(cy, 0.8)))
+    return Instance(f"clustered-{size}", 'clustered', points)
+
+
+def grid(size, seed=0, spacing=0.5):
+    """
+    균일 격자: 시작 지점을 포함한 size+1개 점을 격자에 지그재그 순서로 배치
+
+    - 모든 점 사이 거리가 spacing 이상이고 지그재그 경로가 매 구간 spacing이므로
+      최적 경로 길이 = size × spacing
+    """
+    columns = math.ceil(math.sqrt(size + 1))
+    points = []
+    for idx in range(size + 1):
+        row, col = divmod(idx, columns)
+        if row % 2:
+            col = columns - 1 - col
+        points.append((col * spacing, row * spacing))
+
+    # 시작 지점은 고정, 장소 순서는 섞어서 입력 순서가 답이 되지 않도록 함
+    rng = random.Random(f"grid-{size}-{seed}")
+    places = points[1:]
+    rng.shuffle(places)
+    return Instance(f"grid-{size}", 'grid', [points[0]] + places, size * spacing, 'construction')
+
+
+def ring(size, seed=0, radius=5.0):
+    """
+    원형: 시작 지점과 장소를 정다각형 꼭짓점에 배치
+
+    - 최적 경로 = 원을 따라 한 방향으로 도는 경로 (size × 현의 길이)
+    """
+    angle = 2 * math.pi / (size + 1)
+    points = [(radius * math.cos(k * angle), radius * math.sin(k * angle)) for k in range(size + 1)]
+    rng = random.Random(f"ring-{size}-{seed}")
+    places = points[1:]
+    rng.shuffle(places)
+    chord = 2 * radius * math.sin(angle / 2)
+    return Instance(f"ring-{size}", 'ring', [points[0]] + places, size * chord, 'construction')
+
+
+def tsplib_like(size, seed=0):
+    """TSPLIB 스타일: 1000×1000 균일 무작위 좌표, 정수 반올림 거리 (EUC_2D)"""
+    rng = random.Random(f"tsplib-{size}-{seed}")
+    points = [(float(rng.randint(0, 1000)), float(rng.randint(0, 1000))) for _ in range(size + 1)]
+    return Instance(f"tsplib-like-{size}", 'tsplib_like', points, matrix=euclidean_matrix(points, 'nint'))
+
+
+DATASETS = {
+    'clustered': clustered,
+    'grid': grid,
+    'ring': ring,
+    'tsplib_like': tsplib_like,
+}
+
+
+def load_tsplib(path):
+    """
+    TSPLIB 파일(NODE_COORD_SECTION, EUC_2D) 로드 - 첫 번째 노드를 시작 지점으로 사용
+
+    - TSPLIB 최적값은 순환 경로 기준이라 best_known으로 쓰지 않습니다.
+    """
+    name = None
+    edge_weight_type = 'EUC_2D'
+    points = []
+    in_coords = False
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == 'EOF':
+                continue
+            if in_coords:
+                parts = line.split()
+                if len(parts) < 3:
+                    break
+                points.append((float(parts[1]), float(parts[2])))
+                continue
+            if line.startswith('NODE_COORD_SECTION'):
+                in_coords = True
+            elif ':' in line:
+                key, value = (part.strip() for part in line.split(':', 1))
+                if key == 'NAME':
+                    name = value
+                elif key == 'EDGE_WEIGHT_TYPE':
+                    edge_weight_type = value
+
+    if edge_weight_type != 'EUC_2D':
+        raise ValueError(f"지원하지 않는 EDGE_WEIGHT_TYPE: {edge_weight_type}")
+    if len(points) < 2:
+        raise ValueError("NODE_COORD_SECTION에 좌표가 2개 이상 필요합니다.")
+
+    return Instance(name or path, 'tsplib', points, matrix=euclidean_matrix(points, 'nint'))
+
+
+# ---------------------------------------------------------------------------
+# 정확해 (작은 인스턴스의 best known)
+# ---------------------------------------------------------------------------
+
+def held_karp(matrix):
+    """
+    시작 지점(0)에서 출발해 모든 장소를 방문하는 최단 열린 경로 길이 (Held-Karp DP)
+    """
+    n = len(matrix) - 1
+    if n == 0:
+        return 0.0
+
+    # cost[(mask, last)] = mask 집합을 방문하고 last에서 끝나는 최소 비용 (장소 i → bit i-1)
+    cost = {(1 << (node - 1), node): matrix[0][node] for node in range(1, n + 1)}
+    for subset_size in range(2, n + 1):
+        for subset in itertools.combinations(range(1, n + 1), subset_size):
+            mask = 0
+            for node in subset:
+                mask |= 1 << (node - 1)
+            for last in subset:
+                prev_mask = mask & ~(1 << (last - 1))
+                cost[(mask, last)] = min(
+                    cost[(prev_mask, prev)] + matrix[prev][last]
+                    for prev in subset if prev != last
+                )
+
+    full = (1 << n) - 1
+    return min(cost[(full, last)] for last in range(1, n + 1))
+
+
+# ---------------------------------------------------------------------------
+# 전략
+# ---------------------------------------------------------------------------
+
+def _nearest_neighbor(matrix, nodes, time_budget):
+    return optimization.nearest_neighbor(matrix, nodes)
+
+
+def _nn_two_opt(matrix, nodes, time_budget):
+    """기본 최적화와 같은 설정 (2-opt 2회)"""
+    route = optimization.nearest_neighbor(matrix, nodes)
+    return optimization.two_opt(matrix, route, iterations=2, deadline=_deadline(time_budget))
+
+
+def _nn_two_opt_converged(matrix, nodes, time_budget):
+    route = optimization.nearest_neighbor(matrix, nodes)
+    return optimization.two_opt(matrix, route, iterations=len(nodes) + 1, deadline=_deadline(time_budget))
+
+
+def _multi_start(matrix, nodes, time_budget):
+    route, _, _ = optimization.multi_start(matrix, nodes, starts=8, seed=0, deadline=_deadline(time_budget))
+    return route
+
+
+STRATEGIES = {
+    'nn': _nearest_neighbor,
+    'nn+2opt': _nn_two_opt,
+    'nn+2opt-converged': _nn_two_opt_converged,
+    'multi-start-8': _multi_start,
+}
+
+
+def _deadline(time_budget):
+    return time.monotonic() + time_budget if time_budget else None
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+def build_instances(datasets, sizes, seed=0):
+    """데이터셋 × 크기 인스턴스 목록 (작은 인스턴스는 Held-Karp로 best known 보완)"""
+    instances = []
+    for dataset in datasets:
+        for size in sizes:
+            instances.append(DATASETS[dataset](size, seed=seed))
+
+    for instance in instances:
+        if instance.best_known is None and instance.size <= EXACT_MAX_PLACES:
+            instance.best_known = held_karp(instance.cost_matrix())
+            instance.best_known_source = 'held-karp'
+    return instances
+
+
+def measure(instance, strategy, repeat=3, time_budget=None):
+    """
+    전략 하나를 instance에 repeat회 실행
+
+    Returns:
+        dict: 실행 시간(중앙값/최소), 경로 길이, 메모리 peak
+    """
+    matrix = instance.cost_matrix()
+    nodes = list(range(1, instance.size + 1))
+    solver = STRATEGIES[strategy]
+
+    runtimes = []
+    route = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        route = solver(matrix, nodes, time_budget)
+        runtimes.append(time.perf_counter() - started)
+
+    # 메모리는 별도 1회 실행 (tracemalloc 오버헤드가 실행 시간에 섞이지 않도록)
+    tracemalloc.start()
+    try:
+        solver(matrix, nodes, time_budget)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if sorted(route) != nodes:
+        raise AssertionError(f"{strategy}: {instance.name}의 방문 순서가 올바르지 않습니다.")
+
+    return {
+        'instance': instance.name,
+        'dataset': instance.dataset,
+        'size': instance.size,
+        'strategy': strategy,
+        'runtimeMs': round(statistics.median(runtimes) * 1000, 3),
+        'runtimeMinMs': round(min(runtimes) * 1000, 3),
+        'length': round(optimization.route_cost(matrix, route), 4),
+        'peakMemoryKb': round(peak / 1024, 1),
+    }
+
+
+def pool_crossover(instances, offload, repeat=5, time_budget=None):
+    """
+    프로세스 풀 사용 기준 측정 - 기본 최적화 작업(NN + 2-opt 2회)의 인라인 실행 vs 풀 왕복 시간
+
+    - offload(task, time_budget): 작업을 풀에서 실행하고 결과를 기다리는 함수 (호출하는 쪽에서 주입)
+    - 풀 오버헤드 = poolMs - inlineMs (작업 직렬화 + 프로세스 간 전달)
+    - 크기별로 인라인 실행 시간이 풀 오버헤드 이상이면(요청 스레드에서 덜어내는 시간 ≥ 추가 지연) offload 권장
+
+    Returns:
+        dict: {'results': 인스턴스별 측정 목록, 'recommendedMinPlaces': 모든 데이터셋에서 그 크기 이상은 offload가 이득인 최소 크기}
+    """
+    from . import process_pool
+
+    rows = []
+    for instance in instances:
+        task = process_pool.tsp_task(instance.cost_matrix(), instance.size)
+        inline, pooled = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            process_pool.solve_task(task, time_budget)
+            inline.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            offload(task, time_budget)
+            pooled.append(time.perf_counter() - started)
+        inline_ms = statistics.median(inline) * 1000
+        pool_ms = statistics.median(pooled) * 1000
+        rows.append({
+            'instance': instance.name,
+            'dataset': instance.dataset,
+            'size': instance.size,
+            'inlineMs': round(inline_ms, 3),
+            'poolMs': round(pool_ms, 3),
+            'overheadMs': round(pool_ms - inline_ms, 3),
+            'offload': inline_ms >= pool_ms - inline_ms,
+        })
+
+    # 각 데이터셋에서 그 크기 이상이 모두 offload 권장인 최소 크기 중 가장 큰 값
+    recommended = None
+    for dataset in {row['dataset'] for row in rows}:
+        measured = sorted((row for row in rows if row['dataset'] == dataset), key=lambda row: row['size'])
+        crossover = None
+        for row in reversed(measured):
+            if not row['offload']:
+                break
+            crossover = row['size']
+        if crossover is None:
+            return {'results': rows, 'recommendedMinPlaces': None}
+        recommended = max(recommended or 0, crossover)
+    return {'results': rows, 'recommendedMinPlaces': recommended}
+
+
+def run(instances, strategies, repeat=3, time_budget=None, progress=None):
+    """
+    모든 인스턴스 × 전략 실행
+
+    - best known이 없는 인스턴스는 이번 실행의 최선 결과를 기준으로 gap을 계산합니다.
+
+    Returns:
+        dict: {'meta': 실행 환경, 'results': 결과 목록}
+    """
+    results = []
+    for instance in instances:
+        rows = []
+        for strategy in strategies:
+            row = measure(instance, strategy, repeat=repeat, time_budget=time_budget)
+            rows.append(row)
+            if progress:
+                progress(row)
+
+        best_known, source = instance.best_known, instance.best_known_source
+        if best_known is None:
+            best_known, source = min(row['length'] for row in rows), 'best-of-run'
+        for row in rows:
+            row['bestKnown'] = round(best_known, 4)
+            row['bestKnownSource'] = source
+            row['gapPercent'] = round((row['length'] - best_known) / best_known * 100, 3) + 0.0 if best_known else 0.0
+        results.extend(rows)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'timeBudgetMs': int(time_budget * 1000) if time_budget else None,
+            'createdAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
@@ -0,0 +1,147 @@
+"""
+외부 API 호출용 I/O 스레드 풀 (프로세스당 하나)
+
+- 요청마다 ThreadPoolExecutor를 만들고 닫지 않고, gunicorn worker 시작 시 만든 풀을 공유합니다
+  (gunicorn.conf.py → warm_up).
+- 작업이 끝나면 worker 스레드의 Django DB 연결을 닫습니다 (ORM/캐시 테이블에 접근해도 연결이 남지 않음).
+- run_many()의 deadline은 worker 스레드에 전달되어 remaining()으로 HTTP timeout을 줄이는 데 쓰이고,
+  deadline까지 끝나지 않은 작업은 취소하고 default 값을 돌려줍니다.
+- stats(): 대기열 길이/사용률 (staff 전용 /api/health/io-pool/)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# 지표 (프로세스 누적)
+_stats_lock = threading.Lock()
+_counters = {'queued': 0, 'active': 0, 'completed': 0, 'timedOut': 0}
+
+# worker 스레드별 현재 작업의 deadline (time.monotonic 기준)
+_local = threading.local()
+
+
+def get_executor():
+    """I/O 스레드 풀 반환 (ROUTE_IO_THREADS=0이면 None - 호출한 스레드에서 순서대로 실행)"""
+    global _executor
+
+    threads = settings.ROUTE_IO_THREADS
+    if threads <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='route-io')
+        return _executor
+
+
+def deadline_after(timeout=None):
+    """지금부터 timeout초 뒤의 deadline (None이면 ROUTE_IO_TIMEOUT_MS)"""
+    if timeout is None:
+        timeout = settings.ROUTE_IO_TIMEOUT_MS / 1000
+    return time.monotonic() + timeout
+
+
+def remaining(default):
+    """현재 작업의 deadline까지 남은 시간 (초, default 이하) - deadline이 없으면 default"""
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is None:
+        return default
+    return max(0.1, min(default, deadline - time.monotonic()))
+
+
+def run_many(fn, items, deadline=None, default=None):
+    """
+    items마다 fn 실행 (풀이 없으면 호출한 스레드에서 순서대로)
+
+    Args:
+        deadline: time.monotonic 기준 마감 시각 (None이면 deadline_after())
+        default: deadline까지 끝나지 않았거나 시작하지 못한 작업의 결과
+
+    Returns:
+        list: items와 같은 순서의 결과
+    """
+    items = list(items)
+    if deadline is None:
+        deadline = deadline_after()
+
+    executor = get_executor()
+    if executor is None:
+        return [_call(fn, item, deadline, default) for item in items]
+
+    with _stats_lock:
+        _counters['queued'] += len(items)
+    futures = [executor.submit(_run, fn, item, deadline, default) for item in items]
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            # 대기열에 있으면 취소, 실행 중이면 HTTP timeout(remaining)이 곧 끝냄
+            if future.cancel():
+                with _stats_lock:
+                    _counters['queued'] -= 1
+            with _stats_lock:
+                _counters['timedOut'] += 1
+            results.append(default)
+    return results
+
+
+def stats():
+    """풀 지표 {'threads', 'active', 'queued', 'utilization', 'completed', 'timedOut'}"""
+    threads = max(0, settings.ROUTE_IO_THREADS)
+    with _stats_lock:
+        counters = dict(_counters)
+    return {
+        'threads': threads,
+        'active': counters['active'],
+        'queued': counters['queued'],
+        'utilization': round(counters['active'] / threads, 2) if threads else 0.0,
+        'completed': counters['completed'],
+        'timedOut': counters['timedOut'],
+    }
+
+
+def warm_up():
+    """worker 시작 시 풀 생성 (첫 요청에서 만들지 않도록)"""
+    get_executor()
+
+
+def shutdown():
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _run(fn, item, deadline, default):
+    with _stats_lock:
+        _counters['queued'] -= 1
+        _counters['active'] += 1
+    try:
+        return _call(fn, item, deadline, default)
+    finally:
+        with _stats_lock:
+            _counters['active'] -= 1
+            _counters['completed'] += 1
+        # worker 스레드에서 열린 DB 연결(캐시 테이블 포함)은 요청이 끝나도 닫히지 않으므로 여기서 닫음
+        connections.close_all()
+
+
+def _call(fn, item, deadline, default):
+    if time.monotonic() >= deadline:
+        return default
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = deadline
+    try:
+        return fn(item)
+    finally:
+        _local.deadline = previous
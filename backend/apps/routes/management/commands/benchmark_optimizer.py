@@ -0,0 +1,141 @@
+"""
+경로 최적화 벤치마크 실행
+
+예:
+    python manage.py benchmark_optimizer
+    python manage.py benchmark_optimizer --sizes 10,50 --datasets grid,ring --json results.json
+    python manage.py benchmark_optimizer --tsplib berlin52.tsp --strategies nn+2opt
+    python manage.py benchmark_optimizer --pool-crossover --sizes 5,10,15,20,25,30,40,50
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.routes import benchmarks, process_pool
+
+
+def _csv(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class Command(BaseCommand):
+    help = '경로 최적화 벤치마크 (실행 시간, best known 대비 gap, 메모리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default=','.join(str(size) for size in benchmarks.DEFAULT_SIZES),
+            help='장소 수 목록 (쉼표 구분)'
+        )
+        parser.add_argument(
+            '--datasets', default=','.join(benchmarks.DATASETS),
+            help=f"데이터셋 목록 ({', '.join(benchmarks.DATASETS)})"
+        )
+        parser.add_argument(
+            '--strategies', default=','.join(benchmarks.STRATEGIES),
+            help=f"전략 목록 ({', '.join(benchmarks.STRATEGIES)})"
+        )
+        parser.add_argument('--tsplib', nargs='*', default=[], help='추가로 실행할 TSPLIB 파일 (EUC_2D)')
+        parser.add_argument('--seed', type=int, default=0, help='데이터셋 생성 seed')
+        parser.add_argument('--repeat', type=int, default=3, help='전략별 반복 횟수 (실행 시간은 중앙값)')
+        parser.add_argument('--time-budget-ms', type=int, default=None, help='전략별 deadline (ms)')
+        parser.add_argument('--json', dest='json_path', default=None, help='결과 JSON 파일 경로 (- 이면 stdout)')
+        parser.add_argument(
+            '--pool-crossover', action='store_true',
+            help='ROUTE_OPTIMIZER_POOL_MIN_PLACES 측정: 크기별 인라인 실행 vs 프로세스 풀 왕복 시간'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in _csv(options['sizes'])]
+        except ValueError:
+            raise CommandError('--sizes는 정수 목록이어야 합니다.')
+        datasets = _csv(options['datasets'])
+        strategies = _csv(options['strategies'])
+
+        unknown = [name for name in datasets if name not in benchmarks.DATASETS]
+        unknown += [name for name in strategies if name not in benchmarks.STRATEGIES]
+        if unknown:
+            raise CommandError(f"알 수 없는 데이터셋/전략: {', '.join(unknown)}")
+        if any(size < 1 for size in sizes):
+            raise CommandError('--sizes는 1 이상이어야 합니다.')
+
+        instances = benchmarks.build_instances(datasets, sizes, seed=options['seed'])
+        for path in options['tsplib']:
+            try:
+                instances.append(benchmarks.load_tsplib(path))
+            except (OSError, ValueError) as e:
+                raise CommandError(f'TSPLIB 파일 로드 실패 ({path}): {e}')
+
+        json_to_stdout = options['json_path'] == '-'
+        time_budget = options['time_budget_ms'] / 1000 if options['time_budget_ms'] else None
+
+        if options['pool_crossover']:
+            return self._pool_crossover(instances, options['repeat'], time_budget, options['json_path'])
+
+        def progress(row):
+            if not json_to_stdout:
+                self.stdout.write(
+                    f"  {row['instance']:<18} {row['strategy']:<18} "
+                    f"{row['runtimeMs']:>10.2f} ms  length={row['length']:<12} "
+                    f"peak={row['peakMemoryKb']} KB"
+                )
+
+        if not json_to_stdout:
+            self.stdout.write(f'🏁 벤치마크 시작: 인스턴스 {len(instances)}개 × 전략 {len(strategies)}개')
+
+        report = benchmarks.run(
+            instances, strategies, repeat=options['repeat'], time_budget=time_budget, progress=progress
+        )
+        report['meta']['seed'] = options['seed']
+
+        if json_to_stdout:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write('\n📊 best known 대비 gap (%)')
+        for row in report['results']:
+            self.stdout.write(
+                f"  {row['instance']:<18} {row['strategy']:<18} "
+                f"gap={row['gapPercent']:>8.3f}%  ({row['bestKnownSource']})"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"\n✨ 결과 저장: {options['json_path']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✨ 완료!'))
+
+    def _pool_crossover(self, instances, repeat, time_budget, json_path):
+        """프로세스 풀 사용 기준 측정 (풀은 미리 띄운 상태에서 왕복 시간만 측정)"""
+        executor = process_pool.get_executor()
+        if executor is None:
+            raise CommandError('ROUTE_OPTIMIZER_PROCESSES=0이면 프로세스 풀을 측정할 수 없습니다.')
+        process_pool.warm_up()
+        try:
+            report = benchmarks.pool_crossover(
+                instances,
+                lambda task, budget: executor.submit(process_pool.solve_task, task, budget).result(),
+                repeat=repeat, time_budget=time_budget,
+            )
+        finally:
+            process_pool.shutdown()
+
+        if json_path == '-':
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write('📊 인라인 실행 vs 프로세스 풀 왕복 (중앙값)')
+        for row in report['results']:
+            self.stdout.write(
+                f"  {row['instance']:<18} inline={row['inlineMs']:>9.3f} ms  pool={row['poolMs']:>9.3f} ms  "
+                f"overhead={row['overheadMs']:>8.3f} ms  {'offload' if row['offload'] else 'inline'}"
+            )
+        if json_path:
+            with open(json_path, 'w') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        recommended = report['recommendedMinPlaces']
+        if recommended is None:
+            self.stdout.write(self.style.WARNING('\n⚠️ 측정한 크기에서는 offload 이득이 없습니다. 더 큰 --sizes로 측정하세요.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\n✨ 권장 ROUTE_OPTIMIZER_POOL_MIN_PLACES={recommended}'))
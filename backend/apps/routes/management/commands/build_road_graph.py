@@ -0,0 +1,37 @@
+"""
+OSM 추출본 → 로컬 도로 그래프 (Contraction Hierarchies)
+
+예:
+    python manage.py build_road_graph seoul.osm --out road_graphs/seoul
+    python manage.py build_road_graph apps/routes/testdata/tiny_city.osm --out /tmp/road_graphs/tiny
+
+ROAD_GRAPH_DIR에 --out 디렉터리(또는 도시별 디렉터리를 모은 상위 디렉터리)를 지정하면
+GoogleMapsService가 유료 API보다 먼저 사용합니다.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.routes import road_graph
+
+
+class Command(BaseCommand):
+    help = 'OSM 추출본(.osm XML)으로 로컬 라우팅용 Contraction Hierarchies 그래프 생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument('osm_path', help='OSM XML 파일 경로 (.osm)')
+        parser.add_argument('--out', required=True, help='출력 디렉터리')
+        parser.add_argument('--name', default=None, help='그래프 이름 (기본: 파일 이름)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"🏗️ 도로 그래프 생성: {options['osm_path']}")
+        try:
+            meta = road_graph.build(options['osm_path'], options['out'], name=options['name'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'도로 그래프 생성 실패: {e}')
+        except road_graph.ET.ParseError as e:
+            raise CommandError(f'OSM 파일을 읽을 수 없습니다: {e}')
+
+        self.stdout.write(
+            f"  노드 {meta['nodes']}개, 간선 {meta['edges']}개, shortcut {meta['shortcuts']}개 "
+            f"({meta['buildSeconds']}초)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✨ 완료: {options['out']}"))
@@ -0,0 +1,45 @@
+"""
+저장된 RouteSegment로 이동 시간 추정 계수 학습 (주기 실행용, 예: 매일 cron)
+
+예:
+    python manage.py fit_travel_estimator
+    python manage.py fit_travel_estimator --min-samples 50 --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.routes import travel_estimator
+
+
+class Command(BaseCommand):
+    help = '도시/이동 수단별 이동 시간 추정 계수(속도, 우회 계수) 학습'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-samples', type=int, default=travel_estimator.DEFAULT_MIN_SAMPLES,
+            help='계수를 만들 최소 구간 수'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='결과만 출력하고 저장하지 않음')
+
+    def handle(self, *args, **options):
+        if options['min_samples'] < 2:
+            raise CommandError('--min-samples는 2 이상이어야 합니다.')
+
+        results = travel_estimator.fit_all(min_samples=options['min_samples'], save=not options['dry_run'])
+        if not results:
+            self.stdout.write(self.style.WARNING('⚠️ 학습할 구간이 부족합니다 (기존 고정 추정치 사용).'))
+            return
+
+        self.stdout.write('📊 이동 시간 추정 계수 (MAE: 학습 계수 / 기존 3분/km)')
+        for (city, mode), result in sorted(results.items()):
+            coef = result['coefficients']
+            self.stdout.write(
+                f"  {city or '*':<16} {mode:<10} "
+                f"{60 / coef.minutes_per_km:6.1f} km/h  우회 ×{coef.detour_factor:.2f}  "
+                f"+{coef.intercept_min:.1f}분  n={result['samples']:<6} "
+                f"MAE {result['maeMin']:.1f} / {result['baselineMaeMin']:.1f}분"
+            )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('\n✨ 완료 (dry run, 저장하지 않음)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\n✨ 계수 {len(results)}개 저장 완료'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:47
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0001_initial'),
+        ('trips', '0003_trip_is_shared_trip_share_id_trip_shared_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripMatrix',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_ids', models.JSONField(default=list, verbose_name='Event ids (index 1..n)')),
+                ('points', models.JSONField(default=list, verbose_name='Coordinates by index')),
+                ('durations', models.BinaryField(default=bytes, verbose_name='Durations (float32, min)')),
+                ('distances', models.BinaryField(default=bytes, verbose_name='Distances (float32, km)')),
+                ('trip', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='matrix', to='trips.trip')),
+            ],
+            options={
+                'db_table': 'trip_matrices',
+            },
+        ),
+    ]
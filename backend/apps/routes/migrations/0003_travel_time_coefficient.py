@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:54
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0002_trip_matrix'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TravelTimeCoefficient',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('city', models.CharField(blank=True, max_length=255, verbose_name='City (blank = all)')),
+                ('travel_mode', models.CharField(choices=[('WALKING', 'Walking'), ('TRANSIT', 'Transit'), ('DRIVING', 'Driving'), ('BICYCLING', 'Bicycling')], max_length=20, verbose_name='Travel mode')),
+                ('detour_factor', models.FloatField(verbose_name='Road / straight-line distance')),
+                ('minutes_per_km', models.FloatField(verbose_name='Minutes per road km')),
+                ('intercept_min', models.FloatField(default=0, verbose_name='Fixed minutes per leg')),
+                ('samples', models.IntegerField(verbose_name='Fitted segments')),
+                ('mae_min', models.FloatField(verbose_name='Mean absolute error (minutes)')),
+            ],
+            options={
+                'db_table': 'travel_time_coefficients',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='traveltimecoefficient',
+            constraint=models.UniqueConstraint(fields=('city', 'travel_mode'), name='unique_travel_time_coefficient'),
+        ),
+    ]
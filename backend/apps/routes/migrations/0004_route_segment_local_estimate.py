@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0003_travel_time_coefficient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='routesegment',
+            name='local_estimate',
+            field=models.BooleanField(default=False, verbose_name='Local estimate'),
+        ),
+    ]
@@ -37,6 +37,9 @@ class RouteSegment(TimeStampedModel):
         help_text='HH:MM format (사용자가 설정한 출발 시간)'
     )
     
+    # 가까운 구간을 API 없이 도보 추정치로 만든 경우 (update_route의 refresh로 다시 조회 가능)
+    local_estimate = models.BooleanField(default=False, verbose_name='Local estimate')
+    
     # Note: costs는 reverse FK로 자동 생성 (related_name='costs')
     
     class Meta:
@@ -51,3 +54,56 @@ class RouteSegment(TimeStampedModel):
         from_title = self.from_event.display_title if self.from_event else "Start"
         to_title = self.to_event.display_title
         return f"{from_title} → {to_title} ({self.travel_mode})"
+
+
+class TripMatrix(TimeStampedModel):
+    """
+    Trip별 이동 시간/거리 행렬 (최적화/삽입 제안/후보 평가가 공유)
+
+    - 0번 = 시작 지점, 1..n번 = event_ids 순서의 Event (위치가 있는 Event만)
+    - durations/distances: float32 배열(array('f'))을 row-major로 저장, NaN = 아직 모름
+    - points: 인덱스별 좌표 [lat, lng] - 좌표가 바뀌면 해당 행/열을 비웁니다.
+    - 값은 필요할 때 채워집니다 (apps.routes.trip_matrix).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    trip = models.OneToOneField('trips.Trip', on_delete=models.CASCADE, related_name='matrix')
+    event_ids = models.JSONField(default=list, verbose_name='Event ids (index 1..n)')
+    points = models.JSONField(default=list, verbose_name='Coordinates by index')
+    durations = models.BinaryField(default=bytes, verbose_name='Durations (float32, min)')
+    distances = models.BinaryField(default=bytes, verbose_name='Distances (float32, km)')
+
+    class Meta:
+        db_table = 'trip_matrices'
+
+    def __str__(self):
+        return f"Trip {self.trip_id} matrix ({len(self.event_ids) + 1}x{len(self.event_ids) + 1})"
+
+
+class TravelTimeCoefficient(TimeStampedModel):
+    """
+    저장된 RouteSegment로 학습한 도시/이동 수단별 이동 시간 추정 계수
+
+    - 도로 거리(km) = 직선 거리 × detour_factor
+    - 이동 시간(분) = intercept_min + 도로 거리 × minutes_per_km
+    - city가 빈 문자열이면 모든 도시의 계수 (해당 도시 계수가 없을 때 사용)
+    - python manage.py fit_travel_estimator가 주기적으로 다시 계산합니다.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    city = models.CharField(max_length=255, blank=True, verbose_name='City (blank = all)')
+    travel_mode = models.CharField(max_length=20, choices=RouteSegment.TRAVEL_MODE_CHOICES, verbose_name='Travel mode')
+    detour_factor = models.FloatField(verbose_name='Road / straight-line distance')
+    minutes_per_km = models.FloatField(verbose_name='Minutes per road km')
+    intercept_min = models.FloatField(default=0, verbose_name='Fixed minutes per leg')
+    samples = models.IntegerField(verbose_name='Fitted segments')
+    mae_min = models.FloatField(verbose_name='Mean absolute error (minutes)')
+
+    class Meta:
+        db_table = 'travel_time_coefficients'
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'travel_mode'], name='unique_travel_time_coefficient'),
+        ]
+
+    def __str__(self):
+        return f"{self.city or '*'} {self.travel_mode}: {self.minutes_per_km:.2f} min/km × {self.detour_factor:.2f}"
@@ -0,0 +1,433 @@
+"""
+Matrix 기반 경로 최적화 알고리즘
+
+- 모든 함수는 인덱스 기반 비용 행렬(matrix[from][to])을 사용합니다.
+  0번 노드 = 시작 지점, 1..n번 노드 = 장소
+- route는 시작 지점을 제외한 방문 노드 인덱스 리스트입니다.
+- Django/ORM에 의존하지 않는 순수 Python 데이터만 다룹니다.
+- deadline(time.monotonic 기준)이 지나면 지금까지의 최선 해를 반환합니다 (anytime).
+"""
+import random
+import time
+
+INF = float('inf')
+
+
+def deadline_passed(deadline):
+    """deadline(time.monotonic 기준)이 지났는지 여부"""
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def parse_hhmm(value):
+    """'HH:MM' 문자열을 자정 기준 분으로 변환 (형식이 잘못되면 None)"""
+    if not value:
+        return None
+    try:
+        hours, minutes = str(value).split(':')
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+
+def format_hhmm(minutes):
+    """자정 기준 분을 'HH:MM' 문자열로 변환 (24시 이후는 다음날로 넘어감)"""
+    minutes = int(round(minutes)) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def route_cost(matrix, route):
+    """시작 지점(0)에서 출발해 route를 순서대로 방문하는 총 비용"""
+    total = 0
+    current = 0
+    for node in route:
+        total += matrix[current][node]
+        current = node
+    return total
+
+
+def sub_matrix(matrix, nodes):
+    """시작 지점(0) + nodes만 남긴 행렬 (새 노드 k = nodes[k-1])"""
+    keep = [0] + list(nodes)
+    return [[matrix[i][j] for j in keep] for i in keep]
+
+
+def nearest_neighbor(matrix, nodes):
+    """Nearest Neighbor 초기 해 (시작 지점에서 출발)"""
+    unvisited = list(nodes)
+    route = []
+    current = 0
+
+    while unvisited:
+        nearest = min(unvisited, key=lambda node: matrix[current][node])
+        route.append(nearest)
+        unvisited.remove(nearest)
+        current = nearest
+
+    return route
+
+
+def insertion_costs(matrix, route, node):
+    """
+    node를 route의 각 위치(0..len)에 삽입할 때의 추가 비용 목록 (O(n))
+
+    - 위치 p에 삽입 = route[p-1](없으면 시작 지점)과 route[p] 사이
+    - 마지막 위치는 도착 구간만 추가됩니다.
+    """
+    costs = []
+    for position in range(len(route) + 1):
+        prev_node = route[position - 1] if position > 0 else 0
+        added = matrix[prev_node][node]
+        if position < len(route):
+            next_node = route[position]
+            added += matrix[node][next_node] - matrix[prev_node][next_node]
+        costs.append(added)
+    return costs
+
+
+def cheapest_insertion(matrix, route, node):
+    """node를 추가 비용이 가장 작은 위치에 삽입한 새 route"""
+    costs = insertion_costs(matrix, route, node)
+    position = min(range(len(costs)), key=costs.__getitem__)
+    return route[:position] + [node] + route[position:]
+
+
+def two_opt(matrix, route, iterations=2, deadline=None):
+    """
+    2-opt 개선 (비대칭 행렬 지원)
+
+    - 경로를 따라 정방향/역방향 누적 비용을 유지해 구간 뒤집기의 비용 변화를 O(1)로 계산합니다.
+    """
+    best = list(route)
+    for best in iter_two_opt(matrix, route, iterations=iterations, deadline=deadline):
+        pass
+    return best
+
+
+def iter_two_opt(matrix, route, iterations=2, deadline=None):
+    """2-opt 개선 과정에서 더 나은 해를 찾을 때마다 route 사본을 yield (스트리밍용)"""
+    route = list(route)
+    n = len(route)
+    if n < 2:
+        return
+
+    for _ in range(iterations):
+        improved = False
+        forward, backward = _prefix_costs(matrix, route)
+
+        for i in range(n - 1):
+            if deadline_passed(deadline):
+                return
+            for k in range(i + 1, n):
+                delta = _reversal_gain(matrix, route, i, k, forward, backward)
+                if delta < -1e-9:
+                    route[i:k + 1] = route[i:k + 1][::-1]
+                    forward, backward = _prefix_costs(matrix, route)
+                    improved = True
+                    yield list(route)
+
+        if not improved:
+            break
+
+
+def randomized_nearest_neighbor(matrix, nodes, rng, tolerance=0.1):
+    """
+    무작위 tie-break Nearest Neighbor
+
+    - 가장 가까운 노드 대비 (1 + tolerance)배 이내의 후보 중 하나를 무작위로 선택합니다.
+    """
+    unvisited = list(nodes)
+    route = []
+    current = 0
+
+    while unvisited:
+        nearest_cost = min(matrix[current][node] for node in unvisited)
+        limit = nearest_cost * (1 + tolerance) + 1e-9
+        chosen = rng.choice([node for node in unvisited if matrix[current][node] <= limit])
+        route.append(chosen)
+        unvisited.remove(chosen)
+        current = chosen
+
+    return route
+
+
+def double_bridge(route, rng):
+    """
+    Double-bridge kick: A B C D → A C B D
+
+    - 2-opt 한 번으로는 되돌릴 수 없는 섭동이라 다른 local optimum으로 이동할 수 있습니다.
+    """
+    n = len(route)
+    if n < 4:
+        kicked = list(route)
+        rng.shuffle(kicked)
+        return kicked
+    i, j, k = sorted(rng.sample(range(1, n), 3))
+    return route[:i] + route[j:k] + route[i:j] + route[k:]
+
+
+def multi_start(matrix, nodes, starts, seed=None, iterations=50, deadline=None,
+                include_greedy=True, initial_route=None):
+    """
+    Multi-start 최적화: 여러 초기 해에서 2-opt를 돌려 가장 좋은 해를 선택
+
+    - 첫 시작(include_greedy): initial_route 또는 결정적 Nearest Neighbor
+    - 이후 시작은 순환: 최선 해 double-bridge kick(ILS) → 무작위 tie-break NN
+      → 최선 해 kick → 무작위 순열
+    - deadline이 지나면 첫 시작 이후 중단합니다.
+
+    Returns:
+        (route, cost, completed): 최선 해, 비용, 완료한 시작 수
+    """
+    rng = random.Random(seed)
+    nodes = list(nodes)
+    best, best_cost = list(nodes), INF
+    completed = 0
+
+    for attempt in range(starts):
+        if completed and deadline_passed(deadline):
+            break
+
+        if attempt == 0 and include_greedy:
+            seed_route = list(initial_route) if initial_route else nearest_neighbor(matrix, nodes)
+        elif completed and attempt % 2 == 0:
+            seed_route = double_bridge(best, rng)
+        elif attempt % 4 == 3:
+            seed_route = list(nodes)
+            rng.shuffle(seed_route)
+        else:
+            seed_route = randomized_nearest_neighbor(matrix, nodes, rng)
+
+        route = two_opt(matrix, seed_route, iterations=iterations, deadline=deadline)
+        cost = route_cost(matrix, route)
+        completed += 1
+        if cost < best_cost - 1e-9:
+            best, best_cost = route, cost
+
+    return best, best_cost, completed
+
+
+def _prefix_costs(matrix, route):
+    """route 위치별 정방향/역방향 누적 비용 (forward[p] = route[0]→…→route[p])"""
+    forward = [0] * len(route)
+    backward = [0] * len(route)
+    for position in range(1, len(route)):
+        prev_node, node = route[position - 1], route[position]
+        forward[position] = forward[position - 1] + matrix[prev_node][node]
+        backward[position] = backward[position - 1] + matrix[node][prev_node]
+    return forward, backward
+
+
+def _reversal_gain(matrix, route, i, k, forward, backward):
+    """route[i..k] 구간을 뒤집었을 때의 총 비용 변화량"""
+    prev_node = route[i - 1] if i > 0 else 0
+    first, last = route[i], route[k]
+
+    delta = (
+        matrix[prev_node][last] - matrix[prev_node][first]
+        + (backward[k] - backward[i]) - (forward[k] - forward[i])
+    )
+    if k + 1 < len(route):
+        next_node = route[k + 1]
+        delta += matrix[first][next_node] - matrix[last][next_node]
+    return delta
+
+
+# ---------------------------------------------------------------------------
+# Time window 제약 최적화
+#
+# - fixed[node]: 고정 시작 시각(분) 또는 None. 고정 이벤트는 그 시각까지 도착해야 하며,
+#   일찍 도착하면 시작 시각까지 대기합니다. 늦게 도착하면 위반(lateness)입니다.
+# - stays[node]: 체류 시간(분). 0번(시작 지점)은 0.
+# ---------------------------------------------------------------------------
+
+def build_schedule(matrix, route, stays, fixed, day_start):
+    """
+    route의 위치별 도착/출발 시각 계산
+
+    Returns:
+        (arrivals, departures): route와 같은 길이의 리스트
+    """
+    arrivals = []
+    departures = []
+    current = 0
+    clock = day_start
+
+    for node in route:
+        clock += matrix[current][node]
+        arrivals.append(clock)
+        deadline = fixed[node]
+        if deadline is not None and clock < deadline:
+            clock = deadline
+        clock += stays[node]
+        departures.append(clock)
+        current = node
+
+    return arrivals, departures
+
+
+def total_lateness(route, arrivals, fixed):
+    """고정 시각 위반 총량 (분)"""
+    return sum(
+        max(0, arrival - fixed[node])
+        for node, arrival in zip(route, arrivals)
+        if fixed[node] is not None
+    )
+
+
+def forward_slack(route, arrivals, fixed):
+    """
+    위치 p의 도착이 최대 몇 분까지 늦어져도 이후 고정 시각을 모두 지킬 수 있는지 (Savelsbergh)
+
+    - 고정 이벤트 앞의 대기 시간이 지연을 흡수합니다.
+    - slack[len(route)] = INF
+    """
+    slack = [INF] * (len(route) + 1)
+    for position in range(len(route) - 1, -1, -1):
+        deadline = fixed[route[position]]
+        if deadline is None:
+            slack[position] = slack[position + 1]
+        else:
+            margin = deadline - arrivals[position]
+            slack[position] = min(margin, max(0, margin) + slack[position + 1])
+    return slack
+
+
+def schedule_objective(matrix, route, stays, fixed, day_start):
+    """(위반 총량, 총 이동 시간) - 사전식으로 작을수록 좋음"""
+    arrivals, _ = build_schedule(matrix, route, stays, fixed, day_start)
+    return (total_lateness(route, arrivals, fixed), route_cost(matrix, route))
+
+
+def _time_window_seed(matrix, nodes, stays, fixed, day_start):
+    """
+    초기 해: 고정 이벤트를 시각 순으로 배치한 뒤,
+    나머지 이벤트를 Nearest Neighbor 순서로 가장 저렴한 위치에 삽입
+    """
+    route = sorted((node for node in nodes if fixed[node] is not None), key=lambda node: fixed[node])
+    flexible = nearest_neighbor(matrix, [node for node in nodes if fixed[node] is None])
+
+    for node in flexible:
+        best_route = None
+        best_key = None
+        for position in range(len(route) + 1):
+            candidate = route[:position] + [node] + route[position:]
+            key = schedule_objective(matrix, candidate, stays, fixed, day_start)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_route = candidate
+        route = best_route
+
+    return route
+
+
+def _reversal_delta(matrix, route, i, k, stays, fixed, departures, arrivals, slack, day_start):
+    """
+    route[i..k] 구간 뒤집기의 (가능 여부, 이동 시간 변화량)
+
+    - i 이전 위치의 출발 시각(prefix)은 그대로 재사용하고,
+      뒤집힌 구간만 시뮬레이션한 뒤 이후 구간은 forward slack으로 O(1) 판정합니다.
+    """
+    prev_node = route[i - 1] if i > 0 else 0
+    clock = departures[i - 1] if i > 0 else day_start
+    old_travel = matrix[prev_node][route[i]]
+    new_travel = 0
+    current = prev_node
+
+    for position in range(k, i - 1, -1):
+        node = route[position]
+        new_travel += matrix[current][node]
+        clock += matrix[current][node]
+        deadline = fixed[node]
+        if deadline is not None:
+            if clock > deadline:
+                return False, 0
+            clock = deadline
+        clock += stays[node]
+        current = node
+
+    for position in range(i, k):
+        old_travel += matrix[route[position]][route[position + 1]]
+
+    if k + 1 < len(route):
+        next_node = route[k + 1]
+        old_travel += matrix[route[k]][next_node]
+        new_travel += matrix[current][next_node]
+        delay = clock + matrix[current][next_node] - arrivals[k + 1]
+        if delay > slack[k + 1]:
+            return False, 0
+
+    return True, new_travel - old_travel
+
+
+def optimize_with_time_windows(matrix, nodes, stays, fixed, day_start, max_passes=50, deadline=None):
+    """
+    Time window 제약을 지키면서 총 이동 시간을 최소화
+
+    1. 고정 시각 순서 + 최저 비용 삽입으로 초기 해 생성
+    2. 위반이 남아 있으면 (위반 총량, 이동 시간) 기준으로 2-opt/relocate 개선
+    3. 위반이 없으면 forward slack으로 빠르게 가능 여부를 판정하며 2-opt 개선
+
+    Returns:
+        list[int]: 방문 순서 (노드 인덱스)
+    """
+    route = None
+    for route in iter_time_windows(matrix, nodes, stays, fixed, day_start, max_passes, deadline):
+        pass
+    return route
+
+
+def iter_time_windows(matrix, nodes, stays, fixed, day_start, max_passes=50, deadline=None):
+    """초기 해와, 이후 더 나은 해를 찾을 때마다 route 사본을 yield (스트리밍용)"""
+    route = _time_window_seed(matrix, nodes, stays, fixed, day_start)
+    yield list(route)
+    if len(route) < 2:
+        return
+
+    for _ in range(max_passes):
+        if deadline_passed(deadline):
+            break
+        improved = False
+        arrivals, departures = build_schedule(matrix, route, stays, fixed, day_start)
+        lateness = total_lateness(route, arrivals, fixed)
+
+        if lateness > 0:
+            best_key = (lateness, route_cost(matrix, route))
+            for i in range(len(route)):
+                if deadline_passed(deadline):
+                    break
+                for j in range(len(route)):
+                    if i == j:
+                        continue
+                    if i < j:
+                        reversed_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                        key = schedule_objective(matrix, reversed_route, stays, fixed, day_start)
+                        if key < best_key:
+                            route, best_key, improved = reversed_route, key, True
+                            yield list(route)
+                    moved = route[:i] + route[i + 1:]
+                    moved.insert(j, route[i])
+                    key = schedule_objective(matrix, moved, stays, fixed, day_start)
+                    if key < best_key:
+                        route, best_key, improved = moved, key, True
+                        yield list(route)
+        else:
+            slack = forward_slack(route, arrivals, fixed)
+            for i in range(len(route) - 1):
+                if deadline_passed(deadline):
+                    break
+                for k in range(i + 1, len(route)):
+                    feasible, delta = _reversal_delta(
+                        matrix, route, i, k, stays, fixed, departures, arrivals, slack, day_start
+                    )
+                    if feasible and delta < -1e-9:
+                        route = route[:i] + route[i:k + 1][::-1] + route[k + 1:]
+                        arrivals, departures = build_schedule(matrix, route, stays, fixed, day_start)
+                        slack = forward_slack(route, arrivals, fixed)
+                        improved = True
+                        yield list(route)
+
+        if not improved:
+            break
@@ -0,0 +1,148 @@
+"""
+최적화 결과 메모이제이션 (프로세스 내 LRU)
+
+- 같은 장소 집합을 반복 최적화하는 경우(세션당 2~5회) 결과를 즉시 반환합니다.
+- fingerprint = (시작 지점, 장소 좌표 집합, 이동 수단, 제약 조건, 이동 시간 행렬) - 장소 순서와 무관
+  (추정치였던 셀이 실제 값으로 바뀌면 다른 fingerprint가 되어 다시 최적화)
+- 장소가 하나만 추가/삭제/교체된 집합은 캐시된 해에서 warm-start 합니다.
+"""
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+from . import optimization
+
+
+def _coord(value):
+    return round(float(value), 6)
+
+
+class OptimizationCache:
+    """장소 집합 fingerprint 기반 최적화 결과 LRU 캐시"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or getattr(settings, 'ROUTE_OPTIMIZATION_CACHE_SIZE', 256)
+        self._entries = OrderedDict()  # fingerprint → (context, place_keys, ordered_keys)
+        self._by_context = {}  # context → {fingerprint: None} (삽입 순서 유지)
+        self._lock = threading.Lock()
+
+    def fingerprint(self, start_location, places, mode='DRIVING', constraints=None, durations=None):
+        """
+        순서와 무관한 fingerprint 계산
+
+        Args:
+            durations: 최적화에 쓸 (n+1)×(n+1) 이동 시간 행렬 (0번 = 시작 지점) - 셀 값도 fingerprint에 포함
+
+        Returns:
+            (fingerprint, context, place_keys): place_keys는 places와 같은 순서의 장소 키 목록
+        """
+        constraints = constraints or {}
+        with_windows = bool(constraints.get('respectTimeWindows'))
+
+        place_keys = []
+        for place in places:
+            key = (_coord(place['lat']), _coord(place['lng']))
+            if with_windows:
+                key += (place.get('startTime') or '', place.get('durationMin'))
+            place_keys.append(key)
+
+        context = (
+            _coord(start_location['lat']),
+            _coord(start_location['lng']),
+            mode,
+            tuple(sorted((name, str(value)) for name, value in constraints.items())),
+        )
+        cells = []
+        if durations is not None:
+            nodes = [context[:2]] + place_keys
+            cells = sorted(
+                (nodes[i], nodes[j], round(float(durations[i][j]), 2))
+                for i in range(len(nodes)) for j in range(len(nodes)) if i != j
+            )
+        digest = hashlib.sha1(repr((context, sorted(place_keys), cells)).encode()).hexdigest()
+        return digest, context, place_keys
+
+    def get(self, fingerprint, place_keys):
+        """
+        캐시된 방문 순서를 현재 요청의 노드 인덱스(1..n)로 변환해 반환 (없으면 None)
+        """
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            self._entries.move_to_end(fingerprint)
+            ordered_keys = entry[2]
+
+        return self._resolve(ordered_keys, place_keys)
+
+    def put(self, fingerprint, context, place_keys, route):
+        """노드 인덱스 route를 장소 키 순서로 저장 (가장 오래 사용되지 않은 항목부터 제거)"""
+        ordered_keys = tuple(place_keys[node - 1] for node in route)
+
+        with self._lock:
+            self._entries[fingerprint] = (context, tuple(place_keys), ordered_keys)
+            self._entries.move_to_end(fingerprint)
+            self._by_context.setdefault(context, {})[fingerprint] = None
+
+            while len(self._entries) > self.max_entries:
+                evicted, (evicted_context, _, _) = self._entries.popitem(last=False)
+                fingerprints = self._by_context.get(evicted_context, {})
+                fingerprints.pop(evicted, None)
+                if not fingerprints:
+                    self._by_context.pop(evicted_context, None)
+
+    def warm_start(self, context, place_keys, matrix):
+        """
+        같은 context에서 장소 하나만 다른(추가/삭제/교체) 캐시 항목으로 초기 해 구성
+
+        - 삭제된 장소는 캐시된 순서에서 제거
+        - 추가된 장소는 matrix 기준 최저 비용 위치에 삽입
+
+        Returns:
+            list[int] | None: 노드 인덱스 초기 해
+        """
+        wanted = Counter(place_keys)
+
+        with self._lock:
+            fingerprints = list(self._by_context.get(context, {}))
+            candidates = [self._entries[fp] for fp in reversed(fingerprints) if fp in self._entries]
+
+        for _, cached_keys, ordered_keys in candidates:
+            cached = Counter(cached_keys)
+            added = wanted - cached
+            removed = cached - wanted
+            if sum(added.values()) > 1 or sum(removed.values()) > 1:
+                continue
+
+            kept_keys = list(ordered_keys)
+            for key in removed:
+                kept_keys.remove(key)
+
+            nodes_by_key = self._nodes_by_key(place_keys)
+            route = [nodes_by_key[key].pop(0) for key in kept_keys]
+            for key in added:
+                route = optimization.cheapest_insertion(matrix, route, nodes_by_key[key].pop(0))
+            return route
+
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def _resolve(self, ordered_keys, place_keys):
+        nodes_by_key = self._nodes_by_key(place_keys)
+        return [nodes_by_key[key].pop(0) for key in ordered_keys]
+
+    @staticmethod
+    def _nodes_by_key(place_keys):
+        nodes_by_key = {}
+        for idx, key in enumerate(place_keys):
+            nodes_by_key.setdefault(key, []).append(idx + 1)
+        return nodes_by_key
+
+
+optimization_cache = OptimizationCache()
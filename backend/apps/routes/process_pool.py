@@ -0,0 +1,270 @@
+"""
+경로 최적화 프로세스 풀
+
+- gunicorn gthread worker(--workers 2 --threads 2)에서 CPU를 많이 쓰는 최적화를 인라인으로 돌리면
+  요청 슬롯 하나를 점유하고 GIL을 잡아 다른 API 응답까지 느려집니다.
+- 큰 최적화는 별도 프로세스 풀에서 실행하고, 요청 스레드는 결과만 기다립니다.
+- 풀은 gunicorn worker 시작 시 미리 띄워 둡니다 (gunicorn.conf.py → warm_up).
+- 작업 입력은 picklable한 dict이며, 비용 행렬은 array('d')로 평탄화해 전달합니다.
+- deadline은 제출 시점 기준 절대 시각으로 worker에 전달되어, 대기열에서 기다린 시간도 예산에 포함됩니다.
+- deadline이 지나면 worker가 지금까지의 최선 해를 반환하고,
+  결과가 그래도 오지 않으면 요청 스레드에서 초기 해(Nearest Neighbor 등)를 반환하며
+  deadline을 무시하고 실행 중인 worker는 종료 후 풀을 재생성합니다.
+"""
+import multiprocessing
+import random
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import optimization
+
+# worker가 deadline 이후 결과를 돌려주기까지 기다리는 여유 시간 (초)
+RESULT_GRACE_SECONDS = 0.5
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def tsp_task(matrix, size, iterations=2, initial_route=None):
+    """Nearest Neighbor + 2-opt 작업"""
+    return {
+        'kind': 'tsp',
+        'matrix': _pack_matrix(matrix),
+        'size': size,
+        'iterations': iterations,
+        'initialRoute': list(initial_route) if initial_route else None,
+    }
+
+
+def time_window_task(matrix, stays, fixed, day_start):
+    """Time window 제약 최적화 작업"""
+    return {
+        'kind': 'time_windows',
+        'matrix': _pack_matrix(matrix),
+        'size': len(stays) - 1,
+        'stays': list(stays),
+        'fixed': list(fixed),
+        'dayStart': day_start,
+    }
+
+
+def multi_start_task(matrix, size, starts, seed, iterations=50, include_greedy=True, initial_route=None):
+    """Multi-start 무작위 최적화 작업 (worker 하나가 맡을 시작 수만큼)"""
+    return {
+        'kind': 'multi_start',
+        'matrix': _pack_matrix(matrix),
+        'size': size,
+        'starts': starts,
+        'seed': seed,
+        'iterations': iterations,
+        'includeGreedy': include_greedy,
+        'initialRoute': list(initial_route) if initial_route else None,
+    }
+
+
+def solve_task(task, time_budget=None, deadline_at=None):
+    """
+    작업 실행 (worker 프로세스/인라인 공용)
+
+    - deadline_at: 요청 스레드가 정한 종료 시각 (time.time() 기준, 프로세스 간 공유)
+
+    Returns:
+        dict: {'route': 노드 인덱스 목록, 'timedOut': deadline 도달 여부}
+              (multi_start는 'startsCompleted' 추가)
+    """
+    if deadline_at is not None:
+        remaining = max(0.0, deadline_at - time.time())
+        time_budget = min(time_budget, remaining) if time_budget else remaining
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    matrix = _unpack_matrix(task['matrix'], task['size'] + 1)
+    nodes = list(range(1, task['size'] + 1))
+    result = {}
+
+    if task['kind'] == 'time_windows':
+        route = optimization.optimize_with_time_windows(
+            matrix, nodes, task['stays'], task['fixed'], task['dayStart'], deadline=deadline
+        )
+    elif task['kind'] == 'multi_start':
+        route, _, completed = optimization.multi_start(
+            matrix, nodes, task['starts'], seed=task['seed'], iterations=task['iterations'],
+            deadline=deadline, include_greedy=task['includeGreedy'], initial_route=task['initialRoute'],
+        )
+        result['startsCompleted'] = completed
+    else:
+        route = task['initialRoute'] or optimization.nearest_neighbor(matrix, nodes)
+        route = optimization.two_opt(matrix, route, iterations=task['iterations'], deadline=deadline)
+
+    result.update({'route': route, 'timedOut': optimization.deadline_passed(deadline)})
+    return result
+
+
+def seed_task(task):
+    """풀 결과를 기다리지 못했을 때 반환할 빠른 초기 해"""
+    if task.get('initialRoute'):
+        return list(task['initialRoute'])
+    matrix = _unpack_matrix(task['matrix'], task['size'] + 1)
+    return optimization.nearest_neighbor(matrix, range(1, task['size'] + 1))
+
+
+def run(task, time_budget=None):
+    """
+    작업을 프로세스 풀(큰 작업) 또는 인라인(작은 작업/풀 비활성화)으로 실행
+
+    Returns:
+        dict: {'route', 'timedOut', 'offloaded'}
+    """
+    return run_many([task], time_budget)[0]
+
+
+def run_many(tasks, time_budget=None):
+    """
+    여러 작업을 프로세스 풀에서 동시에 실행 (풀을 쓰지 않으면 순서대로 인라인 실행)
+
+    - 모든 작업이 같은 deadline을 공유하며, 제때 끝나지 않은 작업은 초기 해로 대체합니다.
+    - deadline 후에도 실행 중인 작업이 있으면 그 worker를 종료하고 풀을 재생성합니다.
+
+    Returns:
+        list[dict]: tasks와 같은 순서의 {'route', 'timedOut', 'offloaded'}
+    """
+    if time_budget is None:
+        time_budget = settings.ROUTE_OPTIMIZER_TIME_BUDGET_MS / 1000
+
+    executor = None
+    if tasks and max(task['size'] for task in tasks) >= settings.ROUTE_OPTIMIZER_POOL_MIN_PLACES:
+        executor = get_executor()
+
+    if executor is None:
+        return [dict(solve_task(task, time_budget), offloaded=False) for task in tasks]
+
+    deadline_at = time.time() + time_budget
+    try:
+        futures = [executor.submit(solve_task, task, time_budget, deadline_at) for task in tasks]
+    except BrokenProcessPool:
+        print("❌ 최적화 프로세스 풀 손상 - 재생성 후 인라인 실행")
+        shutdown()
+        return [dict(solve_task(task, time_budget), offloaded=False) for task in tasks]
+
+    wait_until = time.monotonic() + time_budget + RESULT_GRACE_SECONDS
+    results = []
+    stuck = False
+    for task, future in zip(tasks, futures):
+        try:
+            result = future.result(timeout=max(0, wait_until - time.monotonic()))
+            result['offloaded'] = True
+        except FutureTimeoutError:
+            # 아직 대기열에 있으면 취소, 이미 실행 중이면 worker가 deadline을 지키지 못한 것
+            if not future.cancel():
+                stuck = True
+            result = {'route': seed_task(task), 'timedOut': True, 'offloaded': True}
+        except BrokenProcessPool:
+            print("❌ 최적화 프로세스 풀 손상 - 재생성 후 인라인 실행")
+            shutdown()
+            result = dict(solve_task(task, time_budget), offloaded=False)
+        results.append(result)
+    if stuck:
+        _recycle(executor)
+    return results
+
+
+def run_multi_start(matrix, size, starts, time_budget=None, initial_route=None, seed=None):
+    """
+    Multi-start 최적화를 worker 수만큼 나눠 병렬 실행하고 가장 좋은 해를 반환
+
+    - 풀을 쓰지 않으면 한 작업으로 인라인 실행합니다.
+    - worker마다 다른 난수 seed를 쓰며, 결정적 초기 해(Nearest Neighbor/initial_route)는 첫 작업만 포함합니다.
+
+    Returns:
+        dict: {'route', 'timedOut', 'offloaded', 'startsCompleted'}
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    workers = 1
+    if size >= settings.ROUTE_OPTIMIZER_POOL_MIN_PLACES:
+        workers = max(1, settings.ROUTE_OPTIMIZER_PROCESSES)
+    workers = min(workers, starts)
+
+    tasks = []
+    for idx in range(workers):
+        count = starts // workers + (1 if idx < starts % workers else 0)
+        tasks.append(multi_start_task(
+            matrix, size, count, seed=seed + idx,
+            include_greedy=(idx == 0), initial_route=initial_route if idx == 0 else None,
+        ))
+
+    results = run_many(tasks, time_budget)
+    best = min(results, key=lambda result: optimization.route_cost(matrix, result['route']))
+    return {
+        'route': best['route'],
+        'timedOut': any(result['timedOut'] for result in results),
+        'offloaded': best['offloaded'],
+        'startsCompleted': sum(result.get('startsCompleted', 0) for result in results),
+    }
+
+
+def get_executor():
+    """프로세스 풀 반환 (ROUTE_OPTIMIZER_PROCESSES=0이면 None)"""
+    global _executor
+
+    processes = settings.ROUTE_OPTIMIZER_PROCESSES
+    if processes <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # gthread worker 안에서 fork하면 다른 스레드의 lock 상태까지 복제되므로 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def warm_up():
+    """worker 시작 시 풀 프로세스를 미리 띄움 (첫 요청의 spawn 지연 제거)"""
+    executor = get_executor()
+    if executor is None:
+        return
+    futures = [executor.submit(_noop) for _ in range(settings.ROUTE_OPTIMIZER_PROCESSES)]
+    for future in futures:
+        future.result()
+
+
+def shutdown():
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _recycle(executor):
+    """deadline 후에도 실행 중인 worker 종료 (다음 get_executor에서 풀 재생성)"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    print("⚠️ 최적화 worker가 deadline 후에도 응답하지 않음 - worker 종료 후 풀 재생성")
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _noop():
+    return None
+
+
+def _pack_matrix(matrix):
+    return array('d', (value for row in matrix for value in row))
+
+
+def _unpack_matrix(flat, size):
+    return [flat[row * size:(row + 1) * size].tolist() for row in range(size)]
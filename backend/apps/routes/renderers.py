@@ -0,0 +1,28 @@
+"""
+Server-Sent Events 렌더러
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+def format_event(event, data):
+    """SSE 이벤트 한 건 (event/data 필드 + 빈 줄)"""
+    payload = json.dumps(data, ensure_ascii=False, cls=DjangoJSONEncoder)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    text/event-stream 콘텐츠 협상용 렌더러
+
+    - 정상 응답은 뷰가 StreamingHttpResponse로 직접 보냅니다.
+    - 스트림 시작 전에 발생한 에러(검증 실패 등)는 error 이벤트 한 건으로 렌더링합니다.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
@@ -0,0 +1,631 @@
+"""
+로컬 도로 그래프 라우팅 (Contraction Hierarchies)
+
+- OSM 추출본(.osm XML)에서 차량 도로망을 읽어 Contraction Hierarchies로 전처리하고,
+  결과를 CSR 배열 파일로 저장합니다 (python manage.py build_road_graph).
+- 서버는 배열 파일을 mmap으로 열어 worker 간 페이지를 공유하고,
+  상향(upward) 탐색만으로 구간/행렬 질의에 답합니다.
+- GoogleMapsService가 캐시 다음, 유료 API 이전 단계로 사용합니다 (ROAD_GRAPH_DIR이 비어 있으면 비활성화).
+- 외부 의존성 없이 표준 라이브러리만 사용합니다.
+
+디렉터리 구조 (도시별 하위 디렉터리 또는 ROAD_GRAPH_DIR 자체):
+    meta.json, lat.bin, lng.bin, fwd_first.bin, fwd_head.bin, ... (배열별 raw 파일)
+    grid_first.bin, grid_nodes.bin: 좌표 → 노드 격자 색인 (CSR, 칸 범위는 meta.json의 grid)
+"""
+import heapq
+import json
+import math
+import mmap
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+from django.conf import settings
+
+FORMAT_VERSION = 2
+
+# 도로 종류별 기본 속도 (km/h) - maxspeed 태그가 있으면 우선
+HIGHWAY_SPEEDS_KMH = {
+    'motorway': 90, 'motorway_link': 45,
+    'trunk': 70, 'trunk_link': 40,
+    'primary': 50, 'primary_link': 30,
+    'secondary': 40, 'secondary_link': 25,
+    'tertiary': 35, 'tertiary_link': 20,
+    'unclassified': 25, 'residential': 25,
+    'living_street': 10, 'service': 15,
+}
+
+# 도로 밖 지점 ↔ 가장 가까운 도로 노드 접근 속도 (km/h)
+ACCESS_SPEED_KMH = 20
+
+# 좌표 → 노드 격자 색인 칸 크기 (도)
+SNAP_CELL_DEG = 0.005
+
+# 전처리 witness 탐색에서 settle할 최대 노드 수 (넘으면 shortcut을 추가해 정확성 유지)
+WITNESS_SETTLE_LIMIT = 200
+
+ARRAY_TYPES = {
+    'lat': 'd', 'lng': 'd',
+    'fwd_first': 'i', 'fwd_head': 'i', 'fwd_time': 'f', 'fwd_dist': 'f', 'fwd_via': 'i',
+    'bwd_first': 'i', 'bwd_head': 'i', 'bwd_time': 'f', 'bwd_dist': 'f', 'bwd_via': 'i',
+    'grid_first': 'i', 'grid_nodes': 'i',
+}
+
+INF = float('inf')
+
+
+def _haversine_m(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2)
+    return 6371000 * 2 * math.asin(math.sqrt(a))
+
+
+def encode_polyline(coords):
+    """[(lat, lng)] → Google encoded polyline 문자열"""
+    result = []
+    prev_lat = prev_lng = 0
+    for lat, lng in coords:
+        lat_e5, lng_e5 = int(round(lat * 1e5)), int(round(lng * 1e5))
+        for delta in (lat_e5 - prev_lat, lng_e5 - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lng = lat_e5, lng_e5
+    return ''.join(result)
+
+
+def decode_polyline(encoded):
+    """Google encoded polyline 문자열 → [(lat, lng)]"""
+    coords = []
+    idx = lat_e5 = lng_e5 = 0
+    while idx < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = value = 0
+            while True:
+                byte = ord(encoded[idx]) - 63
+                idx += 1
+                value |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else value >> 1)
+        lat_e5 += deltas[0]
+        lng_e5 += deltas[1]
+        coords.append((lat_e5 / 1e5, lng_e5 / 1e5))
+    return coords
+
+
+# ---------------------------------------------------------------------------
+# OSM 읽기
+# ---------------------------------------------------------------------------
+
+def _speed_kmh(tags):
+    maxspeed = tags.get('maxspeed', '').split(' ')[0]
+    if maxspeed.isdigit():
+        return float(maxspeed)
+    return HIGHWAY_SPEEDS_KMH[tags['highway']]
+
+
+def parse_osm(path):
+    """
+    OSM XML에서 차량 통행 가능한 도로만 읽어 방향 그래프로 변환
+
+    Returns:
+        tuple: (coords [(lat, lng)], edges [(from, to, 시간(초), 거리(m))])
+               - 도로에 쓰인 노드만 0..n-1로 다시 번호를 매깁니다.
+    """
+    node_coords = {}
+    ways = []
+
+    for _, element in ET.iterparse(path, events=('end',)):
+        if element.tag == 'node':
+            node_coords[element.get('id')] = (float(element.get('lat')), float(element.get('lon')))
+            element.clear()
+        elif element.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in element.findall('tag')}
+            if tags.get('highway') in HIGHWAY_SPEEDS_KMH and tags.get('access') not in ('no', 'private'):
+                refs = [nd.get('ref') for nd in element.findall('nd')]
+                ways.append((refs, tags))
+            element.clear()
+
+    index = {}
+    coords = []
+    edges = []
+    for refs, tags in ways:
+        refs = [ref for ref in refs if ref in node_coords]
+        speed_mps = _speed_kmh(tags) / 3.6
+        oneway = tags.get('oneway')
+        if oneway is None and tags.get('junction') == 'roundabout':
+            oneway = 'yes'
+
+        for a, b in zip(refs, refs[1:]):
+            for ref in (a, b):
+                if ref not in index:
+                    index[ref] = len(coords)
+                    coords.append(node_coords[ref])
+            u, v = index[a], index[b]
+            meters = _haversine_m(*coords[u], *coords[v])
+            seconds = meters / speed_mps
+            if oneway == '-1':
+                edges.append((v, u, seconds, meters))
+                continue
+            edges.append((u, v, seconds, meters))
+            if oneway not in ('yes', 'true', '1'):
+                edges.append((v, u, seconds, meters))
+
+    return coords, edges
+
+
+# ---------------------------------------------------------------------------
+# Contraction Hierarchies 전처리
+# ---------------------------------------------------------------------------
+
+def contract(node_count, edges):
+    """
+    Contraction Hierarchies 전처리
+
+    - 중요도(edge difference + 이미 축약된 이웃 수)가 낮은 노드부터 축약하고 (lazy update),
+      witness 경로가 없는 이웃 쌍에만 shortcut을 추가합니다.
+    - 각 노드의 상향 간선만 남깁니다:
+      fwd[v] = v → 더 높은 노드, bwd[v] = 더 높은 노드 → v (역방향 탐색용)
+
+    Returns:
+        dict: CSR 배열 (ARRAY_TYPES에서 lat/lng를 제외한 항목)
+    """
+    out = [dict() for _ in range(node_count)]
+    inn = [dict() for _ in range(node_count)]
+    for u, v, seconds, meters in edges:
+        if u != v and (v not in out[u] or seconds < out[u][v][0]):
+            out[u][v] = inn[v][u] = (seconds, meters, -1)
+
+    def witness_distances(source, skip, limit, targets):
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        remaining = set(targets)
+        settled = 0
+        while heap and remaining:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > limit or settled >= WITNESS_SETTLE_LIMIT:
+                break
+            remaining.discard(x)
+            settled += 1
+            for y, (seconds, _, _) in out[x].items():
+                if y == skip:
+                    continue
+                nd = d + seconds
+                if nd < dist.get(y, INF):
+                    dist[y] = nd
+                    heapq.heappush(heap, (nd, y))
+        return dist
+
+    def shortcuts(v):
+        result = []
+        for u, (in_time, in_dist, _) in inn[v].items():
+            targets = {w: in_time + edge[0] for w, edge in out[v].items() if w != u}
+            if not targets:
+                continue
+            dist = witness_distances(u, v, max(targets.values()), targets)
+            for w, via_time in targets.items():
+                if dist.get(w, INF) > via_time:
+                    result.append((u, w, via_time, in_dist + out[v][w][1]))
+        return result
+
+    contracted_neighbors = [0] * node_count
+
+    def priority(v):
+        return len(shortcuts(v)) - len(inn[v]) - len(out[v]) + contracted_neighbors[v]
+
+    heap = [(priority(v), v) for v in range(node_count)]
+    heapq.heapify(heap)
+    up_fwd = [None] * node_count
+    up_bwd = [None] * node_count
+
+    while heap:
+        _, v = heapq.heappop(heap)
+        current = priority(v)
+        if heap and current > heap[0][0]:
+            heapq.heappush(heap, (current, v))
+            continue
+
+        added = shortcuts(v)
+        up_fwd[v] = [(w, *edge) for w, edge in out[v].items()]
+        up_bwd[v] = [(u, *edge) for u, edge in inn[v].items()]
+        for w in out[v]:
+            del inn[w][v]
+            contracted_neighbors[w] += 1
+        for u in inn[v]:
+            del out[u][v]
+            contracted_neighbors[u] += 1
+        out[v] = inn[v] = None
+
+        for u, w, seconds, meters in added:
+            if w not in out[u] or seconds < out[u][w][0]:
+                out[u][w] = inn[w][u] = (seconds, meters, v)
+
+    arrays = {}
+    for prefix, lists in (('fwd', up_fwd), ('bwd', up_bwd)):
+        first = array('i', [0])
+        head, times, dists, vias = array('i'), array('f'), array('f'), array('i')
+        for items in lists:
+            for target, seconds, meters, via in items:
+                head.append(target)
+                times.append(seconds)
+                dists.append(meters)
+                vias.append(via)
+            first.append(len(head))
+        arrays.update({
+            f'{prefix}_first': first, f'{prefix}_head': head, f'{prefix}_time': times,
+            f'{prefix}_dist': dists, f'{prefix}_via': vias,
+        })
+    return arrays
+
+
+def _cell(lat, lng):
+    return (math.floor(lat / SNAP_CELL_DEG), math.floor(lng / SNAP_CELL_DEG))
+
+
+def snap_grid(coords):
+    """
+    노드 좌표 → 격자 색인 (CSR): 칸 (row0 + r, col0 + c)의 노드는 grid_nodes[grid_first[k]:grid_first[k + 1]]
+    (k = r * cols + c). 배열 dict와 칸 범위 {'row0', 'col0', 'rows', 'cols'} 반환
+    """
+    cells = [_cell(lat, lng) for lat, lng in coords]
+    row0 = min(row for row, _ in cells)
+    col0 = min(col for _, col in cells)
+    bounds = {
+        'row0': row0,
+        'col0': col0,
+        'rows': max(row for row, _ in cells) - row0 + 1,
+        'cols': max(col for _, col in cells) - col0 + 1,
+    }
+    counts = [0] * (bounds['rows'] * bounds['cols'] + 1)
+    slots = [(row - row0) * bounds['cols'] + (col - col0) for row, col in cells]
+    for slot in slots:
+        counts[slot + 1] += 1
+    for k in range(1, len(counts)):
+        counts[k] += counts[k - 1]
+
+    first = array('i', counts)
+    nodes = array('i', [0] * len(cells))
+    cursor = counts[:-1]
+    for node, slot in enumerate(slots):
+        nodes[cursor[slot]] = node
+        cursor[slot] += 1
+    return {'grid_first': first, 'grid_nodes': nodes}, bounds
+
+
+def build(osm_path, out_dir, name=None):
+    """OSM 추출본 → CH 배열 파일 (out_dir). 통계 dict 반환"""
+    started = time.monotonic()
+    coords, edges = parse_osm(osm_path)
+    if not coords:
+        raise ValueError('차량 도로가 없는 OSM 파일입니다.')
+
+    arrays = contract(len(coords), edges)
+    arrays['lat'] = array('d', (lat for lat, _ in coords))
+    arrays['lng'] = array('d', (lng for _, lng in coords))
+    grid_arrays, grid = snap_grid(coords)
+    arrays.update(grid_arrays)
+
+    os.makedirs(out_dir, exist_ok=True)
+    for key, values in arrays.items():
+        with open(os.path.join(out_dir, f'{key}.bin'), 'wb') as f:
+            values.tofile(f)
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'name': name or os.path.splitext(os.path.basename(osm_path))[0],
+        'nodes': len(coords),
+        'edges': len(edges),
+        'shortcuts': len(arrays['fwd_head']) + len(arrays['bwd_head']) - len(edges),
+        'bbox': [
+            min(arrays['lat']), min(arrays['lng']), max(arrays['lat']), max(arrays['lng'])
+        ],
+        'grid': grid,
+        'source': os.path.basename(osm_path),
+        'createdAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    meta['buildSeconds'] = round(time.monotonic() - started, 2)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# 질의
+# ---------------------------------------------------------------------------
+
+class RoadGraph:
+    """mmap으로 연 CH 그래프 하나 (도시 하나)"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(
+                f"지원하지 않는 그래프 형식입니다: {self.meta.get('version')} (build_road_graph로 다시 만드세요)"
+            )
+
+        self._maps = []
+        for key, typecode in ARRAY_TYPES.items():
+            setattr(self, key, self._open(os.path.join(path, f'{key}.bin'), typecode))
+        # 격자 색인도 build()가 배열로 저장해 두므로 worker마다 다시 만들지 않음 (mmap 공유)
+        self.grid = self.meta['grid']
+
+    def _open(self, file_path, typecode):
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return array(typecode)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def _cell_nodes(self, row, col):
+        r, c = row - self.grid['row0'], col - self.grid['col0']
+        if not (0 <= r < self.grid['rows'] and 0 <= c < self.grid['cols']):
+            return ()
+        k = r * self.grid['cols'] + c
+        return self.grid_nodes[self.grid_first[k]:self.grid_first[k + 1]]
+
+    def contains(self, location, margin_deg=0.01):
+        min_lat, min_lng, max_lat, max_lng = self.meta['bbox']
+        lat, lng = float(location['lat']), float(location['lng'])
+        return (min_lat - margin_deg <= lat <= max_lat + margin_deg and
+                min_lng - margin_deg <= lng <= max_lng + margin_deg)
+
+    def snap(self, location, max_meters):
+        """가장 가까운 도로 노드 (node, 거리 m) - max_meters 안에 없으면 None"""
+        lat, lng = float(location['lat']), float(location['lng'])
+        row, col = _cell(lat, lng)
+        cell_meters = SNAP_CELL_DEG * 111000 * max(math.cos(math.radians(lat)), 0.1)
+        best = None
+        for ring in range(int(max_meters // cell_meters) + 2):
+            for r in range(row - ring, row + ring + 1):
+                for c in range(col - ring, col + ring + 1):
+                    if max(abs(r - row), abs(c - col)) != ring:
+                        continue
+                    for node in self._cell_nodes(r, c):
+                        meters = _haversine_m(lat, lng, self.lat[node], self.lng[node])
+                        if best is None or meters < best[1]:
+                            best = (node, meters)
+            # 이번 링 바깥의 노드는 ring × 칸 크기보다 가까울 수 없음
+            if best is not None and best[1] <= ring * cell_meters:
+                break
+        if best is None or best[1] > max_meters:
+            return None
+        return best
+
+    def _upward(self, source, prefix):
+        """상향 간선만 따라가는 Dijkstra - {node: (시간, 거리, 부모 노드, 간선 인덱스)}"""
+        first, head = getattr(self, f'{prefix}_first'), getattr(self, f'{prefix}_head')
+        times, dists = getattr(self, f'{prefix}_time'), getattr(self, f'{prefix}_dist')
+        labels = {source: (0.0, 0.0, None, None)}
+        heap = [(0.0, source)]
+        settled = set()
+        while heap:
+            d, x = heapq.heappop(heap)
+            if x in settled:
+                continue
+            settled.add(x)
+            meters = labels[x][1]
+            for edge in range(first[x], first[x + 1]):
+                y = head[edge]
+                nd = d + times[edge]
+                if y not in labels or nd < labels[y][0]:
+                    labels[y] = (nd, meters + dists[edge], x, edge)
+                    heapq.heappush(heap, (nd, y))
+        return labels
+
+    def shortest(self, source, target):
+        """노드 간 최단 시간 경로 - (초, m, [노드]) 또는 None(도달 불가)"""
+        if source == target:
+            return 0.0, 0.0, [source]
+        forward = self._upward(source, 'fwd')
+        backward = self._upward(target, 'bwd')
+        meet = min(
+            (node for node in forward if node in backward),
+            key=lambda node: forward[node][0] + backward[node][0],
+            default=None
+        )
+        if meet is None:
+            return None
+
+        nodes = [meet]
+        x = meet
+        while forward[x][2] is not None:
+            parent, edge = forward[x][2], forward[x][3]
+            nodes[:1] = self._unpack(parent, x, self.fwd_via[edge])
+            x = parent
+        x = meet
+        while backward[x][2] is not None:
+            parent, edge = backward[x][2], backward[x][3]
+            nodes[-1:] = self._unpack(x, parent, self.bwd_via[edge])
+            x = parent
+
+        return (forward[meet][0] + backward[meet][0], forward[meet][1] + backward[meet][1], nodes)
+
+    def _unpack(self, u, w, via):
+        """간선 u → w를 원래 도로 노드 목록으로 풀기 (shortcut이면 via 노드 기준 재귀)"""
+        if via < 0:
+            return [u, w]
+        # via는 u, w보다 먼저 축약됐으므로 u → via는 bwd[via], via → w는 fwd[via]에 있음
+        left = self._unpack(u, via, self._via_of('bwd', via, u))
+        right = self._unpack(via, w, self._via_of('fwd', via, w))
+        return left + right[1:]
+
+    def _via_of(self, prefix, node, other):
+        first, head = getattr(self, f'{prefix}_first'), getattr(self, f'{prefix}_head')
+        times, vias = getattr(self, f'{prefix}_time'), getattr(self, f'{prefix}_via')
+        best = min(
+            (edge for edge in range(first[node], first[node + 1]) if head[edge] == other),
+            key=lambda edge: times[edge]
+        )
+        return vias[best]
+
+    def many_to_many(self, sources, targets):
+        """
+        여러 출발/도착 노드 간 최단 시간/거리 (bucket 방식)
+
+        - 도착 노드별 역방향 상향 탐색 결과를 bucket에 모으고,
+          출발 노드별 정방향 상향 탐색에서 bucket을 훑어 최소값을 찾습니다.
+
+        Returns:
+            dict: {(source, target): (초, m)} - 도달 가능한 쌍만
+        """
+        buckets = {}
+        for target in set(targets):
+            for node, (seconds, meters, _, _) in self._upward(target, 'bwd').items():
+                buckets.setdefault(node, []).append((target, seconds, meters))
+
+        results = {}
+        for source in set(sources):
+            for node, (seconds, meters, _, _) in self._upward(source, 'fwd').items():
+                for target, back_seconds, back_meters in buckets.get(node, ()):
+                    total = seconds + back_seconds
+                    current = results.get((source, target))
+                    if current is None or total < current[0]:
+                        results[(source, target)] = (total, meters + back_meters)
+        return results
+
+
+class RoutingEngine:
+    """도시별 RoadGraph 모음 - 위치 dict 기준 구간/행렬 질의"""
+
+    def __init__(self, graphs, max_snap_meters):
+        self.graphs = graphs
+        self.max_snap_meters = max_snap_meters
+
+    def _graph_for(self, locations):
+        for graph in self.graphs:
+            if all(graph.contains(location) for location in locations):
+                return graph
+        return None
+
+    @staticmethod
+    def _leg(seconds, meters):
+        return {'durationMin': int(seconds // 60), 'distanceKm': round(meters / 1000, 2)}
+
+    @staticmethod
+    def _access(snapped):
+        meters = snapped[1]
+        return meters / (ACCESS_SPEED_KMH / 3.6), meters
+
+    def route(self, origin, destination):
+        """구간 경로 {'durationMin', 'distanceKm', 'polyline'} 또는 None (그래프 밖/도달 불가)"""
+        graph = self._graph_for([origin, destination])
+        if graph is None:
+            return None
+        start = graph.snap(origin, self.max_snap_meters)
+        end = graph.snap(destination, self.max_snap_meters)
+        if start is None or end is None:
+            return None
+        found = graph.shortest(start[0], end[0])
+        if found is None:
+            return None
+
+        seconds, meters, nodes = found
+        for snapped in (start, end):
+            access_seconds, access_meters = self._access(snapped)
+            seconds += access_seconds
+            meters += access_meters
+        coords = [(float(origin['lat']), float(origin['lng']))]
+        coords += [(graph.lat[node], graph.lng[node]) for node in nodes]
+        coords.append((float(destination['lat']), float(destination['lng'])))
+        return dict(self._leg(seconds, meters), polyline=encode_polyline(coords))
+
+    def matrix_cells(self, points, cells):
+        """
+        행렬 셀 (i, j) 목록의 이동 시간/거리
+
+        Args:
+            points: 위치 dict 목록 (place_id 문자열은 건너뜀)
+            cells: [(i, j)]
+
+        Returns:
+            dict: {(i, j): {'durationMin', 'distanceKm'}} - 답할 수 있는 셀만
+        """
+        snapped = {}
+        by_graph = {}
+        for i, j in cells:
+            if isinstance(points[i], str) or isinstance(points[j], str):
+                continue
+            graph = self._graph_for([points[i], points[j]])
+            if graph is None:
+                continue
+            for idx in (i, j):
+                if (id(graph), idx) not in snapped:
+                    snapped[(id(graph), idx)] = graph.snap(points[idx], self.max_snap_meters)
+            if snapped[(id(graph), i)] and snapped[(id(graph), j)]:
+                by_graph.setdefault(id(graph), (graph, []))[1].append((i, j))
+
+        results = {}
+        for key, (graph, graph_cells) in by_graph.items():
+            sources = [snapped[(key, i)][0] for i, _ in graph_cells]
+            targets = [snapped[(key, j)][0] for _, j in graph_cells]
+            table = graph.many_to_many(sources, targets)
+            for (i, j), source, target in zip(graph_cells, sources, targets):
+                found = (0.0, 0.0) if source == target else table.get((source, target))
+                if found is None:
+                    continue
+                seconds, meters = found
+                for idx in (i, j):
+                    access_seconds, access_meters = self._access(snapped[(key, idx)])
+                    seconds += access_seconds
+                    meters += access_meters
+                results[(i, j)] = self._leg(seconds, meters)
+        return results
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    ROAD_GRAPH_DIR의 그래프로 만든 RoutingEngine (프로세스당 한 번 로드)
+
+    - ROAD_GRAPH_DIR이 비어 있거나 그래프가 없으면 None (로컬 라우팅 비활성화)
+    """
+    path = settings.ROAD_GRAPH_DIR
+    if not path:
+        return None
+
+    with _engines_lock:
+        if path not in _engines:
+            _engines[path] = _load_engine(path)
+        return _engines[path]
+
+
+def _load_engine(path):
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        directories = [path]
+    elif os.path.isdir(path):
+        directories = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if os.path.exists(os.path.join(path, name, 'meta.json'))
+        )
+    else:
+        directories = []
+
+    graphs = []
+    for directory in directories:
+        try:
+            graphs.append(RoadGraph(directory))
+        except (OSError, ValueError) as e:
+            print(f"❌ 도로 그래프 로드 실패 ({directory}): {e}")
+    if not graphs:
+        print(f"⚠️ ROAD_GRAPH_DIR에 사용할 도로 그래프가 없습니다: {path}")
+        return None
+
+    print(f"🗺️ 도로 그래프 로드: {', '.join(graph.meta['name'] for graph in graphs)}")
+    return RoutingEngine(graphs, settings.ROAD_GRAPH_MAX_SNAP_M)
@@ -0,0 +1,231 @@
+"""
+RouteSegment 구성 규칙 + Trip별 재계산 직렬화
+
+- 경로 API 호출은 트랜잭션/lock 밖에서 끝내고, 저장 단계(기존 segment 다시 조회 → 없는 쌍만 생성)만
+  Postgres advisory lock으로 한 번에 하나씩 진행해 동시 요청이 같은 쌍을 중복 생성하지 않도록 합니다.
+- 순서를 바꾼 요청은 Trip.route_version을 올리고, 재계산은 시작할 때와 저장 lock을 얻은 직후에 버전을 확인해
+  더 새 변경이 있으면 RecomputeSuperseded로 중단합니다 (새 요청이 다시 계산).
+- 구간 조회(fetch_segments)/저장(store_segments)은 Event API와 최적화 적용(apply)이 함께 사용합니다.
+"""
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from .models import RouteSegment
+from .services import GoogleMapsService, estimate_leg, short_hop_leg
+
+# pg_advisory_xact_lock(namespace, key)의 namespace - Trip segment 재계산
+SEGMENT_LOCK_NAMESPACE = 7301
+
+
+class RecomputeSuperseded(Exception):
+    """더 새 순서/위치 변경이 있어 이 재계산 결과는 저장하지 않음"""
+
+
+def segment_pairs(events):
+    """
+    필요한 segment 쌍 리스트 생성 (각 day 내에서만 연결)
+
+    - events는 (day, order_key) 순이어야 합니다.
+    - Day 1의 첫 이벤트만 시작 지점(None)에서 연결됩니다.
+    - 위치가 없는 이벤트와는 연결하지 않습니다.
+
+    Returns:
+        list[tuple]: [(from_event_id | None, to_event_id)]
+    """
+    pairs = []
+
+    if not events:
+        return pairs
+
+    # Day별로 그룹화
+    events_by_day = {}
+    for event in events:
+        events_by_day.setdefault(event.day, []).append(event)
+
+    # 각 day별로 처리
+    for day in sorted(events_by_day.keys(), key=lambda value: (value is None, value)):
+        day_events = events_by_day[day]
+
+        # Start → 첫 이벤트 (Day 1의 첫 이벤트만)
+        if day == 1 and day_events[0].location:
+            pairs.append((None, day_events[0].id))
+
+        # 같은 day 내의 이벤트 간 연결
+        for i in range(len(day_events) - 1):
+            if day_events[i].location and day_events[i + 1].location:
+                pairs.append((day_events[i].id, day_events[i + 1].id))
+
+    return pairs
+
+
+def segment_pair(from_event, to_event, day):
+    """
+    같은 day에서 연속한 두 Event의 segment 쌍 (segment_pairs와 같은 규칙)
+
+    - from_event가 None이면 day 시작 (Day 1만 시작 지점에서 연결)
+
+    Returns:
+        tuple | None: (from_event_id | None, to_event_id)
+    """
+    if to_event is None or not to_event.location:
+        return None
+    if from_event is None:
+        return (None, to_event.id) if day == 1 else None
+    return (from_event.id, to_event.id) if from_event.location else None
+
+
+def lock_segments(trip_id):
+    """
+    현재 트랜잭션이 끝날 때까지 Trip의 segment 재계산 lock (transaction.atomic 안에서 호출)
+
+    - key는 int4라 큰 id는 겹칠 수 있지만, 겹친 두 Trip의 재계산이 순서대로 진행될 뿐입니다.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [SEGMENT_LOCK_NAMESPACE, trip_id % 2 ** 31])
+
+
+def ensure_current(trip, version):
+    """
+    route_version이 그대로인지 확인 (version이 None이면 확인하지 않음)
+
+    Raises:
+        RecomputeSuperseded: 그 사이 다른 요청이 순서/위치를 바꿈
+    """
+    if version is None:
+        return
+    current = type(trip).objects.filter(id=trip.id).values_list('route_version', flat=True).first()
+    if current != version:
+        raise RecomputeSuperseded(f'Trip {trip.id} route_version {version} → {current}')
+
+
+@contextmanager
+def recompute_lock(trip, version=None):
+    """segment 저장 구간 (트랜잭션 + Trip lock, lock을 얻은 직후 버전 확인) - 안에서 API를 호출하지 않음"""
+    with transaction.atomic():
+        lock_segments(trip.id)
+        ensure_current(trip, version)
+        yield
+
+
+def fetch_segments(trip, pairs, events, estimate_failed=False):
+    """
+    저장 전 RouteSegment 목록 - 경로 조회(네트워크 I/O)만 하고 DB에 쓰지 않음 (lock 밖에서 호출)
+
+    - 아주 가까운 구간은 API 없이 도보 추정, 나머지는 공유 I/O 풀에서 병렬 조회
+    - estimate_failed: 조회에 실패한 구간도 추정치(local_estimate)로 만들어 빈 구간을 남기지 않음
+    """
+    google_maps = GoogleMapsService(city=trip.city)
+    events_map = {e.id: e for e in events}
+
+    targets = []
+    for from_id, to_id in pairs:
+        from_event = events_map.get(from_id) if from_id else None
+        to_event = events_map.get(to_id)
+
+        if not to_event or not to_event.location:
+            continue
+
+        from_location = trip.start_location if from_event is None else from_event.location
+        if not from_location:
+            continue
+        targets.append((from_event, to_event, from_location))
+
+    routes = [
+        short_hop_leg(from_location, to_event.location, trip.city)
+        for _, to_event, from_location in targets
+    ]
+    remote = [idx for idx, route in enumerate(routes) if route is None]
+    fetched = google_maps.calculate_routes(
+        [(targets[idx][2], targets[idx][1].location) for idx in remote]
+    )
+    for idx, route in zip(remote, fetched):
+        routes[idx] = route
+
+    segments = []
+    for (from_event, to_event, from_location), route in zip(targets, routes):
+        if not route and estimate_failed:
+            route = dict(estimate_leg(from_location, to_event.location, trip.city), localEstimate=True)
+        if not route:
+            print(f"❌ Segment 생성 실패 {(from_event.id if from_event else None, to_event.id)}")
+            continue
+        segments.append(RouteSegment(
+            trip=trip,
+            from_event=from_event,
+            to_event=to_event,
+            duration_min=route['durationMin'],
+            distance_km=route['distanceKm'],
+            polyline=route.get('polyline', ''),
+            travel_mode=route.get('travelMode', 'DRIVING'),
+            local_estimate=route.get('localEstimate', False)
+        ))
+
+    return segments
+
+
+def store_segments(trip, new_segments, keep=None, stale=(), lost=(), version=None, route_fields=None):
+    """
+    미리 계산한 segment 저장 (Trip lock 안에서 기존 segment를 다시 읽고 아직 없는 쌍만 bulk_create)
+
+    - API 호출은 호출하는 쪽에서 lock/트랜잭션 밖에서 끝내고 결과만 넘깁니다.
+    - keep: 필요한 쌍 전체 - 여기에 없는 기존 segment는 삭제하고 Trip 총계를 다시 계산 (전체 diff)
+    - stale: 이 쌍의 기존 segment는 삭제하고 Trip 총계는 증감 (부분 교체, lost는 이미 삭제된 segment)
+    - version: lock을 얻은 직후 route_version 확인 (바뀌었으면 RecomputeSuperseded, 아무것도 저장하지 않음)
+    - route_fields: {(from_id, to_id): 바꿀 필드} - 저장과 같은 lock 안에서 이동 수단/출발 시간 적용 (batch setRoute)
+
+    Returns:
+        tuple: (만든 segment 목록, 지운 segment 목록)
+    """
+    stale = set(stale)
+    with recompute_lock(trip, version):
+        existing = {(seg.from_event_id, seg.to_event_id): seg for seg in trip.route_segments.all()}
+        deleted = [
+            seg for pair, seg in existing.items()
+            if pair in stale or (keep is not None and pair not in keep)
+        ]
+        if deleted:
+            RouteSegment.objects.filter(id__in=[seg.id for seg in deleted]).delete()
+
+        # 그 사이 다른 요청이 만든 쌍은 건너뜀
+        present = set(existing) - {(seg.from_event_id, seg.to_event_id) for seg in deleted}
+        created = []
+        for seg in new_segments:
+            pair = (seg.from_event_id, seg.to_event_id)
+            if pair not in present:
+                present.add(pair)
+                created.append(seg)
+        if created:
+            created = RouteSegment.objects.bulk_create(created)
+        for (from_id, to_id), fields in (route_fields or {}).items():
+            RouteSegment.objects.filter(trip=trip, from_event_id=from_id, to_event_id=to_id).update(**fields)
+
+        if keep is not None:
+            trip.update_route_summary()
+        else:
+            removed = [*lost, *deleted]
+            trip.add_route_delta(
+                sum(seg.duration_min for seg in created) - sum(seg.duration_min for seg in removed),
+                sum(float(seg.distance_km) for seg in created) - sum(float(seg.distance_km) for seg in removed)
+            )
+            deleted = removed
+    return created, deleted
+
+
+def create_segments(trip, pairs, events, version=None, estimate_failed=False):
+    """
+    segments 생성 - 조회는 lock 밖에서 병렬로, 저장은 store_segments에서 아직 없는 쌍만 bulk_create 1회
+
+    - version: 조회가 끝난 뒤 route_version이 바뀌었으면 저장하지 않고 RecomputeSuperseded
+
+    Returns:
+        list[RouteSegment]: 만든 segment 목록
+    """
+    created, _ = store_segments(trip, fetch_segments(trip, pairs, events, estimate_failed), version=version)
+    return created
+
+
+def superseded_segments(trip, error):
+    """더 새 변경에 밀려 중단된 재계산 - 지금 저장된 segment 반환 (새 요청이 다시 계산함)"""
+    print(f"⏭️ RouteSegment 재계산 중단: {error}")
+    trip.refresh_from_db(fields=['total_duration_min', 'total_distance_km'])
+    return list(trip.route_segments.all())
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 from core.serializers import LocationSerializer, RouteSummarySerializer
 from .models import RouteSegment
+from .optimization import parse_hhmm
 
 
 class PlaceForRouteSerializer(serializers.Serializer):
@@ -25,14 +27,15 @@ class RouteSegmentModelSerializer(serializers.ModelSerializer):
     distanceKm = serializers.DecimalField(source='distance_km', max_digits=10, decimal_places=2)
     travelMode = serializers.CharField(source='travel_mode')
     departureTime = serializers.CharField(source='departure_time', required=False, allow_blank=True)
+    localEstimate = serializers.BooleanField(source='local_estimate', read_only=True)
     
     class Meta:
         model = RouteSegment
         fields = [
             'id', 'fromEventId', 'toEventId', 
-            'durationMin', 'distanceKm', 'polyline', 'travelMode', 'departureTime'
+            'durationMin', 'distanceKm', 'polyline', 'travelMode', 'departureTime', 'localEstimate'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'localEstimate']
 
 
 class RouteSegmentSerializer(serializers.Serializer):
@@ -54,18 +57,59 @@ class RouteCalculateResponseSerializer(serializers.Serializer):
     summary = RouteSummarySerializer()
 
 
+def _validate_hhmm(value):
+    """00:00~23:59 범위의 시각인지 검증 (빈 값은 그대로 통과)"""
+    if value and parse_hhmm(value) is None:
+        raise serializers.ValidationError("올바른 시각(HH:MM, 00:00~23:59)이 아닙니다.")
+    return value
+
+
 class OptimizeRequestPlaceSerializer(serializers.Serializer):
     """최적화 요청용 Place Serializer"""
     id = serializers.CharField()
     placeId = serializers.CharField()
     lat = serializers.FloatField()
     lng = serializers.FloatField()
+    startTime = serializers.RegexField(r'^\d{2}:\d{2}$', required=False, allow_blank=True, help_text='고정 시작 시각 (HH:MM)')
+    durationMin = serializers.IntegerField(required=False, allow_null=True, min_value=0, help_text='체류 시간 (분)')
+    
+    def validate_startTime(self, value):
+        return _validate_hhmm(value)
 
 
 class OptimizeRequestSerializer(serializers.Serializer):
     """루트 최적화 요청 Serializer"""
     startLocation = LocationSerializer()
     places = OptimizeRequestPlaceSerializer(many=True)
+    respectTimeWindows = serializers.BooleanField(required=False, default=False, help_text='startTime/durationMin 제약 반영 여부')
+    dayStartTime = serializers.RegexField(r'^\d{2}:\d{2}$', required=False, default='09:00', help_text='일정 시작 시각 (HH:MM)')
+    starts = serializers.IntegerField(required=False, default=1, min_value=1, help_text='Multi-start 시작 수 (서버 상한 적용)')
+    timeBudgetMs = serializers.IntegerField(required=False, min_value=1, help_text='최적화 시간 예산 (ms, 서버 상한 적용)')
+    
+    def validate_dayStartTime(self, value):
+        return _validate_hhmm(value)
+    
+    def validate_starts(self, value):
+        return min(value, settings.ROUTE_OPTIMIZER_MAX_STARTS)
+    
+    def validate_timeBudgetMs(self, value):
+        return min(value, settings.ROUTE_OPTIMIZER_MAX_TIME_BUDGET_MS)
+    
+    def validate_places(self, places):
+        """장소 id 중복 불가 (최적화 결과를 id로 매핑)"""
+        ids = [place['id'] for place in places]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("장소 id가 중복되었습니다.")
+        return places
+
+
+class TimeWindowViolationSerializer(serializers.Serializer):
+    """고정 시각 위반 Serializer"""
+    id = serializers.CharField()
+    placeId = serializers.CharField(allow_blank=True)
+    startTime = serializers.CharField()
+    arrivalTime = serializers.CharField()
+    lateMin = serializers.IntegerField()
 
 
 class OptimizedPlaceSerializer(serializers.Serializer):
@@ -76,6 +120,7 @@ class OptimizedPlaceSerializer(serializers.Serializer):
     lat = serializers.FloatField()
     lng = serializers.FloatField()
     order = serializers.FloatField()
+    arrivalTime = serializers.CharField(required=False)
 
 
 class OptimizeResultSerializer(serializers.Serializer):
@@ -96,6 +141,43 @@ class OptimizeResponseSerializer(serializers.Serializer):
     original = RouteSummarySerializer()
     optimized = OptimizeResultSerializer()
     improvement = OptimizeImprovementSerializer()
+    violations = TimeWindowViolationSerializer(many=True, required=False)
+    cacheStatus = serializers.ChoiceField(choices=['hit', 'warm', 'miss'], required=False)
+    timedOut = serializers.BooleanField(required=False)
+    startsCompleted = serializers.IntegerField(required=False)
+    legsToken = serializers.CharField(required=False, help_text='optimize/apply에 전달하면 계산된 구간으로 RouteSegment 저장')
+
+
+class OptimizeDaysRequestSerializer(serializers.Serializer):
+    """Multi-day 최적화 요청 Serializer"""
+    totalDays = serializers.IntegerField(required=False, min_value=1, help_text='분할할 day 수 (기본: Trip.total_days)')
+    dayBudgetMin = serializers.IntegerField(required=False, min_value=1, help_text='하루 일정 시간 예산 (분, 기본: 480)')
+
+
+class OptimizedDayEventSerializer(serializers.Serializer):
+    """Multi-day 최적화 결과 Event Serializer (reorder 요청 형식과 호환)"""
+    id = serializers.IntegerField()
+    day = serializers.IntegerField()
+    order = serializers.FloatField()
+    placeName = serializers.CharField(required=False, allow_blank=True)
+    lat = serializers.FloatField(allow_null=True)
+    lng = serializers.FloatField(allow_null=True)
+
+
+class OptimizedDaySerializer(serializers.Serializer):
+    """Multi-day 최적화 결과 Day Serializer"""
+    day = serializers.IntegerField()
+    events = OptimizedDayEventSerializer(many=True)
+    totalStayMin = serializers.IntegerField()
+    totalTravelMin = serializers.IntegerField()
+    totalDistanceKm = serializers.FloatField()
+    overBudget = serializers.BooleanField()
+
+
+class OptimizeDaysResponseSerializer(serializers.Serializer):
+    """Multi-day 최적화 응답 Serializer"""
+    days = OptimizedDaySerializer(many=True)
+    events = OptimizedDayEventSerializer(many=True)
 
 
 class OptimizeApplyPlaceSerializer(serializers.Serializer):
@@ -108,6 +190,7 @@ class OptimizeApplySerializer(serializers.Serializer):
     """최적화 적용 Serializer"""
     events = OptimizeApplyPlaceSerializer(many=True, required=False)
     places = OptimizeApplyPlaceSerializer(many=True, required=False)  # 레거시 호환성
+    legsToken = serializers.CharField(required=False, help_text='optimize 응답의 legsToken (Event 순서 + RouteSegment + Trip 요약을 함께 저장)')
 
 
 class PlaceSearchQuerySerializer(serializers.Serializer):
@@ -134,3 +217,46 @@ class PlaceSearchResponseSerializer(serializers.Serializer):
     results = PlaceSearchResultSerializer(many=True)
     status = serializers.CharField(required=False)
     errorMessage = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class EvaluateRequestSerializer(serializers.Serializer):
+    """후보 순서 평가 요청 Serializer"""
+    day = serializers.IntegerField(min_value=1, help_text='평가할 day (Day 1은 시작 지점 구간 포함)')
+    candidates = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField(), allow_empty=False),
+        min_length=1,
+        max_length=100,
+        help_text='후보별 Event id 방문 순서'
+    )
+    
+    def validate_candidates(self, candidates):
+        """후보 안에서 Event id 중복 불가"""
+        for order in candidates:
+            if len(order) != len(set(order)):
+                raise serializers.ValidationError("후보 순서에 Event id가 중복되었습니다.")
+        return candidates
+
+
+class EvaluatedLegSerializer(serializers.Serializer):
+    """후보 순서 평가 구간 Serializer"""
+    fromEventId = serializers.IntegerField(allow_null=True)
+    toEventId = serializers.IntegerField()
+    durationMin = serializers.FloatField()
+    distanceKm = serializers.FloatField()
+    estimated = serializers.BooleanField()
+
+
+class EvaluatedCandidateSerializer(serializers.Serializer):
+    """후보 순서 평가 결과 Serializer"""
+    index = serializers.IntegerField()
+    totalDurationMin = serializers.FloatField()
+    totalDistanceKm = serializers.FloatField()
+    estimated = serializers.BooleanField(help_text='추정 구간 포함 여부')
+    legs = EvaluatedLegSerializer(many=True)
+
+
+class EvaluateResponseSerializer(serializers.Serializer):
+    """후보 순서 평가 응답 Serializer"""
+    day = serializers.IntegerField()
+    candidates = EvaluatedCandidateSerializer(many=True)
+    bestIndex = serializers.IntegerField()
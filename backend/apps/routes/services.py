@@ -2,15 +2,147 @@ import requests
 from django.conf import settings
 from django.core.cache import cache
 import math
+import time
+import uuid
+
+from . import io_pool, optimization, process_pool, road_graph, travel_estimator
+
+
+def haversine_km(point1, point2):
+    """두 지점 간 직선 거리 (km, Haversine formula)"""
+    lat1, lng1 = float(point1['lat']), float(point1['lng'])
+    lat2, lng2 = float(point2['lat']), float(point2['lng'])
+    
+    R = 6371  # 지구 반경 (km)
+    
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlng / 2) ** 2)
+    c = 2 * math.asin(math.sqrt(a))
+    
+    return R * c
+
+
+def estimate_leg(origin, destination, city=None):
+    """API 없이 구간 이동 시간/거리 추정 (도시별 학습 계수, 없으면 직선 거리 × 3분/km)"""
+    return travel_estimator.estimate(origin, destination, city)
+
+
+def estimate_legs(pairs, city=None):
+    """estimate_leg의 여러 구간 버전 - [(origin, destination)] 순서대로 (계수 조회 1회)"""
+    return travel_estimator.estimate_many(pairs, city)
+
+
+def short_hop_leg(origin, destination, city=None):
+    """
+    아주 가까운 구간(ROUTE_LOCAL_HOP_MAX_M 미만)을 API 없이 도보 구간으로 계산
+    
+    - 이동 시간은 도보 속도 계수(학습 계수 또는 4.5km/h), 경로는 두 지점을 잇는 직선 polyline
+    
+    Returns:
+        dict: {'durationMin', 'distanceKm', 'polyline', 'travelMode', 'localEstimate'} - 대상이 아니면 None
+    """
+    max_meters = settings.ROUTE_LOCAL_HOP_MAX_M
+    if max_meters <= 0 or isinstance(origin, str) or isinstance(destination, str):
+        return None
+    if haversine_km(origin, destination) * 1000 >= max_meters:
+        return None
+    
+    leg = travel_estimator.estimate(origin, destination, city, mode='WALKING')
+    coords = [(float(p['lat']), float(p['lng'])) for p in (origin, destination)]
+    return {
+        'durationMin': math.ceil(leg['durationMin']),
+        'distanceKm': round(leg['distanceKm'], 2),
+        'polyline': road_graph.encode_polyline(coords),
+        'travelMode': 'WALKING',
+        'localEstimate': True
+    }
+
+
+def location_key(location):
+    """캐시 키/API 파라미터용 위치 문자열 (place_id 문자열은 그대로 사용)"""
+    return location if isinstance(location, str) else f"{location['lat']},{location['lng']}"
+
+
+def route_cache_key(origin, destination):
+    """구간 루트 캐시 키 (calculate_route / calculate_routes / calculate_route_chain 공유)"""
+    return f"route:{location_key(origin)}:{location_key(destination)}"
+
+
+# 최적화 결과 구간(legsToken) 보관 시간 (초)
+OPTIMIZED_LEGS_TTL = 1800
+
+
+def _coord_key(location):
+    return (round(float(location['lat']), 6), round(float(location['lng']), 6))
+
+
+def store_optimized_legs(trip_id, start_location, places, matrix):
+    """
+    optimize에서 계산한 구간 행렬을 캐시에 보관하고 토큰 반환 (optimize/apply에서 재사용)
+    
+    - 키는 (출발 장소 id | None(시작 지점), 도착 장소 id)이며, 추정치(estimated) 구간은 저장하지 않습니다.
+    - 적용 시 좌표가 바뀐 장소의 구간은 쓰지 않도록 좌표도 함께 보관합니다.
+    """
+    ids = [None] + [str(place['id']) for place in places]
+    legs = {}
+    for i, from_id in enumerate(ids):
+        for j, to_id in enumerate(ids):
+            if i == j or j == 0 or matrix['estimated'][i][j]:
+                continue
+            legs[(from_id, to_id)] = {
+                'durationMin': int(round(matrix['durationMin'][i][j])),
+                'distanceKm': round(float(matrix['distanceKm'][i][j]), 2)
+            }
+    
+    token = uuid.uuid4().hex
+    cache.set(f"optimized_legs:{token}", {
+        'tripId': trip_id,
+        'start': _coord_key(start_location),
+        'points': {str(place['id']): _coord_key(place) for place in places},
+        'legs': legs
+    }, OPTIMIZED_LEGS_TTL)
+    return token
+
+
+def load_optimized_legs(token, trip_id, start_location, events):
+    """
+    토큰의 구간 중 현재 Event 좌표와 일치하는 것만 반환 (없거나 만료/다른 Trip이면 None)
+    
+    Returns:
+        dict: {(from_event_id | None, to_event_id): {'durationMin', 'distanceKm'}}
+    """
+    stored = cache.get(f"optimized_legs:{token}")
+    if not stored or stored['tripId'] != trip_id:
+        return None
+    
+    valid = {}
+    if start_location and stored['start'] == _coord_key(start_location):
+        valid[None] = None
+    for event in events:
+        location = event.location
+        if location and stored['points'].get(str(event.id)) == _coord_key(location):
+            valid[str(event.id)] = event.id
+    
+    return {
+        (valid[from_id], valid[to_id]): leg
+        for (from_id, to_id), leg in stored['legs'].items()
+        if from_id in valid and to_id in valid
+    }
 
 
 class GoogleMapsService:
     """Google Maps API 서비스"""
     
-    def __init__(self):
+    def __init__(self, city=None):
         self.api_key = settings.GOOGLE_MAPS_API_KEY
+        self.city = city  # 추정치(estimated)에 쓸 도시별 계수 선택
         self.places_api_url = 'https://maps.googleapis.com/maps/api/place'
         self.directions_api_url = 'https://maps.googleapis.com/maps/api/directions/json'
+        self.distance_matrix_api_url = 'https://maps.googleapis.com/maps/api/distancematrix/json'
     
     def search_places(self, query, location=None, radius=None):
         """장소 검색 (Google Places API)"""
@@ -68,75 +200,387 @@ class GoogleMapsService:
     def calculate_route(self, origin, destination):
         """
         두 지점 간 루트 계산 (Google Directions API)
-        메모리 캐시를 먼저 확인하고, 없으면 API 호출
+        메모리 캐시 → 로컬 도로 그래프(ROAD_GRAPH_DIR) → API 순서로 조회
         """
-        # origin, destination이 place_id 형태인 경우
-        origin_key = origin if isinstance(origin, str) else f"{origin['lat']},{origin['lng']}"
-        dest_key = destination if isinstance(destination, str) else f"{destination['lat']},{destination['lng']}"
-        
         # 메모리 캐시 확인 (1시간)
-        cache_key = f"route:{origin_key}:{dest_key}"
+        cache_key = route_cache_key(origin, destination)
         cached_route = cache.get(cache_key)
         
         if cached_route:
             return cached_route
         
+        route_data = self.fetch_route(origin, destination)
+        if route_data:
+            # 메모리 캐시에 저장 (1시간)
+            cache.set(cache_key, route_data, 3600)
+        return route_data
+    
+    def fetch_route(self, origin, destination):
+        """
+        캐시 없이 로컬 도로 그래프 → Directions API로 루트 조회
+        
+        - DB(캐시 테이블 포함)에 접근하지 않으므로 worker 스레드에서 호출해도 DB 연결을 열지 않습니다.
+        """
+        # 로컬 도로 그래프 (설정된 도시 안의 좌표만)
+        engine = road_graph.get_engine()
+        if engine and not isinstance(origin, str) and not isinstance(destination, str):
+            route_data = engine.route(origin, destination)
+            if route_data:
+                return route_data
+        
         # API 호출
         params = {
-            'origin': origin_key,
-            'destination': dest_key,
+            'origin': location_key(origin),
+            'destination': location_key(destination),
             'key': self.api_key,
             'mode': 'driving',
             'language': 'ko'
         }
         
         try:
-            response = requests.get(self.directions_api_url, params=params, timeout=10)
+            # I/O 풀에서 실행 중이면 요청 deadline까지 남은 시간으로 제한
+            response = requests.get(self.directions_api_url, params=params, timeout=io_pool.remaining(10))
             response.raise_for_status()
             data = response.json()
             
             if data.get('status') == 'OK':
                 route = data['routes'][0]['legs'][0]
                 
-                route_data = {
+                return {
                     'durationMin': route['duration']['value'] // 60,
                     'distanceKm': round(route['distance']['value'] / 1000, 2),
                     'polyline': data['routes'][0]['overview_polyline']['points']
                 }
-                
-                # 메모리 캐시에 저장 (1시간)
-                cache.set(cache_key, route_data, 3600)
-                
-                return route_data
             else:
                 return None
         except Exception as e:
             print(f"Directions API Error: {str(e)}")
             return None
+    
+    def calculate_routes(self, pairs, deadline=None):
+        """
+        여러 구간의 루트 (구간마다 calculate_route와 같은 결과)
+        
+        - 캐시 조회/저장은 호출한 스레드에서 한 번씩(get_many/set_many) 하고,
+          캐시에 없는 구간의 fetch_route(네트워크 I/O)만 공유 I/O 풀(io_pool)에서 실행합니다.
+        - deadline(time.monotonic 기준)까지 받지 못한 구간은 None입니다.
+        
+        Returns:
+            list[dict | None]: pairs 순서대로 루트 (실패한 구간은 None)
+        """
+        cache_keys = [route_cache_key(origin, destination) for origin, destination in pairs]
+        cached = cache.get_many(cache_keys) if cache_keys else {}
+        routes = [cached.get(cache_key) for cache_key in cache_keys]
+        missing = [i for i, route in enumerate(routes) if not route]
+        if not missing:
+            return routes
+        
+        def fetch(i):
+            try:
+                return self.fetch_route(*pairs[i])
+            except Exception as e:
+                print(f"❌ 루트 조회 실패 {cache_keys[i]}: {e}")
+                return None
+        
+        fetched = io_pool.run_many(fetch, missing, deadline=deadline)
+        
+        to_cache = {}
+        for i, route in zip(missing, fetched):
+            routes[i] = route
+            if route:
+                to_cache[cache_keys[i]] = route
+        if to_cache:
+            cache.set_many(to_cache, 3600)
+        return routes
+    
+    # Directions API 요청당 최대 경유지 수
+    MAX_WAYPOINTS = 25
+    
+    def calculate_route_chain(self, locations, deadline=None):
+        """
+        연속한 지점들의 구간별 루트 (A → B → C ...)
+        
+        - 구간마다 메모리 캐시 → 로컬 도로 그래프를 먼저 보고,
+          남은 구간이 있는 묶음만 Directions API의 waypoints로 한 번에 요청합니다
+          (요청당 경유지 최대 25개 = 26구간).
+        - 묶음 요청은 공유 I/O 풀(io_pool)에서 병렬로 보내며, deadline(time.monotonic 기준)까지 받지 못한 묶음은 None입니다.
+        - API 결과는 구간별로 루트 캐시(route:)에 저장되어 calculate_route와 공유됩니다.
+        
+        Returns:
+            list[dict | None]: 구간별 {'durationMin', 'distanceKm', 'polyline'} (실패한 구간은 None)
+        """
+        keys = [location_key(location) for location in locations]
+        route_keys = [route_cache_key(locations[i], locations[i + 1]) for i in range(len(locations) - 1)]
+        cached = cache.get_many(route_keys)
+        legs = [cached.get(route_key) for route_key in route_keys]
+        to_cache = {}
+        
+        engine = road_graph.get_engine()
+        if engine:
+            for i, leg in enumerate(legs):
+                if leg is None and not isinstance(locations[i], str) and not isinstance(locations[i + 1], str):
+                    legs[i] = engine.route(locations[i], locations[i + 1])
+                    if legs[i]:
+                        to_cache[route_keys[i]] = legs[i]
+        
+        span = self.MAX_WAYPOINTS + 1
+        chunks = []
+        if self.api_key:
+            for start in range(0, len(legs), span):
+                chunk = range(start, min(start + span, len(legs)))
+                if any(legs[i] is None for i in chunk):
+                    chunks.append(chunk)
+        
+        def fetch(chunk):
+            params = {
+                'origin': keys[chunk[0]],
+                'destination': keys[chunk[-1] + 1],
+                'key': self.api_key,
+                'mode': 'driving',
+                'language': 'ko'
+            }
+            if len(chunk) > 1:
+                params['waypoints'] = '|'.join(keys[i] for i in chunk[1:])
+            
+            try:
+                # 요청 deadline까지 남은 시간으로 제한
+                response = requests.get(self.directions_api_url, params=params, timeout=io_pool.remaining(10))
+                response.raise_for_status()
+                data = response.json()
+            except Exception as e:
+                print(f"Directions API Error: {str(e)}")
+                return None
+            
+            if data.get('status') != 'OK':
+                print(f"Directions API Error: {data.get('status')}")
+                return None
+            return data['routes'][0]['legs']
+        
+        fetched = io_pool.run_many(fetch, chunks, deadline=deadline) if chunks else []
+        for chunk, chunk_legs in zip(chunks, fetched):
+            for i, leg in zip(chunk, chunk_legs or []):
+                coords = []
+                for step in leg.get('steps', []):
+                    points = road_graph.decode_polyline(step['polyline']['points'])
+                    coords.extend(points[1:] if coords and points and points[0] == coords[-1] else points)
+                route_data = {
+                    'durationMin': leg['duration']['value'] // 60,
+                    'distanceKm': round(leg['distance']['value'] / 1000, 2),
+                    'polyline': road_graph.encode_polyline(coords)
+                }
+                if legs[i] is None:
+                    legs[i] = route_data
+                    to_cache[route_keys[i]] = route_data
+        
+        if to_cache:
+            cache.set_many(to_cache, 3600)
+        
+        return legs
+    
+    # Distance Matrix API 요청당 최대 origins/destinations 수 (10 × 10 = 100 elements)
+    MATRIX_CHUNK_SIZE = 10
+    
+    def calculate_duration_matrix(self, points, known=None):
+        """
+        지점 간 이동 시간/거리 행렬 (Distance Matrix API)
+        
+        0. known({(i, j): {'durationMin', 'distanceKm'}})에 있는 셀은 그대로 사용 (예: TripMatrix)
+        1. 루트 캐시(route:)와 행렬 캐시(route_matrix:)를 한 번에 조회
+        2. 캐시에 없는 셀은 로컬 도로 그래프로, 그래도 없는 셀만 모아
+           Distance Matrix API로 일괄 요청 (요청당 최대 100 elements)
+        3. API 실패/키 없음/결과 없음인 셀은 직선 거리 추정치로 대체하고 estimated로 표시
+        
+        Returns:
+            dict: {
+                'durationMin': [[분]],
+                'distanceKm': [[km]],
+                'estimated': [[bool]]
+            }
+        """
+        n = len(points)
+        keys = [location_key(point) for point in points]
+        durations = [[0] * n for _ in range(n)]
+        distances = [[0] * n for _ in range(n)]
+        estimated = [[False] * n for _ in range(n)]
+        
+        known = known or {}
+        for (i, j), leg in known.items():
+            durations[i][j] = leg['durationMin']
+            distances[i][j] = leg['distanceKm']
+        
+        cells = [
+            (i, j) for i in range(n) for j in range(n)
+            if i != j and keys[i] != keys[j] and (i, j) not in known
+        ]
+        cached = self._get_cached_legs([(keys[i], keys[j]) for i, j in cells])
+        
+        missing = []
+        for cell, hit in zip(cells, cached):
+            if hit:
+                durations[cell[0]][cell[1]] = hit['durationMin']
+                distances[cell[0]][cell[1]] = hit['distanceKm']
+            else:
+                missing.append(cell)
+        
+        fetched = self._fetch_matrix_cells(points, keys, missing) if missing else {}
+        unresolved = [cell for cell in missing if fetched.get(cell) is None]
+        estimates = dict(zip(unresolved, estimate_legs([(points[i], points[j]) for i, j in unresolved], self.city)))
+        
+        for i, j in missing:
+            leg = fetched.get((i, j))
+            if leg is None:
+                leg = estimates[(i, j)]
+                estimated[i][j] = True
+            durations[i][j] = leg['durationMin']
+            distances[i][j] = leg['distanceKm']
+        
+        return {'durationMin': durations, 'distanceKm': distances, 'estimated': estimated}
+    
+    def get_legs(self, pairs, fetch=False):
+        """
+        구간 목록의 이동 시간/거리
+        
+        - 루트 캐시(route:)/행렬 캐시(route_matrix:)를 한 번에 조회하고, 없으면 로컬 도로 그래프를 사용합니다.
+        - fetch=True이면 그래도 없는 구간을 Distance Matrix API로 일괄 조회합니다.
+        - 그래도 없는 구간은 직선 거리 추정치로 대체해 estimated로 표시합니다.
+        
+        Args:
+            pairs: [(origin, destination)] - 위치 dict 또는 place_id 문자열
+        
+        Returns:
+            list[dict]: pairs와 같은 순서의 {'durationMin', 'distanceKm', 'estimated'}
+        """
+        key_pairs = [(location_key(origin), location_key(destination)) for origin, destination in pairs]
+        cached = self._get_cached_legs(key_pairs)
+        
+        fetched = {}
+        missing = [idx for idx, hit in enumerate(cached) if not hit and key_pairs[idx][0] != key_pairs[idx][1]]
+        if missing and (fetch or road_graph.get_engine()):
+            points = []
+            point_index = {}
+            cells = []
+            for idx in missing:
+                cell = []
+                for location, key in zip(pairs[idx], key_pairs[idx]):
+                    if key not in point_index:
+                        point_index[key] = len(points)
+                        points.append(location)
+                    cell.append(point_index[key])
+                cells.append(tuple(cell))
+            keys = [location_key(point) for point in points]
+            if fetch:
+                results = self._fetch_matrix_cells(points, keys, cells)
+            else:
+                results = self._local_matrix_cells(points, cells)
+            fetched = {idx: results.get(cell) for idx, cell in zip(missing, cells)}
+        
+        legs = []
+        unresolved = []
+        for idx, ((origin_key, dest_key), hit) in enumerate(zip(key_pairs, cached)):
+            hit = hit or fetched.get(idx)
+            if origin_key == dest_key:
+                legs.append({'durationMin': 0, 'distanceKm': 0, 'estimated': False})
+            elif hit:
+                legs.append({'durationMin': hit['durationMin'], 'distanceKm': hit['distanceKm'], 'estimated': False})
+            else:
+                legs.append(None)
+                unresolved.append(idx)
+        
+        for idx, leg in zip(unresolved, estimate_legs([pairs[idx] for idx in unresolved], self.city)):
+            legs[idx] = dict(leg, estimated=True)
+        return legs
+    
+    def _get_cached_legs(self, key_pairs):
+        """(origin_key, dest_key) 목록의 캐시 조회 결과 (없으면 None) - 단일 get_many"""
+        cache_keys = [
+            (f"route:{origin}:{destination}", f"route_matrix:{origin}:{destination}")
+            for origin, destination in key_pairs
+        ]
+        cached = cache.get_many({key for pair in cache_keys for key in pair})
+        return [cached.get(route_key) or cached.get(matrix_key) for route_key, matrix_key in cache_keys]
+    
+    def _local_matrix_cells(self, points, cells):
+        """로컬 도로 그래프로 답할 수 있는 셀 (ROAD_GRAPH_DIR 미설정/그래프 밖이면 빈 dict)"""
+        engine = road_graph.get_engine()
+        if engine is None:
+            return {}
+        return engine.matrix_cells(points, cells)
+    
+    def _fetch_matrix_cells(self, points, keys, cells):
+        """캐시에 없는 셀을 로컬 도로 그래프 → Distance Matrix API 순서로 조회 (API 결과는 캐시에 저장)"""
+        results = self._local_matrix_cells(points, cells)
+        cells = [cell for cell in cells if cell not in results]
+        if not cells or not self.api_key:
+            return results
+        
+        origins = sorted({i for i, _ in cells})
+        destinations = sorted({j for _, j in cells})
+        wanted = set(cells)
+        chunk = self.MATRIX_CHUNK_SIZE
+        to_cache = {}
+        
+        for o_start in range(0, len(origins), chunk):
+            origin_chunk = origins[o_start:o_start + chunk]
+            for d_start in range(0, len(destinations), chunk):
+                dest_chunk = destinations[d_start:d_start + chunk]
+                if not any((i, j) in wanted for i in origin_chunk for j in dest_chunk):
+                    continue
+                
+                params = {
+                    'origins': '|'.join(keys[i] for i in origin_chunk),
+                    'destinations': '|'.join(keys[j] for j in dest_chunk),
+                    'key': self.api_key,
+                    'mode': 'driving',
+                    'language': 'ko'
+                }
+                
+                try:
+                    response = requests.get(self.distance_matrix_api_url, params=params, timeout=10)
+                    response.raise_for_status()
+                    data = response.json()
+                except Exception as e:
+                    print(f"Distance Matrix API Error: {str(e)}")
+                    continue
+                
+                if data.get('status') != 'OK':
+                    print(f"Distance Matrix API Error: {data.get('status')}")
+                    continue
+                
+                for i, row in zip(origin_chunk, data.get('rows', [])):
+                    for j, element in zip(dest_chunk, row.get('elements', [])):
+                        if element.get('status') != 'OK':
+                            continue
+                        leg = {
+                            'durationMin': element['duration']['value'] // 60,
+                            'distanceKm': round(element['distance']['value'] / 1000, 2)
+                        }
+                        results[(i, j)] = leg
+                        to_cache[f"route_matrix:{keys[i]}:{keys[j]}"] = leg
+        
+        if to_cache:
+            cache.set_many(to_cache, 3600)
+        
+        return results
 
 
 class RouteOptimizer:
     """루트 최적화 알고리즘"""
     
+    # 체류 시간이 없는 장소의 기본 체류 시간 (분)
+    DEFAULT_STAY_MIN = 60
+    # 하루 일정 시간 예산 기본값 (분)
+    DEFAULT_DAY_BUDGET_MIN = 480
+    # 하루 일정 시작 시각 기본값
+    DEFAULT_DAY_START = '09:00'
+    # 스트리밍 최적화의 최대 2-opt 반복 횟수 (deadline이 먼저 끝낼 수 있음)
+    STREAM_MAX_PASSES = 50
+    
     def __init__(self, google_maps_service):
         self.maps_service = google_maps_service
     
     def calculate_distance(self, point1, point2):
         """두 지점 간 직선 거리 계산 (Haversine formula)"""
-        lat1, lng1 = float(point1['lat']), float(point1['lng'])
-        lat2, lng2 = float(point2['lat']), float(point2['lng'])
-        
-        R = 6371  # 지구 반경 (km)
-        
-        dlat = math.radians(lat2 - lat1)
-        dlng = math.radians(lng2 - lng1)
-        
-        a = (math.sin(dlat / 2) ** 2 +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlng / 2) ** 2)
-        c = 2 * math.asin(math.sqrt(a))
-        
-        return R * c
+        return haversine_km(point1, point2)
     
     def nearest_neighbor(self, start_location, places):
         """Nearest Neighbor 알고리즘"""
@@ -178,33 +622,499 @@ class RouteOptimizer:
         
         return total_distance
     
-    def optimize(self, start_location, places, iterations=2):
+    def optimize(self, start_location, places, iterations=2, duration_matrix=None):
         """
         루트 최적화
         1. Nearest Neighbor로 초기 루트 생성
         2. 2-opt swap으로 개선
+        
+        - duration_matrix(시작 지점=0, 장소=1..n)가 있으면 실제 이동 시간 기준,
+          없으면 직선 거리 기준으로 최적화합니다.
         """
         if len(places) <= 1:
             return places
         
-        # Nearest Neighbor로 초기 루트 생성
-        route = self.nearest_neighbor(start_location, places)
-        best_distance = self.calculate_route_distance(start_location, route)
-        
-        # 2-opt swap으로 개선
-        for _ in range(iterations):
-            improved = False
-            for i in range(len(route) - 1):
-                for k in range(i + 1, len(route)):
-                    new_route = self.two_opt_swap(route, i, k)
-                    new_distance = self.calculate_route_distance(start_location, new_route)
-                    
-                    if new_distance < best_distance:
-                        route = new_route
-                        best_distance = new_distance
-                        improved = True
+        matrix = duration_matrix or self.build_distance_matrix(start_location, places)
+        result = self.optimize_route(matrix, len(places), iterations=iterations)
+        
+        return [places[node - 1] for node in result['route']]
+    
+    def optimize_route(self, matrix, size, iterations=2, initial_route=None, time_budget=None, starts=1):
+        """
+        노드 인덱스(1..size) 기준 최적화
+        
+        - initial_route가 있으면 Nearest Neighbor 대신 그 해에서 2-opt를 시작합니다 (warm-start).
+        - 큰 작업은 프로세스 풀에서 실행하며, time_budget(초)이 지나면 최선 해를 반환합니다.
+        - starts > 1이면 무작위 초기 해/double-bridge kick으로 여러 번 시작해 가장 좋은 해를 선택합니다.
+        
+        Returns:
+            dict: {'route': 노드 인덱스 목록, 'timedOut': bool, 'offloaded': bool}
+                  (multi-start는 'startsCompleted' 추가)
+        """
+        if starts > 1 and size > 3:
+            return process_pool.run_multi_start(
+                matrix, size, starts, time_budget=time_budget, initial_route=initial_route
+            )
+        
+        task = process_pool.tsp_task(matrix, size, iterations=iterations, initial_route=initial_route)
+        return process_pool.run(task, time_budget)
+    
+    def build_distance_matrix(self, start_location, places):
+        """시작 지점(0) + 장소(1..n) 간 직선 거리 행렬 (km)"""
+        points = [start_location] + list(places)
+        return [
+            [0 if i == j else self.calculate_distance(origin, dest) for j, dest in enumerate(points)]
+            for i, origin in enumerate(points)
+        ]
+
+    
+    def estimate_duration(self, point1, point2):
+        """이동 시간 추정 (분) - 도시별 학습 계수, 없으면 직선 거리 × 3분/km"""
+        city = getattr(self.maps_service, 'city', None)
+        return travel_estimator.estimate(point1, point2, city)['durationMin']
+    
+    def partition_by_days(self, start_location, places, total_days, day_budget_min=None, duration_matrix=None):
+        """
+        장소들을 total_days개의 지리적 그룹으로 분할 (Sweep + Linear partition)
+        
+        1. 시작 지점 기준 방위각으로 장소 정렬 (인접한 방향끼리 묶임)
+        2. 장소별 부하 = 체류 시간(duration_min) + 직전 장소로부터의 이동 시간
+        3. 모든 회전 시작점에 대해 최대 부하가 최소가 되도록 연속 구간 분할
+        
+        - duration_matrix(시작 지점=0, 장소=1..n)가 있으면 그 이동 시간을, 없으면 추정치를 사용합니다.
+        
+        Returns:
+            list[list[dict]]: day 순서대로의 장소 그룹 (길이 = total_days)
+        """
+        groups = self._partition_nodes(start_location, places, total_days, day_budget_min, duration_matrix)
+        return [[places[node - 1] for node in group] for group in groups]
+    
+    def _partition_nodes(self, start_location, places, total_days, day_budget_min=None, duration_matrix=None):
+        """partition_by_days의 노드 인덱스(1..n) 버전"""
+        total_days = max(1, int(total_days or 1))
+        budget = day_budget_min or self.DEFAULT_DAY_BUDGET_MIN
+        
+        if not places:
+            return [[] for _ in range(total_days)]
+        if total_days == 1:
+            return [list(range(1, len(places) + 1))]
+        
+        points = [start_location] + list(places)
+        if duration_matrix is None:
+            estimated = {}
             
-            if not improved:
+            def travel(i, j):
+                if (i, j) not in estimated:
+                    estimated[(i, j)] = self.estimate_duration(points[i], points[j])
+                return estimated[(i, j)]
+        else:
+            def travel(i, j):
+                return duration_matrix[i][j]
+        
+        origin_lat = float(start_location['lat'])
+        origin_lng = float(start_location['lng'])
+        swept = sorted(
+            range(1, len(points)),
+            key=lambda node: math.atan2(float(points[node]['lat']) - origin_lat, float(points[node]['lng']) - origin_lng)
+        )
+        
+        best_groups = None
+        best_score = None
+        n = len(swept)
+        
+        for offset in range(n):
+            rotated = swept[offset:] + swept[:offset]
+            loads = []
+            previous = 0
+            for node in rotated:
+                stay = points[node].get('durationMin') or self.DEFAULT_STAY_MIN
+                loads.append(stay + travel(previous, node))
+                previous = node
+            
+            cuts = self._linear_partition(loads, total_days)
+            groups = []
+            group_loads = []
+            begin = 0
+            for end in cuts + [n]:
+                groups.append(rotated[begin:end])
+                group_loads.append(sum(loads[begin:end]))
+                begin = end
+            
+            # 예산 초과분이 적을수록, 그 다음으로 최대 부하가 작을수록 좋음
+            overflow = sum(max(0, load - budget) for load in group_loads)
+            score = (overflow, max(group_loads))
+            if best_score is None or score < best_score:
+                best_score = score
+                best_groups = groups
+        
+        while len(best_groups) < total_days:
+            best_groups.append([])
+        return best_groups
+    
+    def _linear_partition(self, loads, parts):
+        """
+        최대 구간 합이 최소가 되도록 loads를 최대 parts개의 연속 구간으로 분할
+        (용량 이분 탐색 + greedy)
+        
+        Returns:
+            list[int]: 각 구간의 시작 인덱스 (첫 구간 제외)
+        """
+        def greedy_cuts(capacity):
+            cuts = []
+            running = 0
+            for idx, load in enumerate(loads):
+                if running + load > capacity and running > 0:
+                    cuts.append(idx)
+                    running = 0
+                running += load
+            return cuts
+        
+        low = max(loads)
+        high = sum(loads)
+        for _ in range(40):
+            if high - low < 0.5:
                 break
+            mid = (low + high) / 2
+            if len(greedy_cuts(mid)) < parts:
+                high = mid
+            else:
+                low = mid
         
-        return route
+        cuts = greedy_cuts(high)
+
+        # 구간 수가 부족하면 가장 무거운 구간을 반으로 나눠 모든 day를 사용
+        while len(cuts) + 1 < parts:
+            bounds = [0] + cuts + [len(loads)]
+            splittable = [
+                (sum(loads[bounds[i]:bounds[i + 1]]), i)
+                for i in range(len(bounds) - 1)
+                if bounds[i + 1] - bounds[i] > 1
+            ]
+            if not splittable:
+                break
+            _, i = max(splittable)
+            begin, end = bounds[i], bounds[i + 1]
+            half = sum(loads[begin:end]) / 2
+            running = 0
+            split_at = begin + 1
+            for idx in range(begin, end - 1):
+                running += loads[idx]
+                split_at = idx + 1
+                if running >= half:
+                    break
+            cuts = sorted(cuts + [split_at])
+
+        return cuts
+
+    def optimize_days(self, start_location, places, total_days, day_budget_min=None, iterations=2,
+                      duration_matrix=None, time_budget=None):
+        """
+        Multi-day 최적화
+        1. 장소를 total_days개의 균형 잡힌 지리적 그룹으로 분할
+        2. 각 day의 방문 순서를 프로세스 풀에서 동시에 최적화 (매일 시작 지점에서 출발, deadline 공유)
+        
+        - duration_matrix(시작 지점=0, 장소=1..n, 분)가 없으면 이동 시간 추정치 행렬을 사용합니다.
+        - day별 작업은 전체 행렬에서 그 day의 장소만 남긴 부분 행렬로 풉니다.
+        
+        Returns:
+            list[list[int]]: day 순서대로 최적화된 노드 인덱스(1..n) 목록
+        """
+        matrix = duration_matrix or self.build_duration_matrix(start_location, places)
+        groups = self._partition_nodes(start_location, places, total_days, day_budget_min, matrix)
+        
+        tasks = [
+            process_pool.tsp_task(optimization.sub_matrix(matrix, group), len(group), iterations=iterations)
+            for group in groups if len(group) > 1
+        ]
+        results = iter(process_pool.run_many(tasks, time_budget) if tasks else [])
+        
+        routes = []
+        for group in groups:
+            if len(group) > 1:
+                routes.append([group[node - 1] for node in next(results)['route']])
+            else:
+                routes.append(list(group))
+        return routes
+
+    def build_duration_matrix(self, start_location, places):
+        """시작 지점(0) + 장소(1..n) 간 이동 시간 추정 행렬 (분)"""
+        points = [start_location] + list(places)
+        return [
+            [0 if i == j else self.estimate_duration(origin, dest) for j, dest in enumerate(points)]
+            for i, origin in enumerate(points)
+        ]
+    
+    def iter_route_improvements(self, places, matrix, respect_time_windows=False, day_start=None, time_budget=None):
+        """
+        초기 해부터 더 나은 해를 찾을 때마다 노드 인덱스 route를 yield (스트리밍 최적화용)
+        
+        - 요청 스레드에서 실행되며, 소비자가 중단하면(generator close) 계산도 바로 멈춥니다.
+        - time_budget(초)이 지나면 더 이상 개선하지 않습니다.
+        """
+        deadline = time.monotonic() + time_budget if time_budget else None
+        nodes = list(range(1, len(places) + 1))
+        
+        if respect_time_windows:
+            day_start_min, stays, fixed = self._time_window_inputs(places, day_start)
+            yield from optimization.iter_time_windows(
+                matrix, nodes, stays, fixed, day_start_min, deadline=deadline
+            )
+            return
+        
+        route = optimization.nearest_neighbor(matrix, nodes)
+        yield route
+        yield from optimization.iter_two_opt(
+            matrix, route, iterations=self.STREAM_MAX_PASSES, deadline=deadline
+        )
+    
+    def optimize_with_time_windows(self, start_location, places, day_start=None, duration_matrix=None):
+        """
+        Time window 제약 최적화
+        
+        - startTime이 있는 장소는 고정 시각 (늦게 도착하면 위반, 일찍 도착하면 대기)
+        - durationMin은 체류 시간으로 일정에 포함 (없으면 60분)
+        - duration_matrix가 없으면 직선 거리 기반 추정치 사용
+        
+        Returns:
+            dict: {
+                'places': 최적화된 장소 목록 (arrivalTime 포함),
+                'violations': 고정 시각 위반 목록,
+                'totalDurationMin': 총 이동 시간
+            }
+        """
+        matrix = duration_matrix or self.build_duration_matrix(start_location, places)
+        route = self.solve_time_windows(places, matrix, day_start)['route']
+        return self.describe_time_windows(places, route, matrix, day_start)
+    
+    def _time_window_inputs(self, places, day_start):
+        """(일정 시작 분, 체류 시간 배열, 고정 시각 배열) - 0번은 시작 지점"""
+        day_start_min = optimization.parse_hhmm(day_start or self.DEFAULT_DAY_START)
+        stays = [0] + [place.get('durationMin') or self.DEFAULT_STAY_MIN for place in places]
+        fixed = [None] + [optimization.parse_hhmm(place.get('startTime')) for place in places]
+        return day_start_min, stays, fixed
+    
+    def solve_time_windows(self, places, matrix, day_start=None, time_budget=None):
+        """
+        Time window 제약 최적화 (큰 작업은 프로세스 풀에서 실행)
+        
+        Returns:
+            dict: {'route': 노드 인덱스 목록, 'timedOut': bool, 'offloaded': bool}
+        """
+        day_start_min, stays, fixed = self._time_window_inputs(places, day_start)
+        task = process_pool.time_window_task(matrix, stays, fixed, day_start_min)
+        return process_pool.run(task, time_budget)
+    
+    def describe_time_windows(self, places, route, matrix, day_start=None):
+        """노드 인덱스 route의 도착 시각과 고정 시각 위반 목록 계산"""
+        day_start_min, stays, fixed = self._time_window_inputs(places, day_start)
+        arrivals, _ = optimization.build_schedule(matrix, route, stays, fixed, day_start_min)
+        
+        scheduled = []
+        violations = []
+        for node, arrival in zip(route, arrivals):
+            place = dict(places[node - 1])
+            place['arrivalTime'] = optimization.format_hhmm(arrival)
+            scheduled.append(place)
+            
+            deadline = fixed[node]
+            if deadline is not None and arrival > deadline:
+                violations.append({
+                    'id': place['id'],
+                    'placeId': place.get('placeId', ''),
+                    'startTime': place['startTime'],
+                    'arrivalTime': place['arrivalTime'],
+                    'lateMin': int(math.ceil(arrival - deadline))
+                })
+        
+        return {
+            'places': scheduled,
+            'violations': violations,
+            'totalDurationMin': int(optimization.route_cost(matrix, route))
+        }
+    
+    def suggest_insertions(self, candidate, days, start_location=None, segment_legs=None, limit=3):
+        """
+        새 장소를 넣을 때 추가 이동 시간이 가장 작은 위치 제안 (Cheapest insertion, day당 O(n))
+        
+        - segment 규칙과 동일: Day 1만 시작 지점 → 첫 이벤트 구간이 있고,
+          위치가 없는 이벤트와는 구간이 생기지 않습니다.
+        - 기존 구간(prev → next)은 저장된 segment/TripMatrix(segment_legs)를 우선 사용합니다.
+        - 필요한 구간은 캐시에서 한 번에 조회하며 API는 호출하지 않습니다 (없으면 추정치, estimated).
+        
+        Args:
+            candidate: 새 장소 위치 {'lat', 'lng'}
+            days: {day: [{'id', 'dayOrder', 'location'}]} - day_order 순
+            segment_legs: {(from_event_id, to_event_id): {'durationMin', 'distanceKm'[, 'estimated']}}
+        
+        Returns:
+            list[dict]: addedMin 오름차순 상위 limit개
+                {day, position, afterEventId, beforeEventId, dayOrder, addedMin, addedKm, estimated}
+        """
+        segment_legs = segment_legs or {}
+        
+        # 1. 위치별 (prev, next) 이웃 - prev가 'start'이면 시작 지점
+        slots = []
+        for day, events in sorted(days.items()):
+            for position in range(len(events) + 1):
+                prev_event = events[position - 1] if position > 0 else None
+                next_event = events[position] if position < len(events) else None
+                prev_node = prev_event
+                if prev_event is None and day == 1 and start_location:
+                    prev_node = 'start'
+                slots.append((day, position, prev_event, next_event, prev_node))
+        
+        def location_of(node):
+            if node == 'start':
+                return start_location
+            return node['location'] if node else None
+        
+        def segment_key(prev_node, next_event):
+            return (None if prev_node == 'start' else prev_node['id'], next_event['id'])
+        
+        # 2. 필요한 구간 한 번에 조회
+        pairs = []
+        for _, _, _, next_event, prev_node in slots:
+            prev_location, next_location = location_of(prev_node), location_of(next_event)
+            if prev_location:
+                pairs.append((prev_location, candidate))
+                if next_location and segment_key(prev_node, next_event) not in segment_legs:
+                    pairs.append((prev_location, next_location))
+            if next_location:
+                pairs.append((candidate, next_location))
+        
+        unique_pairs = list({(location_key(o), location_key(d)): (o, d) for o, d in pairs}.items())
+        legs = dict(zip(
+            (key for key, _ in unique_pairs),
+            self.maps_service.get_legs([pair for _, pair in unique_pairs])
+        ))
+        
+        def leg(origin, destination):
+            return legs[(location_key(origin), location_key(destination))]
+        
+        # 3. 위치별 추가 비용 = prev→new + new→next - prev→next
+        suggestions = []
+        for day, position, prev_event, next_event, prev_node in slots:
+            prev_location, next_location = location_of(prev_node), location_of(next_event)
+            added_min = added_km = 0
+            estimated = False
+            
+            if prev_location:
+                into = leg(prev_location, candidate)
+                added_min += into['durationMin']
+                added_km += into['distanceKm']
+                estimated = estimated or into['estimated']
+            if next_location:
+                out = leg(candidate, next_location)
+                added_min += out['durationMin']
+                added_km += out['distanceKm']
+                estimated = estimated or out['estimated']
+            if prev_location and next_location:
+                existing = segment_legs.get(segment_key(prev_node, next_event))
+                if existing is None:
+                    existing = leg(prev_location, next_location)
+                estimated = estimated or existing.get('estimated', False)
+                added_min -= existing['durationMin']
+                added_km -= float(existing['distanceKm'])
+            
+            # day_order: 이웃 사이 중간값 (마지막이면 +10)
+            if prev_event and next_event:
+                day_order = (float(prev_event['dayOrder']) + float(next_event['dayOrder'])) / 2
+            elif prev_event:
+                day_order = float(prev_event['dayOrder']) + 10
+            elif next_event:
+                day_order = float(next_event['dayOrder']) / 2
+            else:
+                day_order = 10.0
+            
+            suggestions.append({
+                'day': day,
+                'position': position,
+                'afterEventId': prev_event['id'] if prev_event else None,
+                'beforeEventId': next_event['id'] if next_event else None,
+                'dayOrder': round(day_order, 4),
+                'addedMin': round(max(0, added_min), 1),
+                'addedKm': round(max(0, added_km), 2),
+                'estimated': estimated
+            })
+        
+        suggestions.sort(key=lambda item: (item['addedMin'], item['day'], item['position']))
+        return suggestions[:limit]
+    
+    def evaluate_orders(self, candidates, locations, start_location=None, segment_legs=None):
+        """
+        후보 방문 순서들의 총 이동 시간/거리와 구간별 수치 (읽기 전용, API 호출 없음)
+        
+        - 모든 후보의 구간을 모아 한 번에 조회한 뒤, 노드 인덱스 행렬에서 후보별로 합산합니다.
+        - 구간 우선순위: 저장된 segment/TripMatrix(segment_legs) → 경로 캐시 → 직선 거리 추정치(estimated)
+        - segment 규칙과 동일하게 위치가 없는 이벤트와는 구간이 생기지 않습니다.
+        
+        Args:
+            candidates: [[event_id, ...]] - 후보별 방문 순서
+            locations: {event_id: {'lat', 'lng'} | None}
+            start_location: 시작 지점에서 출발하는 day(Day 1)이면 시작 위치, 아니면 None
+            segment_legs: {(from_event_id | None, to_event_id): {'durationMin', 'distanceKm'[, 'estimated']}}
+        
+        Returns:
+            list[dict]: 후보별 {totalDurationMin, totalDistanceKm, estimated, legs}
+        """
+        segment_legs = segment_legs or {}
+        
+        # 1. 노드 인덱스 (0 = 시작 지점)
+        node_ids = [None] + sorted({event_id for order in candidates for event_id in order})
+        index = {event_id: idx for idx, event_id in enumerate(node_ids)}
+        
+        def point(node):
+            return start_location if node == 0 else locations[node_ids[node]]
+        
+        # 2. 후보별 구간 (노드 인덱스 쌍)
+        candidate_legs = []
+        for order in candidates:
+            legs = []
+            if start_location and order and locations.get(order[0]):
+                legs.append((0, index[order[0]]))
+            for from_id, to_id in zip(order, order[1:]):
+                if locations.get(from_id) and locations.get(to_id):
+                    legs.append((index[from_id], index[to_id]))
+            candidate_legs.append(legs)
+        
+        # 3. 필요한 셀만 채운 인덱스 행렬
+        n = len(node_ids)
+        durations = [[0] * n for _ in range(n)]
+        distances = [[0] * n for _ in range(n)]
+        estimated = [[False] * n for _ in range(n)]
+        
+        lookups = []
+        for i, j in {cell for legs in candidate_legs for cell in legs}:
+            segment = segment_legs.get((node_ids[i], node_ids[j]))
+            if segment:
+                durations[i][j] = segment['durationMin']
+                distances[i][j] = float(segment['distanceKm'])
+                estimated[i][j] = segment.get('estimated', False)
+            else:
+                lookups.append((i, j))
+        
+        fetched = self.maps_service.get_legs([(point(i), point(j)) for i, j in lookups])
+        for (i, j), leg in zip(lookups, fetched):
+            durations[i][j] = leg['durationMin']
+            distances[i][j] = leg['distanceKm']
+            estimated[i][j] = leg['estimated']
+        
+        # 4. 후보별 합산
+        results = []
+        for legs in candidate_legs:
+            results.append({
+                'totalDurationMin': round(sum(durations[i][j] for i, j in legs), 1),
+                'totalDistanceKm': round(sum(distances[i][j] for i, j in legs), 2),
+                'estimated': any(estimated[i][j] for i, j in legs),
+                'legs': [
+                    {
+                        'fromEventId': node_ids[i],
+                        'toEventId': node_ids[j],
+                        'durationMin': round(durations[i][j], 1),
+                        'distanceKm': round(distances[i][j], 2),
+                        'estimated': estimated[i][j]
+                    }
+                    for i, j in legs
+                ]
+            })
+        return results
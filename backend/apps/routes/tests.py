@@ -1,3 +1,980 @@
-from django.test import TestCase
+import heapq
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.trips.models import Trip, TripMember
+from apps.events.models import Event
+from apps.events.testing import LINE_LATS, TripTestMixin
+from .models import RouteSegment, TravelTimeCoefficient, TripMatrix
+from . import benchmarks, io_pool, optimization, process_pool, road_graph, travel_estimator, trip_matrix
+from .optimization_cache import optimization_cache
+from .services import GoogleMapsService, RouteOptimizer
+
+
+class OptimizeDaysTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(start_lat=37.5665, start_lng=126.9780, total_days=2)
+        # 시작 지점 북쪽 3곳, 남쪽 3곳
+        coords = [
+            (37.60, 126.97), (37.61, 126.98), (37.62, 126.975),
+            (37.53, 126.98), (37.52, 126.97), (37.51, 126.985),
+        ]
+        self.events = [
+            Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1,
+                day_order=(idx + 1) * 10, day=1,
+                place_name=f"Place {idx + 1}", lat=lat, lng=lng, duration_min=60,
+            )
+            for idx, (lat, lng) in enumerate(coords)
+        ]
+
+    def test_partition_groups_nearby_places_together(self):
+        optimizer = RouteOptimizer(None)
+        places = [
+            {'id': e.id, 'lat': float(e.lat), 'lng': float(e.lng), 'durationMin': 60}
+            for e in self.events
+        ]
+        groups = optimizer.partition_by_days(self.trip.start_location, places, 2)
+
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(sorted(len(g) for g in groups), [3, 3])
+        for group in groups:
+            norths = {p['lat'] > 37.5665 for p in group}
+            self.assertEqual(len(norths), 1)
+
+    def test_optimize_days_returns_day_and_order_for_every_event(self):
+        resp = self.client.post(f"/api/trips/{self.trip.id}/routes/optimize/days/", {}, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["days"]), 2)
+        proposed = {item["id"]: item for item in resp.data["events"]}
+        self.assertEqual(set(proposed), {e.id for e in self.events})
+        self.assertEqual({item["day"] for item in proposed.values()}, {1, 2})
+
+    @patch("apps.routes.services.GoogleMapsService.calculate_duration_matrix")
+    def test_day_orders_and_totals_use_duration_matrix(self, mock_matrix):
+        # 직선 거리와 다른 순서가 가장 빠름: 북쪽 3 → 1 → 2, 남쪽 6 → 5 → 4
+        durations = [[0 if i == j else 50 for j in range(7)] for i in range(7)]
+        for i, j in [(0, 3), (3, 1), (1, 2), (0, 6), (6, 5), (5, 4)]:
+            durations[i][j] = 1
+        mock_matrix.return_value = {
+            "durationMin": durations,
+            "distanceKm": [[0 if i == j else 1.0 for j in range(7)] for i in range(7)],
+            "estimated": [[False] * 7 for _ in range(7)],
+        }
+
+        with patch("apps.routes.services.process_pool.run_many", wraps=process_pool.run_many) as run_many:
+            resp = self.client.post(f"/api/trips/{self.trip.id}/routes/optimize/days/", {}, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        run_many.assert_called_once()
+        self.assertEqual(len(run_many.call_args.args[0]), 2)
+        orders = sorted([event["id"] for event in day["events"]] for day in resp.data["days"])
+        e = [event.id for event in self.events]
+        self.assertEqual(orders, sorted([[e[2], e[0], e[1]], [e[5], e[4], e[3]]]))
+        for day in resp.data["days"]:
+            self.assertEqual(day["totalTravelMin"], 3)
+            self.assertEqual(day["totalDistanceKm"], 3.0)
+
+    def test_optimize_days_requires_trip_membership(self):
+        url = f"/api/trips/{self.trip.id}/routes/optimize/days/"
+        stranger = get_user_model().objects.create_user(
+            username="stranger", email="stranger@example.com", password="pass1234!",
+        )
+        client = APIClient()
+        self.assertIn(client.post(url, {}, format="json").status_code, (401, 403))
+
+        client.force_authenticate(user=stranger)
+        resp = client.post(url, {}, format="json")
+        self.assertEqual(resp.status_code, 403)
+        self.assertNotIn("events", resp.json())
+
+
+class TimeWindowOptimizeTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(start_lat=37.5665, start_lng=126.9780)
+        self.url = f"/api/trips/{self.trip.id}/routes/optimize/"
+
+    def test_fixed_time_event_is_not_scheduled_after_long_stay(self):
+        payload = {
+            "startLocation": {"lat": 37.5665, "lng": 126.9780},
+            "respectTimeWindows": True,
+            "dayStartTime": "09:00",
+            "places": [
+                # 가장 가깝지만 3시간 체류
+                {"id": "1", "placeId": "near", "lat": 37.5670, "lng": 126.9785, "durationMin": 180},
+                # 10:00 예약
+                {"id": "2", "placeId": "reservation", "lat": 37.5800, "lng": 126.9900,
+                 "startTime": "10:00", "durationMin": 60},
+            ],
+        }
+        resp = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        order = [p["id"] for p in resp.data["optimized"]["places"]]
+        self.assertEqual(order, ["2", "1"])
+        self.assertEqual(resp.data["violations"], [])
+
+    def test_unavoidable_conflict_is_reported(self):
+        payload = {
+            "startLocation": {"lat": 37.5665, "lng": 126.9780},
+            "respectTimeWindows": True,
+            "places": [
+                {"id": "1", "placeId": "a", "lat": 37.57, "lng": 126.98, "startTime": "10:00", "durationMin": 120},
+                {"id": "2", "placeId": "b", "lat": 37.58, "lng": 126.99, "startTime": "10:30", "durationMin": 60},
+            ],
+        }
+        resp = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["violations"]), 1)
+        self.assertEqual(resp.data["violations"][0]["id"], "2")
+        self.assertGreater(resp.data["violations"][0]["lateMin"], 0)
+
+    def test_out_of_range_times_are_rejected(self):
+        place = {"id": "1", "placeId": "a", "lat": 37.57, "lng": 126.98}
+        for payload in (
+            {"dayStartTime": "99:99", "places": [place]},
+            {"places": [dict(place, startTime="25:00")]},
+        ):
+            payload = dict(payload, startLocation={"lat": 37.5665, "lng": 126.9780}, respectTimeWindows=True)
+            resp = self.client.post(self.url, payload, format="json")
+            self.assertEqual(resp.status_code, 400)
+
+
+@override_settings(GOOGLE_MAPS_API_KEY="test-key")
+class DurationMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.points = [
+            {"lat": 37.5665, "lng": 126.978},
+            {"lat": 37.57, "lng": 126.98},
+            {"lat": 37.58, "lng": 126.99},
+        ]
+
+    @patch("apps.routes.services.requests.get")
+    def test_only_missing_cells_are_fetched_and_failures_are_estimated(self, mock_get):
+        keys = [f"{p['lat']},{p['lng']}" for p in self.points]
+        # start ↔ 장소 구간은 이미 캐시에 있음
+        for i, j in [(0, 1), (1, 0), (0, 2), (2, 0)]:
+            cache.set(f"route:{keys[i]}:{keys[j]}", {"durationMin": 7, "distanceKm": 2.0, "polyline": ""})
+
+        response = MagicMock()
+        response.json.return_value = {
+            "status": "OK",
+            "rows": [
+                {"elements": [{"status": "OK", "duration": {"value": 0}, "distance": {"value": 0}},
+                              {"status": "OK", "duration": {"value": 1500}, "distance": {"value": 4200}}]},
+                {"elements": [{"status": "ZERO_RESULTS"},
+                              {"status": "OK", "duration": {"value": 0}, "distance": {"value": 0}}]},
+            ],
+        }
+        mock_get.return_value = response
+
+        matrix = GoogleMapsService().calculate_duration_matrix(self.points)
+
+        self.assertEqual(mock_get.call_count, 1)
+        params = mock_get.call_args.kwargs["params"]
+        self.assertEqual(params["origins"], f"{keys[1]}|{keys[2]}")
+        self.assertEqual(matrix["durationMin"][0][1], 7)
+        self.assertEqual(matrix["durationMin"][1][2], 25)
+        self.assertEqual(matrix["distanceKm"][1][2], 4.2)
+        self.assertFalse(matrix["estimated"][1][2])
+        self.assertTrue(matrix["estimated"][2][1])
+        self.assertGreater(matrix["durationMin"][2][1], 0)
+
+        # 두 번째 호출은 전부 캐시 (추정 셀만 재요청)
+        mock_get.reset_mock()
+        response.json.return_value = {
+            "status": "OK",
+            "rows": [{"elements": [{"status": "OK", "duration": {"value": 1800}, "distance": {"value": 5000}}]}],
+        }
+        GoogleMapsService().calculate_duration_matrix(self.points)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["origins"], keys[2])
+
+
+@override_settings(GOOGLE_MAPS_API_KEY="test-key")
+class RouteChainTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch("apps.routes.services.requests.get")
+    def test_chain_uses_one_waypoint_request_and_caches_legs(self, mock_get):
+        points = [{"lat": 37.50 + 0.01 * idx, "lng": 127.0} for idx in range(4)]
+        keys = [f"{p['lat']},{p['lng']}" for p in points]
+        cache.set(f"route:{keys[0]}:{keys[1]}", {"durationMin": 3, "distanceKm": 1.0, "polyline": "cached"})
+
+        response = MagicMock()
+        response.json.return_value = {
+            "status": "OK",
+            "routes": [{"legs": [
+                {
+                    "duration": {"value": 60 * (idx + 1)},
+                    "distance": {"value": 1000},
+                    "steps": [{"polyline": {"points": road_graph.encode_polyline([(37.5, 127.0), (37.51, 127.0)])}}],
+                }
+                for idx in range(3)
+            ]}],
+        }
+        mock_get.return_value = response
+
+        legs = GoogleMapsService().calculate_route_chain(points)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["waypoints"], f"{keys[1]}|{keys[2]}")
+        self.assertEqual([leg["durationMin"] for leg in legs], [3, 2, 3])
+        self.assertEqual(legs[1]["polyline"], road_graph.encode_polyline([(37.5, 127.0), (37.51, 127.0)]))
+        self.assertEqual(cache.get(f"route:{keys[2]}:{keys[3]}")["durationMin"], 3)
+
+    @override_settings(ROUTE_IO_THREADS=2)
+    @patch("apps.routes.services.requests.get")
+    def test_chain_requests_run_in_io_pool_under_shared_deadline(self, mock_get):
+        io_pool.shutdown()
+        caller = threading.get_ident()
+        threads, timeouts = set(), []
+
+        def directions(url, params, timeout):
+            threads.add(threading.get_ident())
+            timeouts.append(timeout)
+            response = MagicMock()
+            response.json.return_value = {"status": "REQUEST_DENIED"}
+            return response
+
+        mock_get.side_effect = directions
+        points = [{"lat": 37.50 + 0.01 * idx, "lng": 127.0} for idx in range(3)]
+        try:
+            legs = GoogleMapsService().calculate_route_chain(points, deadline=io_pool.deadline_after(2))
+        finally:
+            io_pool.shutdown()
+
+        self.assertEqual(legs, [None, None])
+        self.assertNotIn(caller, threads)
+        self.assertTrue(all(timeout <= 2 for timeout in timeouts))
+
+
+class OptimizationCacheTests(TripTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        optimization_cache.clear()
+        self.create_trip(start_lat=37.5665, start_lng=126.9780)
+        self.url = f"/api/trips/{self.trip.id}/routes/optimize/"
+        self.places = [
+            {"id": str(idx), "placeId": f"p{idx}", "lat": 37.56 + idx * 0.01, "lng": 126.97 + (idx % 2) * 0.02}
+            for idx in range(1, 6)
+        ]
+
+    def _optimize(self, places):
+        payload = {"startLocation": {"lat": 37.5665, "lng": 126.9780}, "places": places}
+        resp = self.client.post(self.url, payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        return resp.data
+
+    def test_same_place_set_in_any_order_hits_cache(self):
+        first = self._optimize(self.places)
+        second = self._optimize(list(reversed(self.places)))
+
+        self.assertEqual(first["cacheStatus"], "miss")
+        self.assertEqual(second["cacheStatus"], "hit")
+        self.assertEqual(
+            [p["id"] for p in first["optimized"]["places"]],
+            [p["id"] for p in second["optimized"]["places"]],
+        )
+
+    def test_one_added_place_warm_starts(self):
+        self._optimize(self.places)
+        extra = {"id": "9", "placeId": "p9", "lat": 37.575, "lng": 126.985}
+        data = self._optimize(self.places + [extra])
+
+        self.assertEqual(data["cacheStatus"], "warm")
+        self.assertEqual(len(data["optimized"]["places"]), 6)
+
+    def test_changed_matrix_cells_miss_cache(self):
+        start = {"lat": 37.5665, "lng": 126.9780}
+        estimated = [[0, 10, 12], [10, 0, 5], [12, 5, 0]]
+        fetched = [[0, 10, 30], [10, 0, 5], [12, 5, 0]]
+        fp, context, keys = optimization_cache.fingerprint(start, self.places[:2], durations=estimated)
+        optimization_cache.put(fp, context, keys, [1, 2])
+
+        self.assertEqual(optimization_cache.fingerprint(start, self.places[:2], durations=estimated)[0], fp)
+        self.assertNotEqual(optimization_cache.fingerprint(start, self.places[:2], durations=fetched)[0], fp)
+        # 장소 순서만 다르면 같은 fingerprint
+        swapped = [[0, 12, 10], [12, 0, 5], [10, 5, 0]]
+        self.assertEqual(
+            optimization_cache.fingerprint(start, list(reversed(self.places[:2])), durations=swapped)[0], fp
+        )
+
+    @override_settings(ROUTE_OPTIMIZER_MAX_PLACES=4)
+    def test_place_limit_uses_optimizer_setting(self):
+        payload = {"startLocation": {"lat": 37.5665, "lng": 126.9780}, "places": self.places}
+        resp = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"]["code"], "TOO_MANY_PLACES")
+
+    def test_default_place_limit_reaches_process_pool(self):
+        self.assertGreaterEqual(settings.ROUTE_OPTIMIZER_MAX_PLACES, settings.ROUTE_OPTIMIZER_POOL_MIN_PLACES)
+
+    def test_lru_eviction_is_bounded(self):
+        lru = type(optimization_cache)(max_entries=2)
+        start = {"lat": 37.5, "lng": 127.0}
+        fingerprints = []
+        for idx in range(3):
+            fp, context, keys = lru.fingerprint(start, [{"lat": 37.0 + idx, "lng": 127.0}])
+            lru.put(fp, context, keys, [1])
+            fingerprints.append((fp, keys))
+
+        self.assertIsNone(lru.get(*fingerprints[0]))
+        self.assertEqual(lru.get(*fingerprints[2]), [1])
+
+
+class ProcessPoolTests(TestCase):
+    def setUp(self):
+        # 0..n 노드를 직선 위에 배치 (최적 순서 = 1, 2, ..., n)
+        self.size = 9
+        self.matrix = [[abs(i - j) for j in range(self.size + 1)] for i in range(self.size + 1)]
+        self.shuffled = [5, 2, 9, 1, 7, 3, 8, 4, 6]
+
+    @override_settings(ROUTE_OPTIMIZER_PROCESSES=0)
+    def test_runs_inline_when_pool_disabled(self):
+        task = process_pool.tsp_task(self.matrix, self.size, initial_route=self.shuffled)
+        result = process_pool.run(task)
+
+        self.assertFalse(result["offloaded"])
+        self.assertFalse(result["timedOut"])
+        self.assertEqual(result["route"], list(range(1, self.size + 1)))
+
+    @override_settings(ROUTE_OPTIMIZER_PROCESSES=1, ROUTE_OPTIMIZER_POOL_MIN_PLACES=2)
+    def test_large_task_is_offloaded_to_pool(self):
+        try:
+            task = process_pool.tsp_task(self.matrix, self.size, initial_route=self.shuffled)
+            result = process_pool.run(task, time_budget=30)
+        finally:
+            process_pool.shutdown()
+
+        self.assertTrue(result["offloaded"])
+        self.assertEqual(result["route"], list(range(1, self.size + 1)))
+
+    @override_settings(ROUTE_OPTIMIZER_PROCESSES=1, ROUTE_OPTIMIZER_POOL_MIN_PLACES=2)
+    def test_worker_past_deadline_is_terminated_and_pool_recreated(self):
+        executor = process_pool.get_executor()
+        try:
+            process_pool.warm_up()
+            # deadline을 모르는 작업이 worker를 점유 → 최적화 작업은 제때 시작하지 못함
+            blocker = executor.submit(time.sleep, 30)
+            workers = list(executor._processes.values())
+            task = process_pool.tsp_task(self.matrix, self.size, initial_route=self.shuffled)
+
+            started = time.monotonic()
+            result = process_pool.run(task, time_budget=0.1)
+            elapsed = time.monotonic() - started
+
+            for worker in workers:
+                worker.join(timeout=5)
+            self.assertTrue(result["timedOut"])
+            self.assertEqual(result["route"], self.shuffled)
+            self.assertLess(elapsed, 0.1 + process_pool.RESULT_GRACE_SECONDS + 1)
+            self.assertFalse(any(worker.is_alive() for worker in workers))
+            self.assertTrue(blocker.done())
+            self.assertIsNot(process_pool.get_executor(), executor)
+        finally:
+            process_pool.shutdown()
+
+    def test_deadline_at_counts_time_spent_queued(self):
+        task = process_pool.tsp_task(self.matrix, self.size, initial_route=self.shuffled)
+        result = process_pool.solve_task(task, time_budget=30, deadline_at=time.time() - 1)
+
+        self.assertTrue(result["timedOut"])
+
+    def test_expired_deadline_returns_current_best(self):
+        task = process_pool.tsp_task(self.matrix, self.size, initial_route=self.shuffled)
+        result = process_pool.solve_task(task, time_budget=1e-9)
+
+        self.assertTrue(result["timedOut"])
+        self.assertEqual(sorted(result["route"]), list(range(1, self.size + 1)))
+
+
+class IOPoolTests(TestCase):
+    def setUp(self):
+        # 다른 테스트에서 만든 풀이 아닌 override_settings의 스레드 수로 다시 생성
+        io_pool.shutdown()
+
+    def tearDown(self):
+        io_pool.shutdown()
+
+    @override_settings(ROUTE_IO_THREADS=2)
+    def test_runs_in_shared_pool_and_closes_worker_connections(self):
+        caller = threading.get_ident()
+        completed = io_pool.stats()["completed"]
+        with patch("apps.routes.io_pool.connections.close_all") as close_all:
+            results = io_pool.run_many(lambda item: (item * 2, threading.get_ident() != caller), [1, 2, 3])
+
+        self.assertEqual(results, [(2, True), (4, True), (6, True)])
+        self.assertEqual(close_all.call_count, 3)
+        self.assertIs(io_pool.get_executor(), io_pool.get_executor())
+        self.assertEqual(io_pool.stats()["completed"] - completed, 3)
+
+    @override_settings(ROUTE_IO_THREADS=1)
+    def test_deadline_returns_default_and_propagates_remaining_time(self):
+        def slow(item):
+            time.sleep(0.3)
+            return io_pool.remaining(10)
+
+        results = io_pool.run_many(slow, [1, 2], deadline=io_pool.deadline_after(0.1), default="late")
+
+        self.assertEqual(results, ["late", "late"])
+        self.assertLessEqual(io_pool.run_many(io_pool.remaining, [10], deadline=io_pool.deadline_after(2))[0], 2)
+
+    @override_settings(ROUTE_IO_THREADS=0)
+    def test_runs_inline_when_pool_disabled(self):
+        caller = threading.get_ident()
+        self.assertEqual(io_pool.run_many(lambda item: threading.get_ident() == caller, [1]), [True])
+
+    def test_pool_metrics_are_staff_only(self):
+        resp = self.client.get("/api/health/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("ioPool", resp.json())
+
+        url = "/api/health/io-pool/"
+        self.assertIn(APIClient().get(url).status_code, (401, 403))
+        User = get_user_model()
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(
+            username="member", email="member@example.com", password="pass1234!",
+        ))
+        self.assertEqual(client.get(url).status_code, 403)
+
+        client.force_authenticate(user=User.objects.create_user(
+            username="ops", email="ops@example.com", password="pass1234!", is_staff=True,
+        ))
+        resp = client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            set(resp.json()), {"threads", "active", "queued", "utilization", "completed", "timedOut"}
+        )
+
+
+class OptimizeStreamTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip(start_lat=37.5665, start_lng=126.9780)
+        self.url = f"/api/trips/{self.trip.id}/routes/optimize/stream/"
+        self.places = [
+            {"id": str(idx), "placeId": f"p{idx}", "lat": 37.56 + ((idx * 7) % 12) * 0.01, "lng": 126.97 + (idx % 3) * 0.02}
+            for idx in range(1, 13)
+        ]
+
+    def _events(self, resp):
+        body = b"".join(resp.streaming_content).decode()
+        events = []
+        for block in body.strip().split("\n\n"):
+            name, data = block.split("\n")
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+        return events
+
+    def test_streams_seed_then_done_with_best_route(self):
+        payload = {"startLocation": {"lat": 37.5665, "lng": 126.9780}, "places": self.places}
+        resp = self.client.post(self.url, payload, format="json", HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        events = self._events(resp)
+        self.assertEqual(events[0][0], "seed")
+        self.assertEqual(events[-1][0], "done")
+
+        seed, done = events[0][1], events[-1][1]
+        self.assertEqual(len(done["optimized"]["places"]), 12)
+        self.assertLessEqual(done["optimized"]["totalDurationMin"], seed["totalDurationMin"])
+
+    def test_validation_error_is_rendered_as_error_event(self):
+        resp = self.client.post(self.url, {"places": []}, format="json", HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertTrue(resp.content.decode().startswith("event: error\n"))
+
+    @override_settings(ROUTE_OPTIMIZER_STREAM_MAX_PLACES=10)
+    def test_place_limit_uses_optimizer_setting(self):
+        payload = {"startLocation": {"lat": 37.5665, "lng": 126.9780}, "places": self.places}
+        resp = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"]["code"], "TOO_MANY_PLACES")
+
+
+class MultiStartTests(TripTestMixin, TestCase):
+    def setUp(self):
+        # 비대칭 무작위 행렬 (결정적 seed)
+        rng = random.Random(7)
+        self.size = 25
+        self.matrix = [
+            [0 if i == j else rng.randint(1, 100) for j in range(self.size + 1)]
+            for i in range(self.size + 1)
+        ]
+
+    def test_multi_start_is_never_worse_than_single_start(self):
+        nodes = list(range(1, self.size + 1))
+        single = optimization.two_opt(self.matrix, optimization.nearest_neighbor(self.matrix, nodes), iterations=50)
+        route, cost, completed = optimization.multi_start(self.matrix, nodes, starts=12, seed=1)
+
+        self.assertEqual(completed, 12)
+        self.assertEqual(sorted(route), nodes)
+        self.assertEqual(cost, optimization.route_cost(self.matrix, route))
+        self.assertLessEqual(cost, optimization.route_cost(self.matrix, single))
+
+    @override_settings(ROUTE_OPTIMIZER_PROCESSES=0)
+    def test_run_multi_start_inline_reports_completed_starts(self):
+        result = process_pool.run_multi_start(self.matrix, self.size, starts=5, time_budget=30, seed=3)
+
+        self.assertFalse(result["offloaded"])
+        self.assertEqual(result["startsCompleted"], 5)
+        self.assertEqual(sorted(result["route"]), list(range(1, self.size + 1)))
+
+    @override_settings(ROUTE_OPTIMIZER_MAX_STARTS=4)
+    def test_requested_starts_are_capped(self):
+        trip = self.create_trip(start_lat=37.5665, start_lng=126.9780)
+        places = [
+            {"id": str(idx), "placeId": f"p{idx}", "lat": 37.56 + idx * 0.01, "lng": 126.97 + (idx % 2) * 0.02}
+            for idx in range(1, 7)
+        ]
+        payload = {"startLocation": {"lat": 37.5665, "lng": 126.9780}, "places": places, "starts": 100}
+        resp = self.client.post(f"/api/trips/{trip.id}/routes/optimize/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["startsCompleted"], 4)
+
+    def test_multi_start_improves_benchmark_instances_above_old_place_limit(self):
+        # 이전 제한(10곳)에서는 gap 차이가 없던 크기 이상의 벤치마크 인스턴스
+        for instance in (benchmarks.grid(20), benchmarks.clustered(25), benchmarks.tsplib_like(25)):
+            self.assertLessEqual(instance.size, settings.ROUTE_OPTIMIZER_MAX_PLACES)
+            single = benchmarks.measure(instance, "nn+2opt", repeat=1)
+            multi = benchmarks.measure(instance, "multi-start-8", repeat=1)
+
+            self.assertLess(multi["length"], single["length"], instance.name)
+
+
+class BenchmarkTests(TestCase):
+    def test_constructed_optimum_matches_exact_solution(self):
+        for dataset in (benchmarks.grid, benchmarks.ring):
+            instance = dataset(8)
+            self.assertAlmostEqual(benchmarks.held_karp(instance.cost_matrix()), instance.best_known, places=6)
+
+    def test_command_emits_machine_readable_results(self):
+        out = StringIO()
+        call_command(
+            "benchmark_optimizer", sizes="5,12", datasets="clustered,grid",
+            strategies="nn,nn+2opt", repeat=1, json_path="-", stdout=out,
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(len(report["results"]), 8)
+        row = report["results"][0]
+        self.assertEqual(row["bestKnownSource"], "held-karp")
+        for key in ("runtimeMs", "length", "gapPercent", "peakMemoryKb"):
+            self.assertIn(key, row)
+        self.assertTrue(all(r["gapPercent"] >= 0 for r in report["results"]))
+
+    def test_pool_crossover_recommends_size_where_inline_outweighs_overhead(self):
+        def offload(task, time_budget):
+            # 작은 작업에서만 풀 오버헤드가 실행 시간보다 크도록 지연
+            if task["size"] < 20:
+                time.sleep(0.01)
+            return process_pool.solve_task(task, time_budget)
+
+        instances = [benchmarks.grid(size) for size in (5, 12, 30)]
+        report = benchmarks.pool_crossover(instances, offload, repeat=1)
+
+        self.assertEqual([row["offload"] for row in report["results"]], [False, False, True])
+        self.assertEqual(report["recommendedMinPlaces"], 30)
+
+
+class EvaluateOrdersTests(TripTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_trip()
+        self.url = f"/api/trips/{self.trip.id}/routes/evaluate/"
+        self.events = self.create_line_events()
+        a, b, c = self.events
+        RouteSegment.objects.create(trip=self.trip, from_event=None, to_event=a, duration_min=5, distance_km=2.2)
+        RouteSegment.objects.create(trip=self.trip, from_event=a, to_event=b, duration_min=6, distance_km=2.2)
+        RouteSegment.objects.create(trip=self.trip, from_event=b, to_event=c, duration_min=7, distance_km=2.2)
+
+    @patch("apps.routes.services.requests.get")
+    def test_scores_many_candidates_without_writes_or_api_calls(self, mock_get):
+        a, b, c = (e.id for e in self.events)
+        payload = {"day": 1, "candidates": [[a, b, c], [c, b, a], [a, c, b]]}
+
+        resp = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        mock_get.assert_not_called()
+        first, reverse, _ = resp.data["candidates"]
+        self.assertEqual(first["totalDurationMin"], 18)
+        self.assertFalse(first["estimated"])
+        self.assertTrue(reverse["estimated"])
+        self.assertEqual(resp.data["bestIndex"], 0)
+        self.assertEqual(RouteSegment.objects.filter(trip=self.trip).count(), 3)
+
+    def test_rejects_events_from_other_trips(self):
+        other = Trip.objects.create(title="Other", city="Seoul", start_lat=37.5, start_lng=127.0)
+        stranger = Event.objects.create(trip=other, order=1, day=1, lat=37.5, lng=127.0)
+
+        resp = self.client.post(self.url, {"day": 1, "candidates": [[stranger.id]]}, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+
+    def test_rejects_events_from_other_days(self):
+        a, b, c = self.events
+        Event.objects.filter(id=c.id).update(day=2)
+
+        resp = self.client.post(self.url, {"day": 1, "candidates": [[a.id, b.id, c.id]]}, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["error"]["code"], "EVENT_NOT_IN_DAY")
+
+    @patch("apps.routes.services.requests.get")
+    def test_requires_trip_membership(self, mock_get):
+        payload = {"day": 1, "candidates": [[e.id for e in self.events]]}
+        self.assertIn(APIClient().post(self.url, payload, format="json").status_code, (401, 403))
+
+        stranger = get_user_model().objects.create_user(
+            username="stranger", email="stranger@example.com", password="pass1234!",
+        )
+        client = APIClient()
+        client.force_authenticate(user=stranger)
+        resp = client.post(self.url, payload, format="json")
+
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.json()["error"]["code"], "PERMISSION_DENIED")
+        self.assertNotIn("candidates", resp.json())
+        mock_get.assert_not_called()
+
+
+class ApplyWithLegsTokenTests(TripTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        optimization_cache.clear()
+        self.create_trip()
+        # 현재 순서: 북쪽 끝 → 가운데 → 가장 가까운 곳 (최적은 역순)
+        self.events = self.create_line_events(lats=reversed(LINE_LATS))
+        points = [(37.5, 127.0)] + [(float(e.lat), float(e.lng)) for e in self.events]
+        for i, (lat1, lng1) in enumerate(points):
+            for j, (lat2, lng2) in enumerate(points):
+                if i != j:
+                    cache.set(f"route:{lat1},{lng1}:{lat2},{lng2}",
+                              {"durationMin": round(abs(lat1 - lat2) * 500),
+                               "distanceKm": round(abs(lat1 - lat2) * 100, 2), "polyline": ""})
+
+    @patch("apps.routes.services.requests.get")
+    def test_apply_persists_order_segments_and_summary_without_api_calls(self, mock_get):
+        client = self.client
+        places = [
+            {"id": str(e.id), "placeId": f"p{e.id}", "lat": float(e.lat), "lng": float(e.lng)}
+            for e in self.events
+        ]
+        optimized = client.post(
+            f"/api/trips/{self.trip.id}/routes/optimize/",
+            {"startLocation": {"lat": 37.5, "lng": 127.0}, "places": places},
+            format="json",
+        ).data
+        payload = {
+            "events": [{"id": p["id"], "order": int(p["order"])} for p in optimized["optimized"]["places"]],
+            "legsToken": optimized["legsToken"],
+        }
+
+        resp = client.post(f"/api/trips/{self.trip.id}/routes/optimize/apply/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        mock_get.assert_not_called()
+        a, b, c = self.events
+        ordered = list(self.trip.events.order_by("day_order").values_list("id", flat=True))
+        self.assertEqual(ordered, [c.id, b.id, a.id])
+        pairs = set(RouteSegment.objects.filter(trip=self.trip).values_list("from_event_id", "to_event_id"))
+        self.assertEqual(pairs, {(None, c.id), (c.id, b.id), (b.id, a.id)})
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 30)
+        self.assertEqual(float(self.trip.total_distance_km), 6.0)
+
+    @patch("apps.routes.services.requests.get")
+    def test_pairs_missing_from_token_are_created_as_estimates(self, mock_get):
+        mock_get.return_value.json.return_value = {"status": "ZERO_RESULTS"}
+        client = self.client
+        a, b, c = self.events
+        places = [
+            {"id": str(e.id), "placeId": f"p{e.id}", "lat": float(e.lat), "lng": float(e.lng)}
+            for e in self.events
+        ]
+        optimized = client.post(
+            f"/api/trips/{self.trip.id}/routes/optimize/",
+            {"startLocation": {"lat": 37.5, "lng": 127.0}, "places": places},
+            format="json",
+        ).data
+        # optimize 이후 c의 좌표가 바뀌어 c가 포함된 토큰 구간은 쓸 수 없음
+        Event.objects.filter(id=c.id).update(lat=37.525)
+        payload = {
+            "events": [{"id": p["id"], "order": int(p["order"])} for p in optimized["optimized"]["places"]],
+            "legsToken": optimized["legsToken"],
+        }
+
+        resp = client.post(f"/api/trips/{self.trip.id}/routes/optimize/apply/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        segments = {(seg.from_event_id, seg.to_event_id): seg for seg in RouteSegment.objects.filter(trip=self.trip)}
+        self.assertEqual(set(segments), {(None, c.id), (c.id, b.id), (b.id, a.id)})
+        self.assertFalse(segments[(b.id, a.id)].local_estimate)
+        self.assertTrue(segments[(None, c.id)].local_estimate)
+        self.assertTrue(segments[(c.id, b.id)].local_estimate)
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, sum(seg.duration_min for seg in segments.values()))
+
+    @patch("apps.routes.services.requests.get")
+    def test_apply_without_token_persists_order_and_segments(self, mock_get):
+        mock_get.return_value.json.return_value = {"status": "ZERO_RESULTS"}
+        a, b, c = self.events
+        payload = {"events": [{"id": str(c.id), "order": 10}, {"id": str(b.id), "order": 20}, {"id": str(a.id), "order": 30}]}
+
+        resp = self.client.post(f"/api/trips/{self.trip.id}/routes/optimize/apply/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([event["id"] for event in resp.data["events"]], [c.id, b.id, a.id])
+        ordered = list(self.trip.events.order_by("order_key").values_list("id", flat=True))
+        self.assertEqual(ordered, [c.id, b.id, a.id])
+        pairs = set(RouteSegment.objects.filter(trip=self.trip).values_list("from_event_id", "to_event_id"))
+        self.assertEqual(pairs, {(None, c.id), (c.id, b.id), (b.id, a.id)})
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_duration_min, 30)
+
+    def test_viewer_cannot_apply(self):
+        viewer = get_user_model().objects.create_user(
+            username="viewer", email="viewer@example.com", password="pass1234!",
+        )
+        TripMember.objects.create(trip=self.trip, user=viewer, role="viewer")
+        client = APIClient()
+        client.force_authenticate(user=viewer)
+        a, b, c = self.events
+        payload = {"events": [{"id": str(c.id), "order": 10}, {"id": str(a.id), "order": 30}]}
+
+        resp = client.post(f"/api/trips/{self.trip.id}/routes/optimize/apply/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 403)
+        ordered = list(self.trip.events.order_by("order_key").values_list("id", flat=True))
+        self.assertEqual(ordered, [a.id, b.id, c.id])
+
+    def test_unknown_token_is_rejected(self):
+        payload = {"events": [{"id": str(self.events[0].id), "order": 1}], "legsToken": "missing"}
+        resp = self.client.post(f"/api/trips/{self.trip.id}/routes/optimize/apply/", payload, format="json")
+
+        self.assertEqual(resp.status_code, 400)
+
+
+class TripMatrixTests(TripTestMixin, TestCase):
+    def setUp(self):
+        self.create_trip()
+        self.events = self.create_line_events()
+
+    def fake_legs(self, pairs, fetch=False):
+        return [{"durationMin": 7.0, "distanceKm": 2.5, "estimated": False} for _ in pairs]
+
+    def test_lazily_filled_cells_are_reused(self):
+        a, b, c = (e.id for e in self.events)
+        maps = GoogleMapsService()
+
+        with patch.object(GoogleMapsService, "get_legs", side_effect=self.fake_legs) as mock_legs:
+            first = trip_matrix.event_legs(self.trip, [(None, a), (a, b)], maps)
+            second = trip_matrix.event_legs(self.trip, [(None, a), (a, b), (b, c)], maps)
+
+        self.assertEqual(first[(a, b)]["durationMin"], 7.0)
+        self.assertEqual(mock_legs.call_count, 2)
+        # 두 번째 호출은 새 구간(b → c)만 조회
+        self.assertEqual(len(mock_legs.call_args_list[1][0][0]), 1)
+        self.assertFalse(second[(None, a)]["estimated"])
+
+    def test_event_changes_only_touch_their_rows(self):
+        a, b, c = self.events
+        with patch.object(GoogleMapsService, "get_legs", side_effect=self.fake_legs):
+            trip_matrix.event_legs(self.trip, [(None, a.id), (a.id, c.id), (c.id, b.id)], GoogleMapsService())
+
+        b.delete()
+        trip_matrix.refresh(self.trip)
+        c.lat = 37.58
+        c.save()
+        Event.objects.create(trip=self.trip, order=4, global_order=4, day=1, day_order=40, lat=37.60, lng=127.0)
+        trip_matrix.refresh(self.trip)
+
+        matrix = trip_matrix.load(self.trip)
+        self.assertEqual(matrix.size, 4)
+        self.assertEqual(matrix.instance.event_ids[:2], [a.id, c.id])
+        # a → c는 c 좌표가 바뀌어 비워지고, 남은 Event의 행렬 위치는 유지
+        self.assertIsNone(matrix.get(matrix.node(a.id), matrix.node(c.id)))
+        self.assertEqual(matrix.get(0, matrix.node(a.id))["durationMin"], 7.0)
+
+    def test_save_merges_cells_learned_by_concurrent_requests(self):
+        a, b, c = (e.id for e in self.events)
+        maps = GoogleMapsService()
+        # 두 요청이 모두 행렬이 없는 상태에서 읽고, 각자 다른 셀을 알게 됨
+        first = trip_matrix.load(self.trip)
+        second = trip_matrix.load(self.trip)
+        first.set(first.node(a), first.node(b), {"durationMin": 5.0, "distanceKm": 1.0, "estimated": False})
+        second.set(second.node(b), second.node(c), {"durationMin": 6.0, "distanceKm": 1.5, "estimated": False})
+        first.save()
+        second.save()
+
+        self.assertEqual(TripMatrix.objects.filter(trip=self.trip).count(), 1)
+        matrix = trip_matrix.load(self.trip)
+        self.assertEqual(matrix.get(matrix.node(a), matrix.node(b))["durationMin"], 5.0)
+        self.assertEqual(matrix.get(matrix.node(b), matrix.node(c))["durationMin"], 6.0)
+
+    def test_read_only_lookup_does_not_persist(self):
+        a, b, _ = (e.id for e in self.events)
+        with patch.object(GoogleMapsService, "get_legs", side_effect=self.fake_legs):
+            legs = trip_matrix.event_legs(self.trip, [(a, b)], GoogleMapsService(), save=False)
+
+        self.assertEqual(legs[(a, b)]["durationMin"], 7.0)
+        self.assertFalse(TripMatrix.objects.filter(trip=self.trip).exists())
+
+
+@override_settings(GOOGLE_MAPS_API_KEY="")
+class RoadGraphTests(TestCase):
+    OSM_PATH = os.path.join(os.path.dirname(__file__), "testdata", "tiny_city.osm")
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.graph_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.graph_dir)
+        road_graph.build(cls.OSM_PATH, os.path.join(cls.graph_dir, "tiny"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_contracted_queries_match_plain_dijkstra(self):
+        coords, edges = road_graph.parse_osm(self.OSM_PATH)
+        graph = road_graph.RoadGraph(os.path.join(self.graph_dir, "tiny"))
+        adjacency = {}
+        for u, v, seconds, _ in edges:
+            adjacency.setdefault(u, []).append((v, seconds))
+
+        table = graph.many_to_many(range(len(coords)), range(len(coords)))
+        for source in range(len(coords)):
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            while heap:
+                d, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                for y, seconds in adjacency.get(x, []):
+                    if d + seconds < dist.get(y, float("inf")):
+                        dist[y] = d + seconds
+                        heapq.heappush(heap, (d + seconds, y))
+            for target, expected in dist.items():
+                seconds, _, nodes = graph.shortest(source, target)
+                self.assertAlmostEqual(seconds, expected, places=2)
+                self.assertEqual((nodes[0], nodes[-1]), (source, target))
+                if source != target:
+                    self.assertAlmostEqual(table[(source, target)][0], expected, places=2)
+
+    def test_snap_grid_is_read_from_build_output(self):
+        coords, _ = road_graph.parse_osm(self.OSM_PATH)
+        graph = road_graph.RoadGraph(os.path.join(self.graph_dir, "tiny"))
+
+        self.assertIsInstance(graph.grid_nodes, memoryview)
+        self.assertEqual(sorted(graph.grid_nodes), list(range(len(coords))))
+        rng = random.Random(7)
+        for _ in range(20):
+            point = {"lat": 37.5 + rng.uniform(-0.005, 0.02), "lng": 127.0 + rng.uniform(-0.005, 0.02)}
+            nearest = min(
+                road_graph._haversine_m(point["lat"], point["lng"], lat, lng) for lat, lng in coords
+            )
+            snapped = graph.snap(point, 5000)
+            self.assertAlmostEqual(snapped[1], nearest, places=3)
+
+    @patch("apps.routes.services.requests.get")
+    def test_maps_service_uses_local_graph_before_api(self, mock_get):
+        inside = [{"lat": 37.5001, "lng": 127.0001}, {"lat": 37.515, "lng": 127.0149}, {"lat": 37.505, "lng": 127.01}]
+        outside = {"lat": 35.1, "lng": 129.0}
+        service = GoogleMapsService()
+
+        with override_settings(ROAD_GRAPH_DIR=self.graph_dir):
+            matrix = service.calculate_duration_matrix(inside + [outside])
+            route = service.calculate_route(inside[0], inside[1])
+
+        mock_get.assert_not_called()
+        self.assertFalse(any(matrix["estimated"][i][j] for i in range(3) for j in range(3)))
+        self.assertTrue(matrix["estimated"][0][3])
+        self.assertGreater(matrix["distanceKm"][0][1], 2.5)
+        self.assertTrue(route["polyline"])
+
+
+class TravelEstimatorTests(TestCase):
+    def setUp(self):
+        travel_estimator.reset()
+        self.addCleanup(travel_estimator.reset)
+        self.trip = Trip.objects.create(title="Test Trip", city="Seoul", start_lat=37.50, start_lng=127.00)
+        # 간격이 다른 북쪽 방향 구간들: 도로 = 직선 × 1.3, 시간 = 2분 + 도로 km × 2.5분
+        previous, lat = None, 37.50
+        for idx, gap in enumerate([0.004, 0.01, 0.02, 0.006, 0.03, 0.015, 0.008]):
+            origin = {"lat": lat, "lng": 127.0}
+            lat += gap
+            event = Event.objects.create(
+                trip=self.trip, order=idx + 1, global_order=idx + 1, day=1,
+                day_order=(idx + 1) * 10, lat=lat, lng=127.0,
+            )
+            road_km = travel_estimator.straight_km(origin, {"lat": lat, "lng": 127.0}) * 1.3
+            RouteSegment.objects.create(
+                trip=self.trip, from_event=previous, to_event=event,
+                duration_min=round(2 + road_km * 2.5), distance_km=round(road_km, 2),
+            )
+            previous = event
+
+    def test_fit_learns_city_speed_and_detour(self):
+        out = StringIO()
+        call_command("fit_travel_estimator", min_samples=5, stdout=out)
+
+        self.assertEqual(TravelTimeCoefficient.objects.count(), 2)  # seoul + 전체 도시
+        coef = travel_estimator.coefficients("Seoul", "DRIVING")
+        self.assertAlmostEqual(coef.detour_factor, 1.3, places=1)
+        self.assertAlmostEqual(coef.minutes_per_km, 2.5, delta=0.3)
+        self.assertIn("seoul", out.getvalue())
+
+        leg = GoogleMapsService(city="Seoul").get_legs([({"lat": 37.5, "lng": 127.0}, {"lat": 37.53, "lng": 127.0})])[0]
+        self.assertTrue(leg["estimated"])
+        self.assertAlmostEqual(leg["distanceKm"], 3.34 * 1.3, delta=0.1)
+        # 다른 도시는 전체 도시 계수, 계수가 없는 이동 수단은 기존 3분/km
+        self.assertEqual(travel_estimator.coefficients("Busan", "DRIVING"), travel_estimator.coefficients("", "DRIVING"))
+        self.assertEqual(travel_estimator.coefficients("Seoul", "BICYCLING"), travel_estimator.DEFAULT_COEFFICIENTS)
+
+    @override_settings(GOOGLE_MAPS_API_KEY="")
+    def test_estimates_look_up_coefficients_once_per_call(self):
+        points = [{"lat": 37.5 + idx * 0.01, "lng": 127.0} for idx in range(4)]
+        service = GoogleMapsService(city="Seoul")
+
+        with patch.object(travel_estimator, "coefficients", wraps=travel_estimator.coefficients) as mock_coef:
+            legs = service.get_legs(list(zip(points, points[1:])))
+            matrix = service.calculate_duration_matrix(points)
+
+        self.assertTrue(all(leg["estimated"] for leg in legs))
+        self.assertTrue(matrix["estimated"][0][3])
+        self.assertEqual(mock_coef.call_count, 2)
+
+    def test_estimated_segments_are_not_training_samples(self):
+        RouteSegment.objects.filter(trip=self.trip).update(local_estimate=True)
+
+        self.assertEqual(travel_estimator.collect_samples(), {})
+
+    def test_too_few_segments_keep_fixed_estimate(self):
+        call_command("fit_travel_estimator", stdout=StringIO())
+
+        self.assertFalse(TravelTimeCoefficient.objects.exists())
+        self.assertEqual(travel_estimator.coefficients("Seoul"), travel_estimator.DEFAULT_COEFFICIENTS)
@@ -0,0 +1,218 @@
+"""
+학습된 이동 시간 추정 (API 없이)
+
+- 저장된 RouteSegment(실제 API 결과)로 도시/이동 수단별 계수를 학습합니다 (fit_travel_estimator).
+    도로 거리(km) = 직선 거리 × detour_factor
+    이동 시간(분) = intercept_min + 도로 거리 × minutes_per_km
+- 계수 표는 프로세스당 한 번 읽고 RELOAD_SECONDS마다 다시 읽습니다.
+- 계수가 없으면 도시 → 전체 도시 → 기존 고정값(직선 거리 × 3분/km) 순서로 사용합니다.
+"""
+import math
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+
+from django.db import DatabaseError, transaction
+
+from .models import RouteSegment, TravelTimeCoefficient
+
+# 학습 계수가 없을 때의 기존 추정치 (분/km)
+DEFAULT_MINUTES_PER_KM = 3
+
+# 계수 표 재로딩 주기 (초) - fit_travel_estimator 결과가 worker에 반영되는 최대 지연
+RELOAD_SECONDS = 300
+
+# 학습에서 제외할 구간: 직선 거리가 너무 짧거나, 도로/직선 비율이 비정상인 구간
+MIN_STRAIGHT_KM = 0.05
+MIN_DETOUR = 0.9
+MAX_DETOUR = 4.0
+
+DEFAULT_MIN_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class Coefficients:
+    detour_factor: float
+    minutes_per_km: float
+    intercept_min: float = 0.0
+
+    def estimate(self, straight_km):
+        if straight_km <= 0:
+            return {'durationMin': 0, 'distanceKm': 0}
+        road_km = straight_km * self.detour_factor
+        return {
+            'durationMin': self.intercept_min + road_km * self.minutes_per_km,
+            'distanceKm': road_km
+        }
+
+
+DEFAULT_COEFFICIENTS = Coefficients(detour_factor=1.0, minutes_per_km=DEFAULT_MINUTES_PER_KM)
+
+# 이동 수단별 기본값 (학습 계수가 없을 때) - 도보 4.5km/h, 골목 우회 1.2배
+DEFAULT_MODE_COEFFICIENTS = {
+    'WALKING': Coefficients(detour_factor=1.2, minutes_per_km=60 / 4.5),
+}
+
+_table = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def straight_km(origin, destination):
+    """두 지점 간 직선 거리 (km, Haversine formula)"""
+    lat1, lng1 = math.radians(float(origin['lat'])), math.radians(float(origin['lng']))
+    lat2, lng2 = math.radians(float(destination['lat'])), math.radians(float(destination['lng']))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+
+def city_key(city):
+    return (city or '').strip().lower()
+
+
+def coefficients(city=None, mode='DRIVING'):
+    """(도시, 이동 수단) 계수 - 없으면 전체 도시 계수, 그것도 없으면 이동 수단별 기본값/기존 고정값"""
+    table = _load()
+    return (
+        table.get((city_key(city), mode)) or table.get(('', mode))
+        or DEFAULT_MODE_COEFFICIENTS.get(mode, DEFAULT_COEFFICIENTS)
+    )
+
+
+def estimate(origin, destination, city=None, mode='DRIVING'):
+    """구간 하나의 추정 이동 시간/거리 {'durationMin', 'distanceKm'}"""
+    return coefficients(city, mode).estimate(straight_km(origin, destination))
+
+
+def estimate_many(pairs, city=None, mode='DRIVING'):
+    """구간 목록의 추정 이동 시간/거리 (계수 조회 1회)"""
+    coef = coefficients(city, mode)
+    return [coef.estimate(straight_km(origin, destination)) for origin, destination in pairs]
+
+
+def reset():
+    """계수 표 캐시 비우기 (다음 조회 때 다시 읽음)"""
+    global _table
+    with _lock:
+        _table = None
+
+
+def _load():
+    global _table, _loaded_at
+    with _lock:
+        if _table is None or time.monotonic() - _loaded_at > RELOAD_SECONDS:
+            try:
+                _table = {
+                    (row.city, row.travel_mode): Coefficients(row.detour_factor, row.minutes_per_km, row.intercept_min)
+                    for row in TravelTimeCoefficient.objects.all()
+                }
+            except DatabaseError as e:
+                # 마이그레이션 전 등 - 기존 고정값으로 동작
+                print(f"⚠️ 이동 시간 추정 계수 로드 실패: {e}")
+                _table = {}
+            _loaded_at = time.monotonic()
+        return _table
+
+
+# ---------------------------------------------------------------------------
+# 학습
+# ---------------------------------------------------------------------------
+
+def collect_samples():
+    """
+    RouteSegment → {(도시 키, 이동 수단): [(직선 km, 도로 km, 분)]} (쿼리 1회)
+
+    - 시작 지점 구간(from_event 없음)은 Trip의 시작 위치를 사용하고, 위치가 없는 구간은 제외합니다.
+    - 추정치로 만든 구간(local_estimate)은 학습에 쓰지 않습니다 (추정치로 추정치를 학습하지 않도록).
+    """
+    rows = RouteSegment.objects.filter(local_estimate=False).values_list(
+        'trip__city', 'travel_mode', 'duration_min', 'distance_km',
+        'from_event__lat', 'from_event__lng', 'trip__start_lat', 'trip__start_lng',
+        'to_event__lat', 'to_event__lng',
+    )
+    groups = {}
+    for city, mode, duration, distance, from_lat, from_lng, start_lat, start_lng, to_lat, to_lng in rows.iterator():
+        origin_lat, origin_lng = (from_lat, from_lng) if from_lat is not None else (start_lat, start_lng)
+        if None in (origin_lat, origin_lng, to_lat, to_lng):
+            continue
+        straight = straight_km({'lat': origin_lat, 'lng': origin_lng}, {'lat': to_lat, 'lng': to_lng})
+        groups.setdefault((city_key(city), mode), []).append((straight, float(distance), float(duration)))
+    return groups
+
+
+def fit(samples, min_samples=DEFAULT_MIN_SAMPLES):
+    """
+    (직선 km, 도로 km, 분) 목록으로 계수 학습
+
+    - detour_factor: 도로/직선 거리 비율의 중앙값 (이상치에 강함)
+    - 이동 시간: 도로 거리에 대한 최소제곱 직선 (기울기/절편이 음수면 원점을 지나는 직선)
+
+    Returns:
+        dict: {'coefficients', 'samples', 'maeMin', 'baselineMaeMin'} - 샘플이 부족하면 None
+    """
+    samples = [
+        (straight, road, minutes) for straight, road, minutes in samples
+        if straight >= MIN_STRAIGHT_KM and minutes >= 0 and MIN_DETOUR <= road / straight <= MAX_DETOUR
+    ]
+    if len(samples) < min_samples:
+        return None
+
+    detour = statistics.median(road / straight for straight, road, _ in samples)
+
+    n = len(samples)
+    mean_x = sum(road for _, road, _ in samples) / n
+    mean_y = sum(minutes for _, _, minutes in samples) / n
+    sxx = sum((road - mean_x) ** 2 for _, road, _ in samples)
+    sxy = sum((road - mean_x) * (minutes - mean_y) for _, road, minutes in samples)
+    slope = sxy / sxx if sxx else 0
+    intercept = mean_y - slope * mean_x
+    if slope <= 0 or intercept < 0:
+        slope = sum(road * minutes for _, road, minutes in samples) / sum(road * road for _, road, _ in samples)
+        intercept = 0.0
+
+    coef = Coefficients(detour_factor=detour, minutes_per_km=slope, intercept_min=intercept)
+    return {
+        'coefficients': coef,
+        'samples': n,
+        'maeMin': sum(abs(coef.estimate(s)['durationMin'] - m) for s, _, m in samples) / n,
+        'baselineMaeMin': sum(abs(DEFAULT_COEFFICIENTS.estimate(s)['durationMin'] - m) for s, _, m in samples) / n,
+    }
+
+
+def fit_all(min_samples=DEFAULT_MIN_SAMPLES, save=True):
+    """
+    모든 (도시, 이동 수단)과 이동 수단별 전체 도시('') 계수를 학습하고 표를 교체
+
+    Returns:
+        dict: {(도시 키, 이동 수단): fit 결과} - 샘플이 부족한 그룹은 제외
+    """
+    groups = collect_samples()
+    targets = {key: samples for key, samples in groups.items() if key[0]}
+    for (_, mode), samples in groups.items():
+        targets.setdefault(('', mode), []).extend(samples)
+
+    results = {}
+    for key, samples in targets.items():
+        result = fit(samples, min_samples=min_samples)
+        if result:
+            results[key] = result
+
+    if save:
+        with transaction.atomic():
+            TravelTimeCoefficient.objects.all().delete()
+            TravelTimeCoefficient.objects.bulk_create([
+                TravelTimeCoefficient(
+                    city=city,
+                    travel_mode=mode,
+                    detour_factor=result['coefficients'].detour_factor,
+                    minutes_per_km=result['coefficients'].minutes_per_km,
+                    intercept_min=result['coefficients'].intercept_min,
+                    samples=result['samples'],
+                    mae_min=result['maeMin'],
+                )
+                for (city, mode), result in results.items()
+            ])
+        reset()
+    return results
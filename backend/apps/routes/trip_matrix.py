@@ -0,0 +1,262 @@
+"""
+Trip별 이동 시간/거리 행렬 (TripMatrix) 관리
+
+- 한 번의 쿼리로 행렬을 읽고, Event 추가/삭제/좌표 변경 시 해당 행/열만 추가·삭제·초기화합니다.
+- 값은 요청에 필요한 셀만 채웁니다 (캐시 → 선택적으로 Distance Matrix API).
+  추정치(estimated)는 행렬에 저장하지 않습니다.
+- 최적화(optimize), 삽입 위치 제안(suggest-insertion), 후보 평가(evaluate)가 함께 사용합니다.
+- 저장은 행을 잠그고(select_for_update) 다시 읽은 행렬에 이번 요청이 알게 된 셀만 병합합니다
+  (동시 요청이 서로의 셀을 덮어쓰지 않음). 조회 전용 경로(save=False)는 저장하지 않습니다.
+"""
+import math
+from array import array
+
+from django.db import transaction
+
+from .models import TripMatrix
+
+NAN = float('nan')
+
+
+def _point(location):
+    return [round(float(location['lat']), 6), round(float(location['lng']), 6)]
+
+
+def _empty(size):
+    return array('f', [NAN]) * (size * size)
+
+
+def _load_array(value, size):
+    values = array('f')
+    values.frombytes(bytes(value or b''))
+    if len(values) != size * size:
+        return _empty(size)
+    return values
+
+
+def _remap(values, old_size, keep):
+    """
+    행/열 재배치 - keep[new_index] = old_index (None이면 새 행/열, NaN으로 채움)
+    """
+    new_size = len(keep)
+    remapped = _empty(new_size)
+    for new_i, old_i in enumerate(keep):
+        if old_i is None:
+            continue
+        for new_j, old_j in enumerate(keep):
+            if old_j is not None:
+                remapped[new_i * new_size + new_j] = values[old_i * old_size + old_j]
+    return remapped
+
+
+class LoadedMatrix:
+    """메모리에 올린 TripMatrix (인덱스 접근 + 변경 추적)"""
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.size = len(instance.event_ids) + 1
+        self.durations = _load_array(instance.durations, self.size)
+        self.distances = _load_array(instance.distances, self.size)
+        self.index = {event_id: idx + 1 for idx, event_id in enumerate(instance.event_ids)}
+        self.learned = {}  # (from_event_id | None, to_event_id) → (출발 좌표, 도착 좌표, 구간)
+        self.dirty = False
+
+    def node(self, event_id):
+        """Event id(None = 시작 지점) → 행렬 인덱스 (위치가 없는 Event는 None)"""
+        return 0 if event_id is None else self.index.get(event_id)
+
+    def location(self, node):
+        lat, lng = self.instance.points[node]
+        return {'lat': lat, 'lng': lng}
+
+    def get(self, i, j):
+        duration = self.durations[i * self.size + j]
+        if math.isnan(duration):
+            return None
+        return {'durationMin': duration, 'distanceKm': self.distances[i * self.size + j], 'estimated': False}
+
+    def event_id(self, node):
+        return None if node == 0 else self.instance.event_ids[node - 1]
+
+    def set(self, i, j, leg):
+        self.durations[i * self.size + j] = leg['durationMin']
+        self.distances[i * self.size + j] = leg['distanceKm']
+        self.learned[(self.event_id(i), self.event_id(j))] = (self.instance.points[i], self.instance.points[j], leg)
+        self.dirty = True
+
+    def sync(self, start_location, events):
+        """
+        현재 Event 목록/좌표에 맞춰 행/열 추가·삭제·초기화
+
+        - 기존 인덱스 순서를 유지하고 새 Event는 끝에 추가합니다.
+        """
+        located = {event.id: _point(event.location) for event in events if event.location}
+        return self._sync_points(_point(start_location), located)
+
+    def _sync_points(self, start_point, located):
+        # located: {event_id: [lat, lng]}
+        instance = self.instance
+        old_points = instance.points or []
+
+        event_ids = [event_id for event_id in instance.event_ids if event_id in located]
+        event_ids += sorted(event_id for event_id in located if event_id not in self.index)
+        points = [start_point] + [located[event_id] for event_id in event_ids]
+
+        keep = [0] + [self.index.get(event_id) for event_id in event_ids]
+        for new_index, old_index in enumerate(keep):
+            if old_index is not None and (old_index >= len(old_points) or old_points[old_index] != points[new_index]):
+                keep[new_index] = None  # 좌표 변경 → 행/열 초기화
+
+        if keep == list(range(self.size)) and len(old_points) == self.size:
+            return False
+
+        self.durations = _remap(self.durations, self.size, keep)
+        self.distances = _remap(self.distances, self.size, keep)
+        instance.event_ids = event_ids
+        instance.points = points
+        self.size = len(keep)
+        self.index = {event_id: idx + 1 for idx, event_id in enumerate(event_ids)}
+        self.dirty = True
+        return True
+
+    def _write(self):
+        self.instance.durations = self.durations.tobytes()
+        self.instance.distances = self.distances.tobytes()
+        self.instance.save()
+        self.dirty = False
+
+    def save(self):
+        """
+        바뀐 내용을 DB 행렬에 병합 (값이 바뀐 경우에만)
+
+        - 행이 없으면 get_or_create로 만들고(동시 생성은 한쪽만 성공), 행을 잠근 뒤 다시 읽어
+          이 행렬이 본 Event/좌표로 맞추고 알게 된 셀만 덮어씁니다.
+        """
+        if not self.dirty:
+            return
+        with transaction.atomic():
+            TripMatrix.objects.get_or_create(trip_id=self.instance.trip_id)
+            current = LoadedMatrix(TripMatrix.objects.select_for_update().get(trip_id=self.instance.trip_id))
+            current._sync_points(
+                self.instance.points[0], dict(zip(self.instance.event_ids, self.instance.points[1:]))
+            )
+            for (from_id, to_id), (from_point, to_point, leg) in self.learned.items():
+                i, j = current.node(from_id), current.node(to_id)
+                if i is None or j is None or current.instance.points[i] != from_point or current.instance.points[j] != to_point:
+                    continue
+                current.set(i, j, leg)
+            current._write()
+        self.instance = current.instance
+        self.learned = {}
+        self.dirty = False
+
+
+def load(trip):
+    """
+    Trip 행렬 로드 후 현재 Event 목록과 동기화 (쿼리 1회, 저장하지 않음)
+
+    - 행렬이 없으면 빈 행렬로 시작하며, 저장(save)할 때 만들어집니다.
+    """
+    instance = TripMatrix.objects.filter(trip=trip).first() or TripMatrix(trip=trip)
+    matrix = LoadedMatrix(instance)
+    matrix.sync(trip.start_location, trip.events.only('id', 'lat', 'lng'))
+    return matrix
+
+
+def refresh(trip):
+    """
+    Event 추가/삭제/좌표 변경 후 호출 - 행렬이 이미 있으면 해당 행/열만 갱신 (행 잠금)
+
+    - 아직 행렬이 없는 Trip은 처음 사용할 때 만들어지므로 아무것도 하지 않습니다.
+    """
+    with transaction.atomic():
+        instance = TripMatrix.objects.select_for_update().filter(trip=trip).first()
+        if instance is None:
+            return
+        matrix = LoadedMatrix(instance)
+        if matrix.sync(trip.start_location, trip.events.only('id', 'lat', 'lng')):
+            matrix._write()
+
+
+def event_legs(trip, pairs, maps_service, fetch=False, save=True):
+    """
+    Event 간 구간 조회 (행렬 → 캐시 → [fetch] API → 추정치)
+
+    Args:
+        pairs: [(from_event_id | None(시작 지점), to_event_id)]
+        save: 새로 알게 된 셀을 행렬에 저장 (조회 전용 요청은 False)
+
+    Returns:
+        dict: {pair: {'durationMin', 'distanceKm', 'estimated'}} - 위치가 없는 Event의 구간은 제외
+    """
+    matrix = load(trip)
+    legs = {}
+    unknown = []
+
+    for pair in set(pairs):
+        i, j = matrix.node(pair[0]), matrix.node(pair[1])
+        if i is None or j is None:
+            continue
+        leg = matrix.get(i, j)
+        if leg is None:
+            unknown.append((pair, i, j))
+        else:
+            legs[pair] = leg
+
+    if unknown:
+        fetched = maps_service.get_legs(
+            [(matrix.location(i), matrix.location(j)) for _, i, j in unknown], fetch=fetch
+        )
+        for (pair, i, j), leg in zip(unknown, fetched):
+            legs[pair] = leg
+            if not leg['estimated']:
+                matrix.set(i, j, leg)
+
+    if save:
+        matrix.save()
+    return legs
+
+
+def duration_matrix(trip, maps_service, start_location, places):
+    """
+    optimize용 행렬 - 장소가 Trip의 Event(같은 id, 같은 좌표)이면 TripMatrix 값을 재사용
+
+    - 나머지 셀은 GoogleMapsService.calculate_duration_matrix가 채우고,
+      Event 간 셀은 TripMatrix에 다시 저장합니다.
+
+    Returns:
+        dict: calculate_duration_matrix와 같은 형식
+    """
+    matrix = load(trip)
+
+    nodes = [0 if _point(start_location) == matrix.instance.points[0] else None]
+    for place in places:
+        try:
+            node = matrix.node(int(place['id']))
+        except (TypeError, ValueError):
+            node = None
+        if node is not None and matrix.instance.points[node] != _point(place):
+            node = None
+        nodes.append(node)
+
+    known = {}
+    for i, node_i in enumerate(nodes):
+        for j, node_j in enumerate(nodes):
+            if i != j and node_i is not None and node_j is not None:
+                leg = matrix.get(node_i, node_j)
+                if leg is not None:
+                    known[(i, j)] = leg
+
+    result = maps_service.calculate_duration_matrix([start_location] + list(places), known=known)
+
+    for i, node_i in enumerate(nodes):
+        for j, node_j in enumerate(nodes):
+            if i == j or node_i is None or node_j is None or (i, j) in known or result['estimated'][i][j]:
+                continue
+            matrix.set(node_i, node_j, {
+                'durationMin': result['durationMin'][i][j],
+                'distanceKm': result['distanceKm'][i][j]
+            })
+
+    matrix.save()
+    return result
@@ -1,23 +1,46 @@
+import time
+
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Sum
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from apps.trips.models import Trip
+from apps.trips.models import Trip, TripMember
+from apps.trips.permissions import TripMemberPermission
+from apps.users.authentication import JWTAuthentication
 from apps.events.models import Event
+from apps.events import order_keys, ordering
 from apps.events.serializers import EventSerializer
 from .serializers import (
     RouteCalculateRequestSerializer, RouteCalculateResponseSerializer,
     OptimizeRequestSerializer, OptimizeResponseSerializer,
     OptimizeApplySerializer,
+    OptimizeDaysRequestSerializer, OptimizeDaysResponseSerializer,
+    EvaluateRequestSerializer, EvaluateResponseSerializer,
     PlaceSearchQuerySerializer, PlaceSearchResponseSerializer
 )
-from .services import GoogleMapsService, RouteOptimizer
+from .models import RouteSegment
+from .segments import (
+    RecomputeSuperseded, create_segments, fetch_segments, lock_segments, segment_pairs, store_segments,
+    superseded_segments
+)
+from .serializers import RouteSegmentModelSerializer
+from .services import GoogleMapsService, RouteOptimizer, route_cache_key, store_optimized_legs, load_optimized_legs
+from . import optimization, trip_matrix
+from .optimization_cache import optimization_cache
+from .renderers import EventStreamRenderer, format_event
 
 
 class PlaceSearchView(APIView):
@@ -73,18 +96,23 @@ Google Places(Text Search)로 장소를 검색합니다.
 
 class TripRouteViewSet(GenericViewSet):
     """Trip 루트 관리 ViewSet"""
+    permission_classes = [TripMemberPermission]
+    authentication_classes = [JWTAuthentication]
+    
+    # 스트리밍 최적화 개선 이벤트 최소 전송 간격 (초)
+    STREAM_MIN_INTERVAL = 0.1
+    # 저장하지 않고 계산만 하는 action (POST라도 viewer 허용)
+    COMPUTE_ACTIONS = ('calculate', 'optimize', 'optimize_stream', 'optimize_days', 'evaluate')
     
     def get_trip(self):
-        """Trip 가져오기 및 만료 체크"""
+        """Trip 가져오기 및 권한 체크 (계산만 하는 action은 멤버면 허용)"""
         trip_id = self.kwargs.get('trip_id')
         trip = get_object_or_404(Trip, id=trip_id)
-        
-        if trip.is_expired():
-            from rest_framework.exceptions import ValidationError
-            raise ValidationError(
-                {'error': {'code': 'TRIP_EXPIRED', 'message': 'Trip이 만료되었습니다.'}},
-                code=status.HTTP_410_GONE
-            )
+        if self.action in self.COMPUTE_ACTIONS:
+            if not TripMember.objects.filter(trip=trip, user=self.request.user).exists():
+                raise PermissionDenied('Trip 멤버만 사용할 수 있습니다.')
+        else:
+            self.check_object_permissions(self.request, trip)
         return trip
     
     @swagger_auto_schema(
@@ -117,7 +145,8 @@ Google Maps API를 사용하여 경로를 계산합니다.
         request_body=RouteCalculateRequestSerializer,
         responses={
             200: openapi.Response(description='경로 계산 성공', schema=RouteCalculateResponseSerializer),
-            400: openapi.Response(description='잘못된 요청')
+            400: openapi.Response(description='잘못된 요청'),
+            403: openapi.Response(description='권한 없음')
         }
     )
     @action(detail=False, methods=['post'])
@@ -131,38 +160,22 @@ Google Maps API를 사용하여 경로를 계산합니다.
         start_location = data['startLocation']
         places = data['places']
         
-        google_maps = GoogleMapsService()
+        google_maps = GoogleMapsService(city=trip.city)
         routes = []
         total_duration = 0
         total_distance = 0
         
-        # 시작 지점 → 첫 번째 장소
+        # 시작 지점 → 첫 번째 장소, 장소 간 루트 (캐시에 없는 구간은 공유 I/O 풀에서 병렬 조회)
         if places:
-            first_route = google_maps.calculate_route(start_location, places[0])
-            if first_route:
-                routes.append({
-                    'fromPlaceId': 'start',
-                    'toPlaceId': places[0]['placeId'],
-                    'durationMin': first_route['durationMin'],
-                    'distanceKm': first_route['distanceKm'],
-                    'polyline': first_route['polyline']
-                })
-                total_duration += first_route['durationMin']
-                total_distance += first_route['distanceKm']
-        
-        # 장소 간 루트
-        for i in range(len(places) - 1):
-            from_place = places[i]
-            to_place = places[i + 1]
-            
-            route = google_maps.calculate_route(
-                from_place['placeId'],
-                to_place['placeId']
-            )
-            
-            if route:
+            pairs = [(start_location, places[0])] + [
+                (places[i]['placeId'], places[i + 1]['placeId']) for i in range(len(places) - 1)
+            ]
+            from_ids = ['start'] + [place['placeId'] for place in places[:-1]]
+            for from_id, to_place, route in zip(from_ids, places, google_maps.calculate_routes(pairs)):
+                if not route:
+                    continue
                 routes.append({
-                    'fromPlaceId': from_place['placeId'],
+                    'fromPlaceId': from_id,
                     'toPlaceId': to_place['placeId'],
                     'durationMin': route['durationMin'],
                     'distanceKm': route['distanceKm'],
@@ -194,8 +207,20 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
 
 **특징:**
 - 2-opt 알고리즘 사용
-- 최대 10개 장소까지 최적화 가능
-- 거리 및 시간 개선율 제공
+- 최대 `ROUTE_OPTIMIZER_MAX_PLACES`(기본 50)개 장소까지 최적화 가능
+- 실제 이동 시간 기준 최적화 (루트 캐시 + Distance Matrix API, 캐시에 없는 셀만 일괄 조회)
+- API 결과가 없는 구간은 직선 거리 기반 추정치 사용
+- 거리 및 시간 개선율 제공 (시간 개선율은 실제 이동 시간 기준)
+- 같은 장소 집합(순서 무관)의 이전 결과는 즉시 재사용 (`cacheStatus: hit`)
+- 장소 하나만 추가/삭제/교체된 경우 이전 해에서 이어서 최적화 (`cacheStatus: warm`)
+- 큰 최적화는 별도 프로세스 풀에서 실행하며, 시간 예산 초과 시 그때까지의 최선 해를 반환 (`timedOut: true`)
+- `starts` > 1: 무작위 초기 해/double-bridge kick으로 여러 번 시작해 가장 좋은 해 선택 (worker 병렬, `startsCompleted`)
+- `timeBudgetMs`: 최적화 시간 예산 (`starts`와 함께 서버 상한 적용, time window 모드는 `starts` 미적용)
+
+**Time window (`respectTimeWindows: true`):**
+- `startTime`(HH:MM)이 있는 장소는 고정 시각으로 취급 (일찍 도착하면 대기, 늦으면 위반)
+- `durationMin`(없으면 60분)을 체류 시간으로 일정에 포함, `dayStartTime`(기본 09:00)부터 출발
+- 각 장소의 `arrivalTime`과 지킬 수 없는 고정 시각 목록(`violations`)을 함께 반환
 
 **요청 예시:**
 ```json
@@ -238,7 +263,8 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
         request_body=OptimizeRequestSerializer,
         responses={
             200: openapi.Response(description='최적화 제안 성공', schema=OptimizeResponseSerializer),
-            400: openapi.Response(description='잘못된 요청 (10개 초과 등)')
+            400: openapi.Response(description='잘못된 요청 (장소 수 제한 초과 등)'),
+            403: openapi.Response(description='권한 없음')
         }
     )
     @action(detail=False, methods=['post'])
@@ -252,53 +278,135 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
         start_location = data['startLocation']
         places = data['places']
         
-        if len(places) > 10:
+        max_places = settings.ROUTE_OPTIMIZER_MAX_PLACES
+        
+        if len(places) > max_places:
             return Response(
-                {'error': {'code': 'TOO_MANY_PLACES', 'message': '최대 10개의 장소만 최적화할 수 있습니다.'}},
+                {'error': {'code': 'TOO_MANY_PLACES', 'message': f'최대 {max_places}개의 장소만 최적화할 수 있습니다.'}},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # 현재 순서 계산
-        google_maps = GoogleMapsService()
+        google_maps = GoogleMapsService(city=trip.city)
         optimizer = RouteOptimizer(google_maps)
         
-        original_distance = optimizer.calculate_route_distance(start_location, places)
+        # 이동 시간/거리 행렬 (TripMatrix → 캐시 → 없는 셀만 Distance Matrix API 일괄 조회)
+        matrix = trip_matrix.duration_matrix(trip, google_maps, start_location, places)
+        durations = matrix['durationMin']
         
-        # 최적화
-        optimized_places = optimizer.optimize(start_location, places, iterations=2)
-        optimized_distance = optimizer.calculate_route_distance(start_location, optimized_places)
+        # 현재 순서
+        original_route = list(range(1, len(places) + 1))
         
-        # 개선율 계산
-        if original_distance > 0:
-            distance_improvement = int(((original_distance - optimized_distance) / original_distance) * 100)
+        # 같은 장소 집합의 이전 결과 재사용 (순서 무관 fingerprint, LRU)
+        respect_time_windows = data.get('respectTimeWindows', False)
+        constraints = {'respectTimeWindows': respect_time_windows}
+        if respect_time_windows:
+            constraints['dayStartTime'] = data.get('dayStartTime')
+        # multi-start 결과는 기본 최적화 결과와 품질이 달라 별도로 캐시
+        starts = 1 if respect_time_windows else data.get('starts', 1)
+        if starts > 1:
+            constraints['starts'] = starts
+        time_budget = data['timeBudgetMs'] / 1000 if data.get('timeBudgetMs') else None
+        fingerprint, context, place_keys = optimization_cache.fingerprint(
+            start_location, places, mode='DRIVING', constraints=constraints, durations=durations
+        )
+        
+        optimized_route = optimization_cache.get(fingerprint, place_keys)
+        cache_status = 'hit'
+        timed_out = False
+        starts_completed = None
+        if optimized_route is None:
+            # 최적화 (respectTimeWindows: 고정 시각/체류 시간 제약 반영)
+            if respect_time_windows:
+                result = optimizer.solve_time_windows(
+                    places, durations, data.get('dayStartTime'), time_budget=time_budget
+                )
+                cache_status = 'miss'
+            else:
+                seed = optimization_cache.warm_start(context, place_keys, durations)
+                result = optimizer.optimize_route(
+                    durations, len(places), iterations=2, initial_route=seed,
+                    time_budget=time_budget, starts=starts
+                )
+                cache_status = 'warm' if seed else 'miss'
+            optimized_route = result['route']
+            timed_out = result['timedOut']
+            starts_completed = result.get('startsCompleted')
+            # deadline에 걸린 중간 결과는 캐시하지 않음
+            if not timed_out:
+                optimization_cache.put(fingerprint, context, place_keys, optimized_route)
+        
+        response_data = self._optimize_response_data(
+            optimizer, places, optimized_route, matrix, original_route,
+            respect_time_windows, data.get('dayStartTime')
+        )
+        response_data['cacheStatus'] = cache_status
+        response_data['legsToken'] = store_optimized_legs(trip.id, start_location, places, matrix)
+        response_data['timedOut'] = timed_out
+        if starts_completed is not None:
+            response_data['startsCompleted'] = starts_completed
+        
+        response_serializer = OptimizeResponseSerializer(response_data)
+        return Response(response_serializer.data)
+    
+    def _optimized_places_payload(self, optimizer, places, route, durations, respect_time_windows, day_start):
+        """노드 인덱스 route → 응답용 places (order, arrivalTime) 및 고정 시각 위반 목록"""
+        violations = None
+        if respect_time_windows:
+            result = optimizer.describe_time_windows(places, route, durations, day_start)
+            ordered_places = result['places']
+            violations = result['violations']
         else:
-            distance_improvement = 0
+            ordered_places = [places[node - 1] for node in route]
         
-        # 최적화된 places에 order 부여
-        optimized_places_with_order = []
-        for idx, place in enumerate(optimized_places):
-            optimized_places_with_order.append({
+        payload = []
+        for idx, place in enumerate(ordered_places):
+            optimized_place = {
                 'id': place['id'],
                 'placeId': place['placeId'],
                 'name': place.get('name', ''),
                 'lat': place['lat'],
                 'lng': place['lng'],
                 'order': float(idx + 1)
-            })
+            }
+            if 'arrivalTime' in place:
+                optimized_place['arrivalTime'] = place['arrivalTime']
+            payload.append(optimized_place)
+        
+        return payload, violations
+    
+    def _optimize_response_data(self, optimizer, places, route, matrix, original_route,
+                                respect_time_windows, day_start):
+        """원래 순서 대비 최적화 결과 응답 데이터 (optimize / optimize/stream 공용)"""
+        durations = matrix['durationMin']
+        distances = matrix['distanceKm']
+        
+        original_duration = optimization.route_cost(durations, original_route)
+        original_distance = optimization.route_cost(distances, original_route)
+        optimized_duration = optimization.route_cost(durations, route)
+        optimized_distance = optimization.route_cost(distances, route)
+        
+        # 개선율 계산 (실제 이동 시간 기준)
+        if original_duration > 0:
+            duration_improvement = int(((original_duration - optimized_duration) / original_duration) * 100)
+        else:
+            duration_improvement = 0
+        if original_distance > 0:
+            distance_improvement = int(((original_distance - optimized_distance) / original_distance) * 100)
+        else:
+            distance_improvement = 0
         
-        # 대략적인 시간 계산 (거리 * 3분/km)
-        original_duration = int(original_distance * 3)
-        optimized_duration = int(optimized_distance * 3)
-        duration_improvement = int(((original_duration - optimized_duration) / original_duration) * 100) if original_duration > 0 else 0
+        optimized_places, violations = self._optimized_places_payload(
+            optimizer, places, route, durations, respect_time_windows, day_start
+        )
         
         response_data = {
             'original': {
-                'totalDurationMin': original_duration,
+                'totalDurationMin': int(original_duration),
                 'totalDistanceKm': round(original_distance, 2)
             },
             'optimized': {
-                'places': optimized_places_with_order,
-                'totalDurationMin': optimized_duration,
+                'places': optimized_places,
+                'totalDurationMin': int(optimized_duration),
                 'totalDistanceKm': round(optimized_distance, 2)
             },
             'improvement': {
@@ -306,8 +414,253 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
                 'distancePercent': max(0, distance_improvement)
             }
         }
+        if violations is not None:
+            response_data['violations'] = violations
+        return response_data
+    
+    @swagger_auto_schema(
+        operation_summary="경로 최적화 스트리밍 (SSE)",
+        operation_description="""
+`POST /routes/optimize/`와 같은 요청을 받아, 더 나은 방문 순서를 찾을 때마다
+Server-Sent Events로 전송합니다. (`Accept: text/event-stream`)
+
+**이벤트:**
+- `seed`: 초기 해 (Nearest Neighbor, time window 모드는 고정 시각 순서 + 삽입)
+- `improvement`: 개선된 해 (과도한 전송을 막기 위해 최소 간격으로 묶어서 전송)
+- `done`: 최종 결과 (`POST /routes/optimize/` 응답 형식 + `timedOut`)
+- `error`: 요청 검증 실패 등
+
+`seed`/`improvement` 데이터:
+```json
+{
+  "iteration": 3,
+  "elapsedMs": 120,
+  "totalDurationMin": 95,
+  "totalDistanceKm": 21.4,
+  "places": [...]
+}
+```
+
+**특징:**
+- 최대 `ROUTE_OPTIMIZER_STREAM_MAX_PLACES`개 장소까지 허용 (탐색이 요청 스레드에서 실행되므로 작게 유지)
+- 클라이언트가 충분히 좋은 해를 받으면 연결을 끊을 수 있으며, 서버도 즉시 계산을 중단합니다.
+- `ROUTE_OPTIMIZER_STREAM_BUDGET_MS`가 지나면 그때까지의 최선 해로 `done`을 보냅니다.
+        """,
+        tags=['routes'],
+        request_body=OptimizeRequestSerializer,
+        responses={
+            200: openapi.Response(description='이벤트 스트림 (text/event-stream)'),
+            400: openapi.Response(description='잘못된 요청 (장소 수 초과 등)'),
+            403: openapi.Response(description='권한 없음')
+        }
+    )
+    @action(
+        detail=False, methods=['post'], url_path='optimize/stream',
+        renderer_classes=[JSONRenderer, EventStreamRenderer]
+    )
+    def optimize_stream(self, request, trip_id=None):
+        """루트 최적화 스트리밍 (SSE)"""
+        trip = self.get_trip()
+        serializer = OptimizeRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        response_serializer = OptimizeResponseSerializer(response_data)
+        data = serializer.validated_data
+        start_location = data['startLocation']
+        places = data['places']
+        max_places = settings.ROUTE_OPTIMIZER_STREAM_MAX_PLACES
+        
+        if len(places) > max_places:
+            return Response(
+                {'error': {'code': 'TOO_MANY_PLACES', 'message': f'최대 {max_places}개의 장소만 최적화할 수 있습니다.'}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        google_maps = GoogleMapsService(city=trip.city)
+        optimizer = RouteOptimizer(google_maps)
+        
+        # 행렬은 스트림 시작 전에 준비 (실패 시 일반 에러 응답)
+        matrix = trip_matrix.duration_matrix(trip, google_maps, start_location, places)
+        
+        response = StreamingHttpResponse(
+            self._optimization_events(optimizer, places, matrix, data),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx 등 프록시 버퍼링 방지
+        return response
+    
+    def _optimization_events(self, optimizer, places, matrix, data):
+        """
+        개선 해를 SSE 이벤트로 변환하는 generator
+        
+        - 클라이언트가 연결을 끊으면 WSGI 서버가 close()를 호출해 최적화 generator도 함께 종료됩니다.
+        """
+        durations = matrix['durationMin']
+        distances = matrix['distanceKm']
+        respect_time_windows = data.get('respectTimeWindows', False)
+        day_start = data.get('dayStartTime')
+        time_budget = settings.ROUTE_OPTIMIZER_STREAM_BUDGET_MS / 1000
+        
+        started = time.monotonic()
+        last_sent = None
+        best_route = []
+        iteration = 0
+        
+        improvements = optimizer.iter_route_improvements(
+            places, durations, respect_time_windows, day_start, time_budget
+        )
+        try:
+            for route in improvements:
+                best_route = route
+                now = time.monotonic()
+                if last_sent is not None and now - last_sent < self.STREAM_MIN_INTERVAL:
+                    continue
+                
+                optimized_places, _ = self._optimized_places_payload(
+                    optimizer, places, route, durations, respect_time_windows, day_start
+                )
+                yield format_event('seed' if last_sent is None else 'improvement', {
+                    'iteration': iteration,
+                    'elapsedMs': int((now - started) * 1000),
+                    'totalDurationMin': int(optimization.route_cost(durations, route)),
+                    'totalDistanceKm': round(optimization.route_cost(distances, route), 2),
+                    'places': optimized_places,
+                })
+                last_sent = now
+                iteration += 1
+        finally:
+            improvements.close()
+        
+        elapsed = time.monotonic() - started
+        response_data = self._optimize_response_data(
+            optimizer, places, best_route, matrix, list(range(1, len(places) + 1)),
+            respect_time_windows, day_start
+        )
+        response_data['timedOut'] = elapsed >= time_budget
+        response_data['elapsedMs'] = int(elapsed * 1000)
+        yield format_event('done', response_data)
+    
+    @swagger_auto_schema(
+        operation_summary="Multi-day 경로 최적화",
+        operation_description="""
+Trip의 모든 Event를 `totalDays`개의 day로 나누고, 각 day의 방문 순서를 최적화합니다.
+
+**특징:**
+- 시작 지점 기준 방위각(Sweep)으로 지리적으로 가까운 장소끼리 묶음
+- 장소별 체류 시간(`durationMin`, 없으면 60분) + 이동 시간으로 day별 부하 균형
+- 이동 시간/거리는 Trip 행렬(TripMatrix → 캐시 → Distance Matrix API, 실패 시 추정치)로 분할/순서/총계에 함께 사용
+- day별 시간 예산(`dayBudgetMin`) 초과 시 `overBudget: true`
+- 각 day의 순서는 그 day의 부분 행렬로 프로세스 풀에서 동시에 최적화 (매일 시작 지점에서 출발, deadline 공유)
+- 위치가 없는 Event는 기존 day의 마지막에 유지
+
+**적용:**
+- 응답의 `events`는 `PATCH /trips/{tripId}/events/reorder/` 요청 형식과 같습니다.
+
+**요청 예시:**
+```json
+{
+  "totalDays": 3,
+  "dayBudgetMin": 480
+}
+```
+        """,
+        tags=['routes'],
+        request_body=OptimizeDaysRequestSerializer,
+        responses={
+            200: openapi.Response(description='최적화 제안 성공', schema=OptimizeDaysResponseSerializer),
+            400: openapi.Response(description='잘못된 요청'),
+            403: openapi.Response(description='권한 없음')
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='optimize/days')
+    def optimize_days(self, request, trip_id=None):
+        """Multi-day 루트 최적화 제안"""
+        trip = self.get_trip()
+        serializer = OptimizeDaysRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        total_days = data.get('totalDays') or trip.total_days or 1
+        day_budget = data.get('dayBudgetMin') or RouteOptimizer.DEFAULT_DAY_BUDGET_MIN
+        start_location = trip.start_location
+        
+        events = list(trip.events.all().order_by('day', 'order_key'))
+        places = [
+            {
+                'id': event.id,
+                'placeId': event.place_id,
+                'name': event.place_name,
+                'lat': event.location['lat'],
+                'lng': event.location['lng'],
+                'durationMin': event.duration_min,
+            }
+            for event in events if event.location
+        ]
+        
+        google_maps = GoogleMapsService(city=trip.city)
+        optimizer = RouteOptimizer(google_maps)
+        
+        # 이동 시간/거리 행렬 (TripMatrix → 캐시 → 없는 셀만 Distance Matrix API) - 분할, day별 순서, 총계에 공통 사용
+        matrix = trip_matrix.duration_matrix(trip, google_maps, start_location, places)
+        durations, distances = matrix['durationMin'], matrix['distanceKm']
+        day_routes = optimizer.optimize_days(
+            start_location, places, total_days, day_budget, duration_matrix=durations
+        )
+        
+        # 위치 없는 Event는 기존 day의 마지막에 유지
+        unlocated_by_day = {}
+        for event in events:
+            if not event.location:
+                day = min(event.day or 1, total_days)
+                unlocated_by_day.setdefault(day, []).append(event)
+        
+        days = []
+        flat_events = []
+        for day_idx, route in enumerate(day_routes):
+            day = day_idx + 1
+            day_events = []
+            travel_min = 0
+            distance_km = 0
+            stay_min = 0
+            current = 0
+            
+            for node in route:
+                place = places[node - 1]
+                distance_km += distances[current][node]
+                travel_min += durations[current][node]
+                stay_min += place.get('durationMin') or RouteOptimizer.DEFAULT_STAY_MIN
+                current = node
+                day_events.append({
+                    'id': place['id'],
+                    'day': day,
+                    'order': float((len(day_events) + 1) * 10),
+                    'placeName': place.get('name', ''),
+                    'lat': place['lat'],
+                    'lng': place['lng']
+                })
+            
+            for event in unlocated_by_day.get(day, []):
+                stay_min += event.duration_min or 0
+                day_events.append({
+                    'id': event.id,
+                    'day': day,
+                    'order': float((len(day_events) + 1) * 10),
+                    'placeName': event.place_name,
+                    'lat': None,
+                    'lng': None
+                })
+            
+            days.append({
+                'day': day,
+                'events': day_events,
+                'totalStayMin': int(stay_min),
+                'totalTravelMin': int(travel_min),
+                'totalDistanceKm': round(distance_km, 2),
+                'overBudget': stay_min + travel_min > day_budget
+            })
+            flat_events.extend(day_events)
+        
+        response_serializer = OptimizeDaysResponseSerializer({'days': days, 'events': flat_events})
         return Response(response_serializer.data)
     
     @swagger_auto_schema(
@@ -315,6 +668,21 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
         operation_description="""
 제안된 최적화 결과를 실제로 적용합니다.
 
+**legsToken (권장):**
+- optimize 응답의 `legsToken`을 함께 보내면 하나의 트랜잭션에서
+  Event 순서(order/day_order/global_order), RouteSegment, Trip 총 이동 시간/거리를 함께 저장합니다.
+- 토큰에 있는 구간은 optimize에서 계산한 값을 재사용하므로 Google API를 호출하지 않습니다
+  (polyline은 경로 캐시에 있으면 함께 저장).
+- order_key/day_order는 해당 day에서 이 Event들이 쓰던 값을 새 순서대로 재배치합니다.
+- 토큰에 없는 구간(추정치, 좌표 변경 등)은 커밋 후 일반 segment 생성과 같이 조회해 만들고,
+  조회에 실패하면 추정치(`localEstimate: true`)로 만들어 빈 구간 없이 Trip 요약에 포함합니다.
+- 토큰이 만료(30분)되었거나 다른 Trip의 토큰이면 400 (`LEGS_TOKEN_EXPIRED`)
+
+**legsToken 없이:**
+- 순서는 같은 방식으로 저장하고, 새 순서에서 바뀐 구간만 조회해 RouteSegment와 Trip 요약을 갱신합니다.
+
+**권한:** Trip의 owner/editor만 적용할 수 있습니다.
+
 **요청 예시:**
 ```json
 {
@@ -322,7 +690,8 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
     { "id": 1, "order": 10 },
     { "id": 2, "order": 20 },
     { "id": 3, "order": 30 }
-  ]
+  ],
+  "legsToken": "3f1c..."
 }
 ```
         """,
@@ -342,19 +711,229 @@ TSP(Traveling Salesman Problem) 알고리즘으로 최적의 방문 순서를 
         serializer.is_valid(raise_exception=True)
         
         events_data = serializer.validated_data.get('events') or serializer.validated_data.get('places', [])
+        legs_token = serializer.validated_data.get('legsToken')
+        
+        if legs_token:
+            return self._apply_with_legs(trip, events_data, legs_token)
+        return self._apply_without_legs(trip, events_data)
+    
+    @swagger_auto_schema(
+        operation_summary="후보 순서 평가 (What-if)",
+        operation_description="""
+한 day의 후보 방문 순서(1개 이상)를 저장 없이 평가해 총 이동 시간/거리와 구간별 수치를 반환합니다.
+드래그 중 미리보기처럼 실제 `reorder` 없이 결과만 필요할 때 사용합니다.
+
+**특징:**
+- Event, RouteSegment를 수정하지 않으며 Google API를 호출하지 않습니다.
+- 구간 우선순위: 저장된 RouteSegment → 경로 캐시 → 직선 거리 추정 (`estimated: true`)
+- 모든 후보의 구간을 한 번에 조회해 후보 수십 개도 한 번의 요청으로 평가합니다 (최대 100개).
+- Day 1은 시작 지점 → 첫 Event 구간을 포함합니다.
+- 후보에는 `day`의 Event만 넣을 수 있습니다 (다른 day의 Event가 있으면 400 `EVENT_NOT_IN_DAY`).
+
+**요청 예시:**
+```json
+{
+  "day": 1,
+  "candidates": [[3, 1, 2], [1, 3, 2]]
+}
+```
+        """,
+        tags=['routes'],
+        request_body=EvaluateRequestSerializer,
+        responses={
+            200: openapi.Response(description='평가 성공', schema=EvaluateResponseSerializer),
+            400: openapi.Response(description='잘못된 요청 (Trip에 없는 Event 등)'),
+            403: openapi.Response(description='권한 없음')
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def evaluate(self, request, trip_id=None):
+        """후보 순서 평가 (저장 없음)"""
+        trip = self.get_trip()
+        serializer = EvaluateRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        day = serializer.validated_data['day']
+        candidates = serializer.validated_data['candidates']
+        
+        event_ids = {event_id for order in candidates for event_id in order}
+        events = {event.id: event for event in trip.events.filter(id__in=event_ids)}
+        unknown = sorted(event_ids - set(events))
+        if unknown:
+            return Response(
+                {'error': {'code': 'EVENT_NOT_FOUND', 'message': f'Trip에 없는 Event입니다: {unknown}'}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        other_day = sorted(event_id for event_id, event in events.items() if event.day != day)
+        if other_day:
+            return Response(
+                {'error': {'code': 'EVENT_NOT_IN_DAY', 'message': f'Day {day}의 Event가 아닙니다: {other_day}'}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # 순서 업데이트
-        for event_data in events_data:
-            event = get_object_or_404(Event, id=event_data['id'], trip=trip)
-            event.order = event_data['order']
-            event.save()
+        segment_legs = {
+            (seg.from_event_id, seg.to_event_id): {
+                'durationMin': seg.duration_min,
+                'distanceKm': seg.distance_km
+            }
+            for seg in trip.route_segments.filter(to_event_id__in=event_ids)
+        }
+        
+        # segment가 없는 Event 간 구간은 TripMatrix에서 (모르는 셀은 캐시/추정치로 채움)
+        google_maps = GoogleMapsService(city=trip.city)
+        pairs = {(None, order[0]) for order in candidates if day == 1 and order}
+        pairs |= {pair for order in candidates for pair in zip(order, order[1:])}
+        pairs -= set(segment_legs)
+        segment_legs.update(trip_matrix.event_legs(trip, pairs, google_maps, save=False))
         
-        # 업데이트된 events 조회
-        updated_events = trip.events.all().order_by('order')
+        optimizer = RouteOptimizer(google_maps)
+        results = optimizer.evaluate_orders(
+            candidates,
+            {event_id: event.location for event_id, event in events.items()},
+            start_location=trip.start_location if day == 1 else None,
+            segment_legs=segment_legs
+        )
+        
+        for idx, result in enumerate(results):
+            result['index'] = idx
+        best = min(results, key=lambda result: (result['totalDurationMin'], result['totalDistanceKm']))
         
         response_data = {
-            'events': EventSerializer(updated_events, many=True).data,
-            'routeSummary': trip.route_summary
+            'day': day,
+            'candidates': results,
+            'bestIndex': best['index']
         }
+        return Response(EvaluateResponseSerializer(response_data).data)
+    
+    def _apply_order(self, trip, events, events_data):
+        """
+        제안된 순서 저장 - day별로 이 Event들이 쓰던 (order_key, day_order) 자리를 새 순서대로 재배치
+        
+        - events: 잠근 Trip Event 목록 ((day, order_key) 순으로 다시 정렬됨)
+        
+        Returns:
+            tuple: (올린 route_version, None) 또는 (None, 에러 Response)
+        """
+        events_map = {event.id: event for event in events}
+        try:
+            ordered = sorted(
+                ((int(item['id']), item['order']) for item in events_data),
+                key=lambda item: item[1]
+            )
+        except ValueError:
+            ordered = None
+        if ordered is None or any(event_id not in events_map for event_id, _ in ordered):
+            return None, Response(
+                {'error': {'code': 'EVENT_NOT_FOUND', 'message': 'Trip에 없는 Event가 포함되어 있습니다.'}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        moved = [events_map[event_id] for event_id, _ in ordered]
+        slots_by_day = {}
+        for event in moved:
+            slots_by_day.setdefault(event.day, []).append((event.order_key or order_keys.from_decimal(event.day_order), event.day_order))
+        for slots in slots_by_day.values():
+            slots.sort(reverse=True)
+        for event_id, order in ordered:
+            event = events_map[event_id]
+            event.order = order
+            event.order_key, event.day_order = slots_by_day[event.day].pop()
+        Event.objects.bulk_update(moved, ['order', 'order_key', 'day_order'])
+        
+        events.sort(key=lambda event: (event.day is None, event.day or 0, event.order_key or ''))
+        known_days = [day for day in slots_by_day if day is not None]
+        ordering.recalculate_global_order(trip.id, from_day=min(known_days) if known_days else None)
+        return trip.bump_route_version(), None
+    
+    def _apply_without_legs(self, trip, events_data):
+        """legsToken 없이 적용 - 순서 저장 후 바뀐 구간만 조회해 RouteSegment + Trip 요약 갱신"""
+        with transaction.atomic():
+            events = list(trip.events.select_for_update().order_by('day', 'order_key'))
+            version, error = self._apply_order(trip, events, events_data)
+            if error:
+                return error
+        
+        # 구간 조회는 트랜잭션 밖에서, 저장은 Trip lock 안에서 (더 새 변경이 있으면 그쪽이 다시 계산)
+        needed = set(segment_pairs(events))
+        existing = set(trip.route_segments.values_list('from_event_id', 'to_event_id'))
+        try:
+            store_segments(trip, fetch_segments(trip, list(needed - existing), events), keep=needed, version=version)
+        except RecomputeSuperseded as e:
+            superseded_segments(trip, e)
+        
+        return Response({
+            'events': EventSerializer(trip.events.all().order_by('day', 'order_key'), many=True).data,
+            'segments': RouteSegmentModelSerializer(trip.route_segments.all(), many=True).data,
+            'routeSummary': trip.route_summary
+        })
+    
+    def _apply_with_legs(self, trip, events_data, legs_token):
+        """optimize에서 계산한 구간으로 Event 순서 + RouteSegment + Trip 요약을 한 트랜잭션에 저장"""
+        with transaction.atomic():
+            # 같은 Trip의 다른 segment 재계산과 겹치지 않도록 lock (진행 중인 재계산은 버전이 바뀌어 중단)
+            lock_segments(trip.id)
+            events = list(trip.events.select_for_update().order_by('day', 'order_key'))
+            events_map = {event.id: event for event in events}
+            
+            legs = load_optimized_legs(legs_token, trip.id, trip.start_location, events)
+            if legs is None:
+                return Response(
+                    {'error': {'code': 'LEGS_TOKEN_EXPIRED', 'message': '최적화 결과가 만료되었습니다. 다시 최적화해주세요.'}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # 1. 순서
+            version, error = self._apply_order(trip, events, events_data)
+            if error:
+                return error
+            
+            # 2. Segment diff (토큰에 있는 새 구간은 토큰의 값으로 생성, API 호출 없음)
+            existing = {(seg.from_event_id, seg.to_event_id): seg for seg in trip.route_segments.all()}
+            needed = set(segment_pairs(events))
+            
+            stale_ids = [seg.id for pair, seg in existing.items() if pair not in needed]
+            if stale_ids:
+                RouteSegment.objects.filter(id__in=stale_ids).delete()
+            
+            from_token = [pair for pair in needed - set(existing) if pair in legs]
+            missing = [pair for pair in needed - set(existing) if pair not in legs]
+            route_keys = {
+                pair: route_cache_key(
+                    trip.start_location if pair[0] is None else events_map[pair[0]].location,
+                    events_map[pair[1]].location
+                )
+                for pair in from_token
+            }
+            cached_routes = cache.get_many(list(route_keys.values())) if route_keys else {}
+            RouteSegment.objects.bulk_create([
+                RouteSegment(
+                    trip=trip,
+                    from_event_id=from_id,
+                    to_event_id=to_id,
+                    duration_min=legs[(from_id, to_id)]['durationMin'],
+                    distance_km=legs[(from_id, to_id)]['distanceKm'],
+                    polyline=(cached_routes.get(route_keys[(from_id, to_id)]) or {}).get('polyline', ''),
+                    travel_mode='DRIVING'
+                )
+                for from_id, to_id in from_token
+            ])
+            
+            # 3. Trip 요약
+            totals = trip.route_segments.aggregate(duration=Sum('duration_min'), distance=Sum('distance_km'))
+            trip.total_duration_min = totals['duration'] or 0
+            trip.total_distance_km = totals['distance'] or 0
+            trip.save(update_fields=['total_duration_min', 'total_distance_km', 'modified'])
         
-        return Response(response_data)
+        # 토큰에 없는 구간은 lock 밖에서 조회 후 저장 (Trip 요약은 증감, 더 새 변경이 있으면 그쪽이 다시 계산)
+        if missing:
+            try:
+                create_segments(trip, missing, events, version=version, estimate_failed=True)
+            except RecomputeSuperseded as e:
+                superseded_segments(trip, e)
+        
+        segments = list(trip.route_segments.all())
+        return Response({
+            'events': EventSerializer(trip.events.all().order_by('day', 'order_key'), many=True).data,
+            'segments': RouteSegmentModelSerializer(segments, many=True).data,
+            'routeSummary': trip.route_summary
+        })
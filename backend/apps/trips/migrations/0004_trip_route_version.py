@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_trip_is_shared_trip_share_id_trip_shared_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='route_version',
+            field=models.PositiveIntegerField(default=0, help_text='순서/위치 변경마다 증가 - 더 새 변경이 있는 segment 재계산은 중단', verbose_name='Route version'),
+        ),
+    ]
@@ -1,5 +1,10 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 from model_utils.models import TimeStampedModel
 
 
@@ -21,6 +26,11 @@ class Trip(TimeStampedModel):
     # Route Summary (embedded) - computed from route_segments
     total_duration_min = models.IntegerField(null=True, blank=True, verbose_name='Total duration (min)')
     total_distance_km = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Total distance (km)')
+    route_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Route version',
+        help_text='순서/위치 변경마다 증가 - 더 새 변경이 있는 segment 재계산은 중단'
+    )
     
     # Share fields
     share_id = models.UUIDField(
@@ -51,6 +61,15 @@ class Trip(TimeStampedModel):
     def __str__(self):
         return f"{self.title} ({self.id})"
     
+    def save(self, *args, **kwargs):
+        # route_version은 bump_route_version(F 갱신)으로만 바뀜 - 오래된 인스턴스의 save()가 되돌리지 않도록 제외
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'route_version'
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def start_location(self):
         """시작 위치 반환"""
@@ -73,6 +92,23 @@ class Trip(TimeStampedModel):
         self.total_duration_min = sum(s.duration_min for s in segments)
         self.total_distance_km = sum(s.distance_km for s in segments)
         self.save(update_fields=['total_duration_min', 'total_distance_km', 'modified'])
+    
+    def bump_route_version(self):
+        """route_version 1 증가 후 새 값 반환 (진행 중인 이전 segment 재계산을 무효화)"""
+        Trip.objects.filter(id=self.id).update(route_version=F('route_version') + 1)
+        self.refresh_from_db(fields=['route_version'])
+        return self.route_version
+    
+    def add_route_delta(self, duration_min, distance_km):
+        """추가/삭제된 segment만큼 총계 증감 (전체 segment를 다시 읽지 않음)"""
+        if not duration_min and not distance_km:
+            return
+        Trip.objects.filter(id=self.id).update(
+            total_duration_min=Coalesce(F('total_duration_min'), 0) + duration_min,
+            total_distance_km=Coalesce(F('total_distance_km'), Decimal('0')) + Decimal(str(round(distance_km, 2))),
+            modified=timezone.now()
+        )
+        self.refresh_from_db(fields=['total_duration_min', 'total_distance_km', 'modified'])
 
 
 class TripMember(TimeStampedModel):
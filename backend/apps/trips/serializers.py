@@ -91,7 +91,7 @@ class TripDayDetailSerializer(serializers.Serializer):
         trip = obj['trip']
         day = obj['day']
         
-        events = trip.events.filter(day=day).order_by('day_order')
+        events = trip.events.filter(day=day).order_by('order_key')
         return EventWithNextRouteSerializer(
             events, 
             many=True,
@@ -1,17 +1,30 @@
 from django.urls import path, include
 from django.http import JsonResponse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter
 
 from apps.trips import views as trip_views
 from apps.trips import shared_views
 from apps.events import views as event_views
 from apps.routes import views as route_views
+from apps.routes import io_pool
+from apps.users.authentication import JWTAuthentication
 
 
 def health_check(request):
     """헬스체크 엔드포인트"""
     return JsonResponse({'status': 'healthy'})
 
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminUser])
+def io_pool_stats(request):
+    """외부 API I/O 풀 대기열/사용률 (staff 전용)"""
+    return Response(io_pool.stats())
+
 # Main Router
 router = DefaultRouter()
 router.register(r'trips', trip_views.TripViewSet, basename='trip')
@@ -20,6 +33,7 @@ router.register(r'shared-trips', shared_views.SharedTripViewSet, basename='share
 urlpatterns = [
     # Health Check
     path('health/', health_check, name='health-check'),
+    path('health/io-pool/', io_pool_stats, name='health-io-pool'),
     
     # Places - public proxy endpoints
     path('places/search/', route_views.PlaceSearchView.as_view(), name='places-search'),
@@ -34,13 +48,25 @@ urlpatterns = [
     path('trips/<int:trip_id>/events/', event_views.TripEventViewSet.as_view({
         'post': 'create'
     }), name='trip-events-create'),
+    path('trips/<int:trip_id>/events/bulk/', event_views.TripEventViewSet.as_view({
+        'post': 'bulk'
+    }), name='trip-events-bulk'),
+    path('trips/<int:trip_id>/events/batch/', event_views.TripEventViewSet.as_view({
+        'post': 'batch'
+    }), name='trip-events-batch'),
     path('trips/<int:trip_id>/events/reorder/', event_views.TripEventViewSet.as_view({
         'patch': 'reorder'
     }), name='trip-events-reorder'),
+    path('trips/<int:trip_id>/events/suggest-insertion/', event_views.TripEventViewSet.as_view({
+        'get': 'suggest_insertion'
+    }), name='trip-events-suggest-insertion'),
     path('trips/<int:trip_id>/events/<int:event_id>/', event_views.TripEventViewSet.as_view({
         'patch': 'partial_update',
         'delete': 'destroy'
     }), name='trip-events-detail'),
+    path('trips/<int:trip_id>/events/<int:event_id>/move/', event_views.TripEventViewSet.as_view({
+        'post': 'move'
+    }), name='trip-events-move'),
     path('trips/<int:trip_id>/events/<int:event_id>/route/', event_views.TripEventViewSet.as_view({
         'patch': 'update_route'
     }), name='trip-events-route-update'),
@@ -49,9 +75,19 @@ urlpatterns = [
     path('trips/<int:trip_id>/routes/calculate/', route_views.TripRouteViewSet.as_view({
         'post': 'calculate'
     }), name='trip-routes-calculate'),
+    path('trips/<int:trip_id>/routes/evaluate/', route_views.TripRouteViewSet.as_view({
+        'post': 'evaluate'
+    }), name='trip-routes-evaluate'),
     path('trips/<int:trip_id>/routes/optimize/', route_views.TripRouteViewSet.as_view({
         'post': 'optimize'
     }), name='trip-routes-optimize'),
+    # SSE: @action의 renderer_classes(text/event-stream)를 router처럼 그대로 전달
+    path('trips/<int:trip_id>/routes/optimize/stream/', route_views.TripRouteViewSet.as_view({
+        'post': 'optimize_stream'
+    }, **route_views.TripRouteViewSet.optimize_stream.kwargs), name='trip-routes-optimize-stream'),
+    path('trips/<int:trip_id>/routes/optimize/days/', route_views.TripRouteViewSet.as_view({
+        'post': 'optimize_days'
+    }), name='trip-routes-optimize-days'),
     path('trips/<int:trip_id>/routes/optimize/apply/', route_views.TripRouteViewSet.as_view({
         'post': 'apply_optimization'
     }), name='trip-routes-apply-optimization'),
@@ -210,5 +210,21 @@ CACHES = {
 # Google Maps API
 GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY', default='')
 
+# Route optimization
+ROUTE_OPTIMIZATION_CACHE_SIZE = config('ROUTE_OPTIMIZATION_CACHE_SIZE', default=256, cast=int)  # 프로세스별 LRU 항목 수
+ROUTE_OPTIMIZER_PROCESSES = config('ROUTE_OPTIMIZER_PROCESSES', default=2, cast=int)  # gunicorn worker별 최적화 프로세스 수 (0: 인라인 실행)
+ROUTE_OPTIMIZER_POOL_MIN_PLACES = config('ROUTE_OPTIMIZER_POOL_MIN_PLACES', default=40, cast=int)  # 이 개수 이상일 때만 프로세스 풀 사용 (benchmark_optimizer --pool-crossover 측정값)
+ROUTE_OPTIMIZER_MAX_PLACES = config('ROUTE_OPTIMIZER_MAX_PLACES', default=50, cast=int)  # 경로 최적화 장소 수 제한 (POOL_MIN_PLACES 이상이어야 풀 사용)
+ROUTE_OPTIMIZER_TIME_BUDGET_MS = config('ROUTE_OPTIMIZER_TIME_BUDGET_MS', default=2000, cast=int)  # 최적화 deadline
+ROUTE_OPTIMIZER_MAX_STARTS = config('ROUTE_OPTIMIZER_MAX_STARTS', default=32, cast=int)  # 요청별 multi-start 시작 수 상한
+ROUTE_OPTIMIZER_MAX_TIME_BUDGET_MS = config('ROUTE_OPTIMIZER_MAX_TIME_BUDGET_MS', default=10000, cast=int)  # 요청별 timeBudgetMs 상한
+ROUTE_OPTIMIZER_STREAM_MAX_PLACES = config('ROUTE_OPTIMIZER_STREAM_MAX_PLACES', default=20, cast=int)  # SSE 스트리밍 최적화 장소 수 제한 (요청 스레드에서 실행)
+ROUTE_OPTIMIZER_STREAM_BUDGET_MS = config('ROUTE_OPTIMIZER_STREAM_BUDGET_MS', default=3000, cast=int)  # SSE 스트리밍 최적화 deadline (요청 스레드 점유 시간)
+ROUTE_LOCAL_HOP_MAX_M = config('ROUTE_LOCAL_HOP_MAX_M', default=250, cast=int)  # 이 거리(직선, m) 미만 구간은 API 없이 도보 추정 (0: 비활성화)
+ROUTE_IO_THREADS = config('ROUTE_IO_THREADS', default=8, cast=int)  # gunicorn worker별 외부 API 호출 스레드 수 (0: 요청 스레드에서 순서대로)
+ROUTE_IO_TIMEOUT_MS = config('ROUTE_IO_TIMEOUT_MS', default=15000, cast=int)  # 요청당 외부 API 병렬 조회 deadline
+ROAD_GRAPH_DIR = config('ROAD_GRAPH_DIR', default='')  # 로컬 도로 그래프(build_road_graph 결과) 디렉터리 (비어 있으면 비활성화)
+ROAD_GRAPH_MAX_SNAP_M = config('ROAD_GRAPH_MAX_SNAP_M', default=300, cast=int)  # 지점 ↔ 도로 노드 최대 거리 (넘으면 API 사용)
+
 # Frontend URL (for sharing feature)
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
@@ -0,0 +1,20 @@
+"""
+Gunicorn 설정 훅 (작업 디렉토리의 gunicorn.conf.py는 자동으로 로드됨)
+
+- 실행 옵션(--workers, --threads 등)은 entrypoint.sh / Dockerfile에서 지정합니다.
+"""
+
+
+def post_worker_init(worker):
+    """worker가 앱을 로드한 직후 경로 최적화 프로세스 풀, 외부 API I/O 스레드 풀, 로컬 도로 그래프를 미리 준비"""
+    from apps.routes import io_pool, process_pool, road_graph
+    process_pool.warm_up()
+    io_pool.warm_up()
+    road_graph.get_engine()
+
+
+def worker_exit(server, worker):
+    """worker 종료 시 프로세스 풀/I/O 스레드 풀 정리"""
+    from apps.routes import io_pool, process_pool
+    process_pool.shutdown()
+    io_pool.shutdown()
@@ -201,8 +201,10 @@ export const updateEvent = async (
 export interface ReorderEventsRequest {
   events: Array<{
     id: number;
-    order: number;
+    order?: number; // 하위 호환: afterId/beforeId가 없을 때만 위치 비교에 사용
     day?: number;
+    afterId?: number | null;
+    beforeId?: number | null;
   }>;
   recalculateRoutes?: boolean;
 }